@@ -3,6 +3,7 @@ import firebase_admin # <-- IMPORTANT: This import is added
 from firebase_admin import credentials, initialize_app, firestore
 import os
 from dotenv import load_dotenv
+from google.auth.credentials import AnonymousCredentials
 import json
 import logging
 
@@ -13,11 +14,26 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # --- Firebase Initialization ---
+# The Admin SDK talks to the local Auth/Firestore emulators when these are set (e.g. "localhost:9099")
+FIREBASE_AUTH_EMULATOR_HOST = os.getenv('FIREBASE_AUTH_EMULATOR_HOST')
+FIRESTORE_EMULATOR_HOST = os.getenv('FIRESTORE_EMULATOR_HOST')
+USING_FIREBASE_EMULATORS = bool(FIREBASE_AUTH_EMULATOR_HOST or FIRESTORE_EMULATOR_HOST)
+
+class EmulatorCredential(credentials.Base):
+    """The emulators accept any credential, so no service account is needed to run against them."""
+    def get_credential(self):
+        return AnonymousCredentials()
+
 try:
     firebase_credentials_json = os.getenv('FIREBASE_SERVICE_ACCOUNT_KEY')
+    firebase_options = None
     if firebase_credentials_json:
         # On Render, the JSON is a string. We need to load it.
         cred = credentials.Certificate(json.loads(firebase_credentials_json))
+    elif USING_FIREBASE_EMULATORS and not os.path.exists("serviceAccountKey.json"):
+        cred = EmulatorCredential()
+        firebase_options = {'projectId': os.getenv('GOOGLE_CLOUD_PROJECT', 'demo-argumate')}
+        logger.info(f"Using the Firebase emulators for project {firebase_options['projectId']}")
     else:
         # For local development, use the file
         cred = credentials.Certificate("serviceAccountKey.json")
@@ -25,7 +41,7 @@ try:
     # Check if the app is already initialized to avoid errors
     # THIS IS THE CORRECTED LINE
     if not firebase_admin._apps:
-        initialize_app(cred)
+        initialize_app(cred, firebase_options)
         logger.info("Firebase initialized successfully from config!")
     else:
         logger.info("Firebase was already initialized.")
@@ -40,4 +56,70 @@ db = firestore.client()
 # --- Get Gemini API Key ---
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 if not GEMINI_API_KEY:
-    logger.error("GEMINI_API_KEY environment variable not set! AI processing will fail.")
\ No newline at end of file
+    logger.error("GEMINI_API_KEY environment variable not set! AI processing will fail.")
+
+# --- Long FIR Processing (map-reduce) ---
+# Documents whose estimated token count exceeds this budget are split into chunks
+# that are analysed concurrently and merged, instead of being sent as one prompt.
+FIR_CHUNK_TOKEN_BUDGET = int(os.getenv('FIR_CHUNK_TOKEN_BUDGET', '4000'))
+FIR_MAP_CONCURRENCY = int(os.getenv('FIR_MAP_CONCURRENCY', '4'))
+
+# --- Local Judgment Outcome Model ---
+# Directory produced by `python -m app.services.outcome_model`; loaded (memory-mapped) at startup.
+OUTCOME_MODEL_DIR = os.getenv('OUTCOME_MODEL_DIR', 'models/outcome_model')
+
+# --- Response Compression ---
+# Responses smaller than this (in bytes) are sent uncompressed.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+
+# --- Chat Semantic Cache ---
+SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'true').lower() == 'true'
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.85'))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv('SEMANTIC_CACHE_TTL_SECONDS', '86400'))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '5000'))
+# Optional spaCy model with word vectors (e.g. "en_core_web_md"); empty uses hashed n-gram embeddings.
+SEMANTIC_CACHE_SPACY_MODEL = os.getenv('SEMANTIC_CACHE_SPACY_MODEL', '')
+
+# --- Speculative Follow-up Prefetch ---
+# When enabled, /fir/explain requests with prefetch_followups=true warm the arguments, timeline and
+# prediction results for the derived case summary in the background.
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'false').lower() == 'true'
+PREFETCH_TTL_SECONDS = int(os.getenv('PREFETCH_TTL_SECONDS', '900'))
+PREFETCH_BUDGET_PER_HOUR = int(os.getenv('PREFETCH_BUDGET_PER_HOUR', '30'))
+PREFETCH_CONCURRENCY = int(os.getenv('PREFETCH_CONCURRENCY', '2'))
+# Prefetches are skipped or cancelled while this many user-facing AI calls are in flight
+PREFETCH_MAX_FOREGROUND_INFLIGHT = int(os.getenv('PREFETCH_MAX_FOREGROUND_INFLIGHT', '8'))
+
+# --- AI Model Routing ---
+AI_DEFAULT_MODEL = os.getenv('AI_DEFAULT_MODEL', 'google/gemini-2.0-flash-001')
+# Faster, cheaper model for short and simple requests; set it to AI_DEFAULT_MODEL to disable routing
+AI_FAST_MODEL = os.getenv('AI_FAST_MODEL', 'google/gemini-2.0-flash-lite-001')
+# JSON object of per-route policy overrides, e.g. {"chat": {"heavy_above_tokens": 400, "max_tokens": 800}}
+try:
+    MODEL_ROUTING_POLICIES = json.loads(os.getenv('MODEL_ROUTING_POLICIES', '{}'))
+except ValueError as e:
+    logger.error(f"Invalid MODEL_ROUTING_POLICIES, using the built-in policies: {e}")
+    MODEL_ROUTING_POLICIES = {}
+
+# --- WebSocket Chat ---
+CHAT_WS_MAX_CONNECTIONS = int(os.getenv('CHAT_WS_MAX_CONNECTIONS', '5000'))
+CHAT_WS_AUTH_TIMEOUT_SECONDS = float(os.getenv('CHAT_WS_AUTH_TIMEOUT_SECONDS', '10'))
+CHAT_WS_IDLE_TIMEOUT_SECONDS = float(os.getenv('CHAT_WS_IDLE_TIMEOUT_SECONDS', '900'))
+
+# --- Diagnostics (both off by default) ---
+# Logs the event loop's stack whenever it is blocked for longer than the threshold
+LOOP_LAG_MONITOR_ENABLED = os.getenv('LOOP_LAG_MONITOR_ENABLED', 'false').lower() == 'true'
+LOOP_LAG_THRESHOLD_MS = float(os.getenv('LOOP_LAG_THRESHOLD_MS', '100'))
+# Enables GET /admin/diagnostics/profile (admin only)
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+PROFILER_MAX_SECONDS = int(os.getenv('PROFILER_MAX_SECONDS', '60'))
+
+# --- Bulk User Import ---
+BULK_IMPORT_MAX_ROWS = int(os.getenv('BULK_IMPORT_MAX_ROWS', '5000'))
+# Larger uploads (default 5 MiB) are rejected without being read into memory
+BULK_IMPORT_MAX_BYTES = int(os.getenv('BULK_IMPORT_MAX_BYTES', '5242880'))
+# Users per auth.import_users() call (Firebase allows at most 1000)
+BULK_IMPORT_CHUNK_SIZE = min(int(os.getenv('BULK_IMPORT_CHUNK_SIZE', '1000')), 1000)
+# Passwords are imported as PBKDF2-SHA256 hashes (Firebase allows up to 120000 rounds and
+# re-hashes with its own scrypt on the user's first sign-in)
+BULK_IMPORT_PBKDF2_ROUNDS = int(os.getenv('BULK_IMPORT_PBKDF2_ROUNDS', '20000'))
@@ -0,0 +1,175 @@
+# app/core/diagnostics.py
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional
+
+from app.core.config import LOOP_LAG_THRESHOLD_MS
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename.replace(os.sep, "/")
+    short_path = "/".join(path.rsplit("/", 2)[-2:])
+    return f"{code.co_name} ({short_path}:{frame.f_lineno})"
+
+
+def _collapsed_stack(frame, root: str) -> str:
+    """Formats a stack root-first as one line of the collapsed format used by flamegraph.pl and speedscope."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame).replace(";", ":"))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+@dataclass
+class LoopStall:
+    started_at: float
+    duration_ms: float
+    stack: str
+
+
+@dataclass
+class LoopLagStats:
+    enabled: bool = False
+    threshold_ms: float = 0.0
+    beats: int = 0
+    stalls: int = 0
+    max_lag_ms: float = 0.0
+    recent_stalls: List[LoopStall] = field(default_factory=list)
+
+
+class LoopLagMonitor:
+    """
+    Detects event-loop stalls. A heartbeat task on the loop records when it last ran; a watchdog thread
+    notices when the heartbeat is late by more than `threshold_ms` and logs the loop thread's current
+    stack, i.e. whatever is blocking it (a synchronous HTTP call, Firestore write, PDF parse, ...).
+    Nothing runs until `start()` is called.
+    """
+
+    def __init__(self, threshold_ms: float = 100, interval_ms: float = 50, keep_stalls: int = 20):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self._last_beat = 0.0
+        self._reported_beat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._recent: Deque[LoopStall] = deque(maxlen=keep_stalls)
+        self.stats = LoopLagStats(threshold_ms=threshold_ms)
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None and not self._heartbeat.done()
+
+    def start(self) -> None:
+        """Starts monitoring the running event loop; call from a coroutine (e.g. a startup handler)."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = asyncio.get_running_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        self.stats.enabled = True
+        logger.info(f"Event loop lag monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        self.stats.enabled = False
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self.stats.beats += 1
+            self.stats.max_lag_ms = max(self.stats.max_lag_ms, lag * 1000)
+            if self._reported_beat is not None:
+                stall = self._recent[-1] if self._recent else None
+                if stall is not None:
+                    stall.duration_ms = lag * 1000
+                logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms")
+                self._reported_beat = None
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            late = time.monotonic() - last_beat - self.interval
+            if late < self.threshold or self._reported_beat == last_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            self._reported_beat = last_beat
+            self.stats.stalls += 1
+            self._recent.append(LoopStall(started_at=time.time() - late, duration_ms=late * 1000, stack=stack))
+            logger.warning(f"Event loop blocked for more than {late * 1000:.0f} ms; blocking stack:\n{stack}")
+
+    def snapshot_stats(self) -> LoopLagStats:
+        self.stats.recent_stalls = list(self._recent)
+        return self.stats
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for all threads of the worker. A background thread reads every thread's
+    current stack every `interval` seconds and counts identical stacks, so the overhead is one
+    `sys._current_frames()` call per sample and nothing at all between captures. One capture at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def _sample(self, seconds: float, interval: float) -> Counter:
+        counts: Counter = Counter()
+        own_id = threading.get_ident()
+        names = {}
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frames = sys._current_frames()
+            if len(names) != len(frames):
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id != own_id:
+                    counts[_collapsed_stack(frame, names.get(thread_id, f"thread-{thread_id}"))] += 1
+            time.sleep(interval)
+        return counts
+
+    async def capture(self, seconds: float, interval: float = 0.005) -> str:
+        """
+        Samples for `seconds` without blocking the event loop and returns collapsed stacks
+        ("thread;outer (file:line);...;inner (file:line) count" per line), most frequent first.
+        Raises RuntimeError if a capture is already running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile capture is already running.")
+        try:
+            counts = await asyncio.to_thread(self._sample, seconds, interval)
+        finally:
+            self._lock.release()
+        return "\n".join(f"{stack} {count}" for stack, count in counts.most_common()) + "\n"
+
+
+loop_lag_monitor = LoopLagMonitor(threshold_ms=LOOP_LAG_THRESHOLD_MS)
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,25 @@
+# app/core/responses.py
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> ORJSONResponse:
+    """
+    Serializes an already-validated response model straight to JSON with orjson.
+    Returning a Response skips FastAPI's second validation pass against `response_model`
+    (the route's `response_model` is still used for the OpenAPI docs).
+    """
+    return ORJSONResponse(content=model.model_dump(), status_code=status_code)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Formats one Server-Sent Event with a JSON payload."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def ndjson_line(data: Any) -> bytes:
+    """Formats one line of a newline-delimited JSON stream."""
+    return orjson.dumps(data) + b"\n"
@@ -1,4 +1,6 @@
 # app/core/security.py
+import asyncio
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from firebase_admin import auth
@@ -25,3 +27,28 @@ async def authenticate_user(credentials: HTTPBearer = Depends(security_scheme)):
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+async def verify_websocket_token(id_token: str) -> Optional[dict]:
+    """
+    Verifies a Firebase ID token sent in a WebSocket frame (browsers cannot set an Authorization header
+    on the WebSocket handshake). Returns the decoded token, or None if it is invalid.
+    """
+    try:
+        # verify_id_token may fetch Google's public keys, so keep it off the event loop
+        return await asyncio.to_thread(auth.verify_id_token, id_token)
+    except Exception as e:
+        logger.error(f"Firebase ID Token verification failed for WebSocket: {e}")
+        return None
+
+async def require_admin(current_user: dict = Depends(authenticate_user)):
+    """
+    Allows only users whose Firebase ID token carries the `admin` custom claim
+    (set with `auth.set_custom_user_claims(uid, {"admin": True})`).
+    """
+    if current_user.get("admin") is not True:
+        logger.warning(f"Non-admin user {current_user.get('uid')} attempted to access an admin endpoint")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access is required.",
+        )
+    return current_user
@@ -1,5 +1,6 @@
 # app/models/schemas.py
 from pydantic import BaseModel, EmailStr, Field
+from enum import Enum
 from typing import List, Optional, Dict, Any
 
 # --- User and Auth Models ---
@@ -32,6 +33,8 @@ class FirExplanationResponse(BaseModel):
     structured_summary: Dict[str, Any]
     ipc_sections: List[IPCSection]
     fir_id: str
+    # Derived summary to send to /arguments, /timeline and /predict when follow-ups were prefetched
+    case_summary: Optional[str] = None
 
 # --- FIR Validator Models ---
 class FirDraftInput(BaseModel):
@@ -98,6 +101,8 @@ class CaseTimelineResponse(BaseModel):
     """Defines the structure of the response for the timeline generation endpoint."""
     message: str
     timeline_steps: List[TimelineStep]
+    # Offence class whose procedural template the timeline was built from (None for free-form timelines)
+    offence_category: Optional[str] = None
 
 
 # --- Judgment Prediction Engine Models ---
@@ -111,4 +116,93 @@ class PredictionResponse(BaseModel):
     message: str
     predicted_outcome: str
     confidence_score: int # A percentage from 0 to 100
-    reasoning: str
\ No newline at end of file
+    reasoning: str
+
+class PredictionBatchInput(BaseModel):
+    """Pydantic model for scoring many case summaries with the local outcome model."""
+    case_summaries: List[str] = Field(..., min_length=1, max_length=1000)
+
+class OutcomeScore(BaseModel):
+    """Defines the structure for a single locally scored case summary."""
+    predicted_outcome: str
+    confidence_score: int # A percentage from 0 to 100
+
+class PredictionBatchResponse(BaseModel):
+    """Defines the structure of the response for the batch judgment prediction endpoint."""
+    message: str
+    predictions: List[OutcomeScore]
+
+
+# --- History Models ---
+
+class HistoryKind(str, Enum):
+    """User history collections exposed by the /history endpoints."""
+    firs = "firs"
+    chats = "chats"
+    arguments = "arguments"
+
+class HistoryView(str, Enum):
+    """'summary' returns a small projection for list screens; 'full' returns every stored field."""
+    summary = "summary"
+    full = "full"
+
+class HistoryPageResponse(BaseModel):
+    """Defines the structure of one page of a user's history."""
+    message: str
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+class HistoryItemResponse(BaseModel):
+    """Defines the structure of a single history document."""
+    message: str
+    item: Dict[str, Any]
+
+
+# --- Admin Models ---
+
+class RouteMetricsEntry(BaseModel):
+    """Latency and failure counters of one (route, model) pair of the AI model router."""
+    route: str
+    model: str
+    calls: int
+    errors: int
+    quality_failures: int
+    quality_failure_rate: float
+    p50_latency_ms: float
+    p95_latency_ms: float
+
+class LoopStallEntry(BaseModel):
+    """One event-loop stall and the stack that was blocking the loop."""
+    started_at: float
+    duration_ms: float
+    stack: str
+
+class LoopLagResponse(BaseModel):
+    """Defines the structure of the /admin/diagnostics/loop-lag response."""
+    message: str
+    enabled: bool
+    threshold_ms: float
+    beats: int
+    stalls: int
+    max_lag_ms: float
+    recent_stalls: List[LoopStallEntry]
+
+class BulkUserResult(BaseModel):
+    """One line of the /admin/users/bulk-register stream: the outcome of one uploaded row."""
+    row: int # 1-based position of the user in the upload (CSV header not counted)
+    email: Optional[str] = None
+    status: str # "created", "failed" or "profile_failed" (account created, profile document not saved)
+    uid: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkUserSummary(BaseModel):
+    """Last line of the /admin/users/bulk-register stream."""
+    total: int
+    created: int
+    failed: int
+
+class RoutingMetricsResponse(BaseModel):
+    """Defines the structure of the /admin/metrics/routing response."""
+    message: str
+    policies: Dict[str, Dict[str, Any]]
+    routes: List[RouteMetricsEntry]
@@ -0,0 +1,116 @@
+# app/routers/admin.py
+
+import asyncio
+import logging
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from app.core.config import (
+    BULK_IMPORT_CHUNK_SIZE, BULK_IMPORT_MAX_BYTES, BULK_IMPORT_MAX_ROWS, PROFILER_ENABLED, PROFILER_MAX_SECONDS,
+)
+from app.core.diagnostics import loop_lag_monitor, sampling_profiler
+from app.core.responses import model_response, ndjson_line
+from app.core.security import require_admin
+from app.models.schemas import BulkUserSummary, LoopLagResponse, RoutingMetricsResponse
+from app.services.model_router import model_router
+from app.services.user_import import parse_user_upload, register_user_chunk, validate_users
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+)
+
+@router.get("/metrics/routing", response_model=RoutingMetricsResponse)
+async def get_routing_metrics(current_user: dict = Depends(require_admin)):
+    """
+    Returns the active model routing policies with per-route, per-model latency percentiles and
+    error/quality-failure rates of this worker, for tuning the MODEL_ROUTING_POLICIES overrides.
+    """
+    return model_response(RoutingMetricsResponse(
+        message="Routing metrics retrieved successfully.",
+        policies={route: asdict(policy) for route, policy in model_router.policies.items()},
+        routes=model_router.metrics.snapshot(),
+    ))
+
+@router.get("/diagnostics/loop-lag", response_model=LoopLagResponse)
+async def get_loop_lag(current_user: dict = Depends(require_admin)):
+    """
+    Returns this worker's event-loop lag counters and the stacks of the most recent stalls
+    (enable the monitor with LOOP_LAG_MONITOR_ENABLED=true).
+    """
+    stats = loop_lag_monitor.snapshot_stats()
+    return model_response(LoopLagResponse(message="Event loop lag statistics retrieved successfully.", **asdict(stats)))
+
+@router.get("/diagnostics/profile", response_class=PlainTextResponse)
+async def capture_profile(
+    seconds: float = Query(10, gt=0, description="How long to sample."),
+    interval_ms: float = Query(5, ge=1, le=100, description="Time between samples."),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Samples every thread of this worker for `seconds` and returns collapsed stacks
+    (one "frame;frame;... count" line per distinct stack), which flamegraph.pl, speedscope and
+    inferno render as a flame graph. Requests keep being served while sampling.
+    """
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="The profiler is disabled on this server.")
+    if seconds > PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {PROFILER_MAX_SECONDS}.")
+
+    logger.info(f"Admin {current_user.get('uid')} started a {seconds}s profile capture")
+    try:
+        collapsed = await sampling_profiler.capture(seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(collapsed)
+
+@router.post("/users/bulk-register")
+async def bulk_register_users(
+    file: UploadFile = File(..., description="CSV (display_name,email,password header) or JSON array of users."),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Registers many users at once, e.g. all associates of a law firm. Rows are validated like
+    /auth/register, accounts are created with Firebase's bulk import in chunks of up to 1000 and
+    profile documents are written in Firestore batches.
+
+    The response is newline-delimited JSON: one BulkUserResult line per row (invalid rows first,
+    then each chunk as it completes) and a final {"summary": BulkUserSummary} line.
+    """
+    # Reads at most one byte past the limit, so an oversized upload is never held in memory
+    content = await file.read(BULK_IMPORT_MAX_BYTES + 1)
+    if len(content) > BULK_IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Uploads can be at most {BULK_IMPORT_MAX_BYTES} bytes.")
+    try:
+        rows = await asyncio.to_thread(parse_user_upload, content, file.filename or "")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read the upload: {e}")
+    if not rows:
+        raise HTTPException(status_code=400, detail="The upload contains no users.")
+    if len(rows) > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_IMPORT_MAX_ROWS} users can be registered per upload.")
+
+    valid_users, invalid_results = await asyncio.to_thread(validate_users, rows)
+    logger.info(
+        f"Admin {current_user.get('uid')} started a bulk registration of {len(rows)} users "
+        f"({len(invalid_results)} invalid rows)"
+    )
+
+    async def result_stream():
+        created = 0
+        for result in invalid_results:
+            yield ndjson_line(result.model_dump())
+        for start in range(0, len(valid_users), BULK_IMPORT_CHUNK_SIZE):
+            chunk_results = await asyncio.to_thread(register_user_chunk, valid_users[start:start + BULK_IMPORT_CHUNK_SIZE])
+            for result in chunk_results:
+                created += result.status != "failed"
+                yield ndjson_line(result.model_dump())
+        summary = BulkUserSummary(total=len(rows), created=created, failed=len(rows) - created)
+        logger.info(f"Bulk registration by admin {current_user.get('uid')} finished: {summary.created}/{summary.total} created")
+        yield ndjson_line({"summary": summary.model_dump()})
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
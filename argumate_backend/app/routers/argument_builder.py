@@ -1,12 +1,14 @@
 import logging
-import json
-import requests
 from fastapi import APIRouter, Depends, HTTPException
 from firebase_admin import firestore
 
 from app.models.schemas import ArgumentBuilderInput, ArgumentBuilderResponse
 from app.core.security import authenticate_user
-from app.core.config import GEMINI_API_KEY, db
+from app.core.responses import model_response
+from app.core.config import db
+from app.services.ai_service import request_json_completion
+from app.services.history_cache import history_cache
+from app.services.prefetch import prefetcher
 
 logger = logging.getLogger(__name__)
 
@@ -22,28 +24,11 @@ async def build_arguments(
 ):
     user_uid = current_user.get("uid")
     logger.info(f"Received argument build request from user: {user_uid}")
-    prompt = create_argument_prompt(argument_input.case_summary)
     
     try:
-        api_key = GEMINI_API_KEY
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-
-        payload = {
-            "model": "google/gemini-2.0-flash-001",
-            "messages": [{"role": "user", "content": prompt}],
-            "response_format": { "type": "json_object" }
-        }
-        
-        response = requests.post(api_url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-
-        json_response_str = result["choices"][0]["message"]["content"]
-        if "```json" in json_response_str:
-            json_response_str = json_response_str.split("```json")[1].split("```")[0].strip()
-        
-        ai_response_data = json.loads(json_response_str)
+        ai_response_data = await prefetcher.take(user_uid, "arguments", argument_input.case_summary)
+        if ai_response_data is None:
+            ai_response_data = await generate_arguments(argument_input.case_summary)
 
         # Database saving
         try:
@@ -54,14 +39,21 @@ async def build_arguments(
                 'prosecution_arguments': ai_response_data.get("prosecution_arguments", []),
                 'defense_arguments': ai_response_data.get("defense_arguments", [])
             })
+            history_cache.invalidate(user_uid, "arguments")
         except Exception as db_e:
             logger.error(f"DB Error: {db_e}")
 
-        return ArgumentBuilderResponse(message="Arguments generated successfully.", **ai_response_data)
+        return model_response(ArgumentBuilderResponse(message="Arguments generated successfully.", **ai_response_data))
 
     except Exception as e:
         logger.error(f"Error in argument generation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def generate_arguments(case_summary: str) -> dict:
+    """Generates the arguments for a case summary; also used to prefetch them after an FIR is explained."""
+    return await request_json_completion(create_argument_prompt(case_summary), system_prompt=None, route="arguments")
+
+prefetcher.register("arguments", generate_arguments)
+
 def create_argument_prompt(case_summary: str) -> str:
     return f"You are ArguMate. Create 'prosecution_arguments' and 'defense_arguments' in JSON for: {case_summary}. Each arg needs 'point' and 'reasoning'."
\ No newline at end of file
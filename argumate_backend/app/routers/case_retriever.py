@@ -1,14 +1,13 @@
 # app/routers/case_retriever.py
 
 import logging
-import json
-import requests
 from fastapi import APIRouter, Depends, HTTPException
 
 # Import models and security dependencies
 from app.models.schemas import CaseRetrieverInput, CaseRetrieverResponse
 from app.core.security import authenticate_user
-from app.core.config import GEMINI_API_KEY
+from app.core.responses import model_response
+from app.services.ai_service import request_json_completion
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +16,8 @@ router = APIRouter(
     tags=["Case Law Retriever"],
 )
 
+RETRIEVAL_SYSTEM_PROMPT = "You are ArguMate, an expert legal researcher. You MUST respond ONLY with a valid JSON object."
+
 @router.post("/find-similar", response_model=CaseRetrieverResponse)
 async def find_similar_cases(
     case_input: CaseRetrieverInput,
@@ -31,53 +32,15 @@ async def find_similar_cases(
     prompt = create_retrieval_prompt(case_input.case_summary)
     
     try:
-        api_key = GEMINI_API_KEY
-        if not api_key:
-            raise HTTPException(status_code=500, detail="AI Service Key is not configured.")
-
-        # --- FIX: CLEAN URL WITHOUT MARKDOWN BRACKETS ---
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {api_key}", 
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": "google/gemini-2.0-flash-001",
-            "messages": [
-                {
-                    "role": "system", 
-                    "content": "You are ArguMate, an expert legal researcher. You MUST respond ONLY with a valid JSON object."
-                },
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ],
-            "response_format": { "type": "json_object" }
-        }
-        
-        response = requests.post(api_url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-
-        # Extract content safely
-        json_response_str = result["choices"][0]["message"]["content"]
-        
-        # Robust Cleaning for JSON
-        if "```json" in json_response_str:
-            json_response_str = json_response_str.split("```json")[1].split("```")[0].strip()
-        elif "```" in json_response_str:
-            json_response_str = json_response_str.split("```")[1].split("```")[0].strip()
-        
-        ai_response_data = json.loads(json_response_str)
+        ai_response_data = await request_json_completion(
+            prompt, system_prompt=RETRIEVAL_SYSTEM_PROMPT, route="case_retrieval"
+        )
 
         # Ensure the keys match what the Frontend (Pydantic model) expects
-        return CaseRetrieverResponse(
+        return model_response(CaseRetrieverResponse(
             message="Similar cases retrieved successfully.",
             similar_cases=ai_response_data.get("similar_cases", [])
-        )
+        ))
 
     except Exception as e:
         logger.error(f"Error in case retrieval for user {user_uid}: {e}", exc_info=True)
@@ -1,11 +1,16 @@
 import logging
-import json
-import requests
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.models.schemas import CaseTimelineInput, CaseTimelineResponse
 from app.core.security import authenticate_user
-from app.core.config import GEMINI_API_KEY
+from app.core.responses import model_response
+from app.services.ai_service import request_json_completion
+from app.services.prefetch import prefetcher
+from app.services.timeline_templates import (
+    TIMELINE_SYSTEM_PROMPT, TIMELINE_TEMPLATES, classify_offence, create_timeline_adaptation_prompt,
+    create_timeline_prompt, render_template,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,59 +22,58 @@ router = APIRouter(
 @router.post("/generate", response_model=CaseTimelineResponse)
 async def generate_case_timeline(
     timeline_input: CaseTimelineInput,
+    fast: bool = Query(False, description="Return the offence-class template without AI adaptation."),
     current_user: dict = Depends(authenticate_user)
 ):
+    """
+    Generates a procedural timeline for a case.
+    The stages and duration ranges come from a bundled template for the case's offence class, picked by a
+    local classifier; the AI only adapts the step descriptions to the case (skipped entirely in fast mode).
+    Cases whose offence class cannot be identified get a free-form AI timeline.
+    """
     user_uid = current_user.get("uid")
     logger.info(f"Received case timeline request from user: {user_uid}")
 
-    prompt = create_timeline_prompt(timeline_input.case_summary)
-    
     try:
-        api_key = GEMINI_API_KEY
-        if not api_key:
-            raise HTTPException(status_code=500, detail="AI Service is not configured.")
-
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": "google/gemini-2.0-flash-001",
-            "messages": [
-                {"role": "system", "content": "You are ArguMate, an expert legal assistant. Respond ONLY with a valid JSON object."},
-                {"role": "user", "content": prompt}
-            ],
-            "response_format": { "type": "json_object" }
-        }
-        
-        response = requests.post(api_url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-
-        json_response_str = result["choices"][0]["message"]["content"]
-        
-        # Clean Markdown
-        if "```json" in json_response_str:
-            json_response_str = json_response_str.split("```json")[1].split("```")[0].strip()
-        
-        ai_response_data = json.loads(json_response_str)
+        # Prefetched timelines are AI-adapted, so fast mode never uses them
+        ai_response_data = None if fast else await prefetcher.take(user_uid, "timeline", timeline_input.case_summary)
+        if ai_response_data is None:
+            ai_response_data = await generate_timeline(timeline_input.case_summary, fast=fast)
 
-        return CaseTimelineResponse(
+        return model_response(CaseTimelineResponse(
             message="Case timeline generated successfully.",
             **ai_response_data
-        )
+        ))
 
     except Exception as e:
         logger.error(f"Error in timeline generation for user {user_uid}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
-def create_timeline_prompt(case_summary: str) -> str:
-    return f"""
-    You are ArguMate, an expert AI legal assistant for Indian law. Analyze the case and generate a procedural timeline.
-    Respond with a JSON object containing a 'timeline_steps' list of 5-7 objects.
-    Each object needs: 'step_title', 'description', 'estimated_date_or_duration'.
+async def generate_timeline(case_summary: str, fast: bool = False) -> dict:
+    """Generates the timeline for a case summary; also used to prefetch it after an FIR is explained."""
+    classification = classify_offence(case_summary)
+    logger.info(f"Timeline offence class: {classification.category} (by {classification.basis})")
+    template = TIMELINE_TEMPLATES[classification.category]
+    steps = render_template(template, classification.sections)
+
+    if fast:
+        return {"timeline_steps": steps, "offence_category": classification.category}
+    if classification.category == "general":
+        return await request_json_completion(create_timeline_prompt(case_summary), system_prompt=TIMELINE_SYSTEM_PROMPT, route="timeline")
+
+    prompt = create_timeline_adaptation_prompt(case_summary, template, steps)
+    ai_response_data = await request_json_completion(prompt, system_prompt=TIMELINE_SYSTEM_PROMPT, route="timeline_adapt")
+    return {
+        "timeline_steps": apply_adapted_descriptions(steps, ai_response_data.get("descriptions")),
+        "offence_category": classification.category,
+    }
+
+def apply_adapted_descriptions(steps: List[dict], descriptions: Optional[list]) -> List[dict]:
+    """Replaces template descriptions with the AI's case-specific ones, keeping the template text for any it skipped."""
+    descriptions = descriptions if isinstance(descriptions, list) else []
+    for step, description in zip(steps, descriptions):
+        if isinstance(description, str) and description.strip():
+            step["description"] = description.strip()
+    return steps
 
-    Case Summary: {case_summary}
-    """
\ No newline at end of file
+prefetcher.register("timeline", generate_timeline)
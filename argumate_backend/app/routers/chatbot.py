@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+import asyncio
+import json
 import logging
-import requests
+import time
+from contextlib import aclosing, suppress
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
 from firebase_admin import firestore
 
-from app.core.config import db, GEMINI_API_KEY
-from app.core.security import authenticate_user
+from app.core.config import (
+    db, SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS, SEMANTIC_CACHE_MAX_ENTRIES, SEMANTIC_CACHE_SPACY_MODEL,
+    CHAT_WS_MAX_CONNECTIONS, CHAT_WS_AUTH_TIMEOUT_SECONDS, CHAT_WS_IDLE_TIMEOUT_SECONDS,
+)
+from app.core.security import authenticate_user, verify_websocket_token
 from app.models.schemas import ChatInput
+from app.services.ai_service import StreamOutcome, request_text_completion, stream_completion_deltas
+from app.services.history_cache import history_cache
+from app.services.semantic_cache import SemanticCache, build_embedder, is_cacheable_question
 
 logger = logging.getLogger(__name__)
 
@@ -14,25 +26,7 @@ router = APIRouter(
     tags=["Chatbot"],
 )
 
-@router.post("/")
-async def chat_with_assistant(
-    chat_input: ChatInput,
-    current_user: dict = Depends(authenticate_user)
-):
-    user_uid = current_user.get("uid")
-    if not user_uid:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User UID not found in token.")
-
-    user_message = chat_input.message.strip()
-    if not user_message:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Chat message cannot be empty.")
-
-    try:
-        api_key = GEMINI_API_KEY
-        if not api_key:
-            raise HTTPException(status_code=500, detail="API Key is missing.")
-
-        system_instruction = """
+CHAT_SYSTEM_INSTRUCTION = """
         Identity: Your name is 'ArguMate'. You are a specialized AI Legal Assistant. 
         Platform: You are the personalized chatbot of the 'Lawgorythm' platform, designed to help users with legal queries.
         
@@ -51,41 +45,48 @@ async def chat_with_assistant(
           "*Disclaimer: This information is for informational purposes only and does not constitute official legal advice.*"
         """
 
-        # --- Verified OpenRouter Config ---
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:8000",
-            "X-Title": "ArguMate"
-        }
-        
-        payload = {
-            "model": "google/gemini-2.0-flash-001", # "model": "stepfun/step-3.5-flash:free",
-            "messages": [
-                {"role": "system", "content": system_instruction},
-                {"role": "user", "content": user_message}
-            ]
-        }
-
-        response = requests.post(api_url, headers=headers, json=payload)
-        
-        if response.status_code != 200:
-            logger.error(f"OpenRouter Error: {response.status_code} - {response.text}")
-            
-        response.raise_for_status()
-        result = response.json()
-
-        if "choices" in result and len(result["choices"]) > 0:
-            ai_response_text = result["choices"][0]["message"]["content"]
-        else:
-            ai_response_text = "Sorry, I am ArguMate, and I am currently unable to generate a response. Please try again."
+CHAT_FALLBACK_RESPONSE = "Sorry, I am ArguMate, and I am currently unable to generate a response. Please try again."
 
-    except Exception as e:
-        logger.error(f"Error calling AI: {e}")
-        raise HTTPException(status_code=500, detail=f"AI processing failed: {e}")
+# Answers to general (not user-specific) questions, shared across users of this worker
+chat_cache = SemanticCache(
+    build_embedder(SEMANTIC_CACHE_SPACY_MODEL),
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+    max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+) if SEMANTIC_CACHE_ENABLED else None
 
-    # --- Save to Firestore ---
+@router.post("/")
+async def chat_with_assistant(
+    chat_input: ChatInput,
+    current_user: dict = Depends(authenticate_user)
+):
+    user_uid = current_user.get("uid")
+    if not user_uid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User UID not found in token.")
+
+    user_message = chat_input.message.strip()
+    if not user_message:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Chat message cannot be empty.")
+
+    cacheable = chat_cache is not None and is_cacheable_question(user_message)
+    ai_response_text = chat_cache.lookup(user_message) if cacheable else None
+
+    if ai_response_text is None:
+        ai_response_text, complete = await generate_chat_answer(user_message)
+        if cacheable and complete:
+            chat_cache.store(user_message, ai_response_text)
+
+    save_chat_exchange(user_uid, user_message, ai_response_text)
+
+    return {
+        "message": "Success",
+        "user_message": user_message,
+        "ai_response": ai_response_text
+    }
+
+
+def save_chat_exchange(user_uid: str, user_message: str, ai_response_text: str) -> None:
+    """Saves one question/answer pair to the user's chat history in Firestore."""
     try:
         chat_history_ref = db.collection('users').document(user_uid).collection('chat_history').document()
         chat_history_ref.set({
@@ -93,11 +94,199 @@ async def chat_with_assistant(
             "ai_response": ai_response_text,
             "timestamp": firestore.SERVER_TIMESTAMP
         })
+        history_cache.invalidate(user_uid, "chats")
     except Exception as e:
         logger.error(f"Firestore error: {e}")
 
-    return {
-        "message": "Success",
-        "user_message": user_message,
-        "ai_response": ai_response_text
-    }
\ No newline at end of file
+
+async def generate_chat_answer(user_message: str) -> Tuple[str, bool]:
+    """
+    Requests a fresh answer from the AI for a single chat message. Returns (answer, complete), where
+    `complete` is False for the fallback and for answers cut off by the token limit, which must not be cached.
+    """
+    try:
+        completion = await request_text_completion(user_message, system_prompt=CHAT_SYSTEM_INSTRUCTION, route="chat")
+
+    except Exception as e:
+        logger.error(f"Error calling AI: {e}")
+        raise HTTPException(status_code=500, detail=f"AI processing failed: {e}")
+
+    if not completion.text:
+        return CHAT_FALLBACK_RESPONSE, False
+    return completion.text, not completion.truncated
+
+
+# --- WebSocket Chat ---
+
+# Application close codes (4000-4999 are reserved for applications by RFC 6455)
+WS_CLOSE_UNAUTHORIZED = 4401
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+
+_open_chat_sockets = 0
+
+
+# slots keep the state of thousands of mostly idle connections small
+@dataclass(slots=True)
+class ChatSession:
+    """Per-connection state of a /chat/ws client."""
+    uid: str
+    token_expires_at: float
+    answer_task: Optional[asyncio.Task] = None
+    answer_id: Optional[str] = None
+    messages_handled: int = 0
+    # The answer task streams deltas while the receive loop answers pings and errors; one send at a time
+    send_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@router.websocket("/ws")
+async def chat_websocket(websocket: WebSocket):
+    """
+    Persistent chat channel. The first frame must be {"type": "auth", "token": <Firebase ID token>};
+    the token is verified once and the server replies {"type": "ready"}. Then:
+    - {"type": "message", "id": ..., "message": ...} streams {"type": "delta", "id", "text"} frames and
+      a final {"type": "done", "id", "ai_response", "cached"} (one answer at a time per connection);
+    - {"type": "cancel", "id": ...} stops the answer in progress, including upstream generation, and is
+      acknowledged with {"type": "cancelled", "id"};
+    - {"type": "ping"} is answered with {"type": "pong"}.
+    Problems are reported as {"type": "error", "detail"}. The connection is closed with code 4401 when
+    the token expires (also in the middle of an answer) and after CHAT_WS_IDLE_TIMEOUT_SECONDS without frames.
+    """
+    global _open_chat_sockets
+    if _open_chat_sockets >= CHAT_WS_MAX_CONNECTIONS:
+        logger.warning(f"Rejecting chat WebSocket: {_open_chat_sockets} connections already open")
+        await websocket.close(code=WS_CLOSE_TRY_AGAIN_LATER)
+        return
+
+    await websocket.accept()
+    _open_chat_sockets += 1
+    session: Optional[ChatSession] = None
+    try:
+        session = await authenticate_chat_socket(websocket)
+        if session is None:
+            return
+        await send_frame(websocket, session, {"type": "ready"})
+
+        while True:
+            # Wake up at the token's expiry too, so a streaming answer cannot outlive it
+            until_expiry = session.token_expires_at - time.time()
+            if until_expiry <= 0:
+                await close_chat_socket(websocket, session, WS_CLOSE_UNAUTHORIZED, "Token expired")
+                return
+            try:
+                raw = await asyncio.wait_for(websocket.receive_text(), timeout=min(CHAT_WS_IDLE_TIMEOUT_SECONDS, until_expiry))
+            except asyncio.TimeoutError:
+                if until_expiry <= CHAT_WS_IDLE_TIMEOUT_SECONDS:
+                    await close_chat_socket(websocket, session, WS_CLOSE_UNAUTHORIZED, "Token expired")
+                else:
+                    await close_chat_socket(websocket, session, 1000, "Idle timeout")
+                return
+            await handle_chat_frame(websocket, session, raw)
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _open_chat_sockets -= 1
+        if session is not None and session.answer_task is not None:
+            session.answer_task.cancel()
+
+
+async def send_frame(websocket: WebSocket, session: ChatSession, frame: dict) -> None:
+    async with session.send_lock:
+        await websocket.send_json(frame)
+
+
+async def close_chat_socket(websocket: WebSocket, session: ChatSession, code: int, reason: str) -> None:
+    """Stops the answer in progress and closes the socket."""
+    if session.answer_task is not None:
+        session.answer_task.cancel()
+    async with session.send_lock:
+        await websocket.close(code=code, reason=reason)
+
+
+async def authenticate_chat_socket(websocket: WebSocket) -> Optional[ChatSession]:
+    """Reads the auth frame and verifies its token; closes the socket and returns None on failure."""
+    try:
+        frame = json.loads(await asyncio.wait_for(websocket.receive_text(), timeout=CHAT_WS_AUTH_TIMEOUT_SECONDS))
+        token = frame.get("token") if isinstance(frame, dict) and frame.get("type") == "auth" else None
+    except (asyncio.TimeoutError, ValueError):
+        token = None
+
+    decoded_token = await verify_websocket_token(token) if token else None
+    if not decoded_token or not decoded_token.get("uid"):
+        await websocket.close(code=WS_CLOSE_UNAUTHORIZED, reason="Could not validate credentials")
+        return None
+    return ChatSession(uid=decoded_token["uid"], token_expires_at=float(decoded_token.get("exp", float("inf"))))
+
+
+async def handle_chat_frame(websocket: WebSocket, session: ChatSession, raw: str) -> None:
+    try:
+        frame = json.loads(raw)
+    except ValueError:
+        frame = None
+    if not isinstance(frame, dict):
+        await send_frame(websocket, session, {"type": "error", "detail": "Frames must be JSON objects."})
+        return
+
+    frame_type = frame.get("type")
+    answering = session.answer_task is not None and not session.answer_task.done()
+
+    if frame_type == "ping":
+        await send_frame(websocket, session, {"type": "pong"})
+    elif frame_type == "cancel":
+        if answering and frame.get("id") in (None, session.answer_id):
+            session.answer_task.cancel()
+    elif frame_type == "message":
+        message_id = str(frame.get("id") or session.messages_handled + 1)
+        user_message = str(frame.get("message") or "").strip()
+        if not user_message:
+            await send_frame(websocket, session, {"type": "error", "id": message_id, "detail": "Chat message cannot be empty."})
+        elif answering:
+            await send_frame(websocket, session, {"type": "error", "id": message_id, "detail": "An answer is already in progress; cancel it or wait for it to finish."})
+        else:
+            session.answer_id = message_id
+            session.answer_task = asyncio.create_task(stream_chat_answer(websocket, session, message_id, user_message))
+    else:
+        await send_frame(websocket, session, {"type": "error", "detail": f"Unknown frame type: {frame_type!r}"})
+
+
+async def stream_chat_answer(websocket: WebSocket, session: ChatSession, message_id: str, user_message: str) -> None:
+    """Streams one answer to the socket, then caches and saves it like the /chat/ endpoint does."""
+    session.messages_handled += 1
+    try:
+        cacheable = chat_cache is not None and is_cacheable_question(user_message)
+        ai_response_text = chat_cache.lookup(user_message) if cacheable else None
+        cached = ai_response_text is not None
+
+        if cached:
+            await send_frame(websocket, session, {"type": "delta", "id": message_id, "text": ai_response_text})
+        else:
+            parts = []
+            outcome = StreamOutcome()
+            deltas = stream_completion_deltas(
+                user_message, system_prompt=CHAT_SYSTEM_INSTRUCTION, json_mode=False, route="chat", outcome=outcome
+            )
+            # aclosing() stops the upstream request as soon as this task is cancelled, even mid-send
+            async with aclosing(deltas):
+                async for delta in deltas:
+                    parts.append(delta)
+                    # Awaiting each send applies backpressure: a slow client slows the upstream reader
+                    await send_frame(websocket, session, {"type": "delta", "id": message_id, "text": delta})
+            ai_response_text = "".join(parts) or CHAT_FALLBACK_RESPONSE
+            # A reply cut off by the token limit is sent as is but never served to anyone else
+            if cacheable and parts and not outcome.truncated:
+                chat_cache.store(user_message, ai_response_text)
+
+        await send_frame(websocket, session, {"type": "done", "id": message_id, "ai_response": ai_response_text, "cached": cached})
+        await asyncio.to_thread(save_chat_exchange, session.uid, user_message, ai_response_text)
+
+    except asyncio.CancelledError:
+        # Tell the client, if it is still connected
+        with suppress(Exception):
+            await send_frame(websocket, session, {"type": "cancelled", "id": message_id})
+        raise
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error streaming chat answer for user {session.uid}: {e}", exc_info=True)
+        with suppress(Exception):
+            await send_frame(websocket, session, {"type": "error", "id": message_id, "detail": f"AI processing failed: {e}"})
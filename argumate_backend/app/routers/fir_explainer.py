@@ -1,17 +1,29 @@
 # app/routers/fir_explainer.py
 
+import asyncio
 import logging
 import json
-from typing import Optional
+from typing import Callable, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 
 # Import Pydantic models from a central location
 from app.models.schemas import FirExplanationResponse
 
 # Import helper services
 from app.core.security import authenticate_user
+from app.core.responses import model_response, sse_event
 from app.services.document_parser import parse_document
-from app.services.ai_service import get_gemini_response_for_fir
+from app.services.ai_service import (
+    get_gemini_response_for_fir, get_gemini_response_for_long_fir,
+    save_fir_explanation, stream_completion_deltas,
+)
+from app.services.fir_chunking import estimate_tokens, split_into_chunks
+from app.services.json_stream import TopLevelFieldParser
+from app.services.prefetch import build_case_summary, prefetcher
+from app.services.prompt_compressor import compress_fir_text
+from app.services.response_parser import parse_json_response
+from app.core.config import FIR_CHUNK_TOKEN_BUDGET
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -25,48 +37,64 @@ router = APIRouter(
 async def explain_fir_unified(
     current_user: dict = Depends(authenticate_user),
     file: Optional[UploadFile] = File(None),
-    fir_text_input: Optional[str] = Form(None)
+    fir_text_input: Optional[str] = Form(None),
+    prefetch_followups: bool = Form(False)
 ):
     """
     Accepts either an FIR document (file) or FIR text (form data) and returns an explanation.
     If both are provided, the file will be prioritized.
+    With `prefetch_followups`, the response includes a derived `case_summary` and the arguments, timeline
+    and prediction for that summary are prepared in the background (when prefetching is enabled).
     """
     user_uid = current_user.get("uid")
-    fir_text = ""
-    filename = "pasted_text.txt"
 
     try:
-        # Determine the source of the FIR content
-        if file:
-            logger.info(f"Processing FIR file: {file.filename} for user: {user_uid}")
-            fir_text = await parse_document(file)
-            fir_text = clean_text_for_json(fir_text)
-            filename = file.filename
-        elif fir_text_input:
-            logger.info(f"Processing FIR from direct text input for user: {user_uid}")
-            fir_text = fir_text_input
-        else:
-            # If neither file nor text is provided, raise an error
-            raise HTTPException(status_code=400, detail="Please provide either a file or text to explain.")
-
-        if len(fir_text) < 50:
-            raise HTTPException(status_code=400, detail="The provided text is too short to be a valid FIR.")
+        fir_text, prepare_text, filename = await load_fir_input(file, fir_text_input, user_uid)
 
-        # Create a detailed prompt for the AI
-        prompt = create_fir_prompt(fir_text)
+        if estimate_tokens(fir_text) <= FIR_CHUNK_TOKEN_BUDGET:
+            # Create a detailed prompt for the AI
+            prompt = create_fir_prompt(prepare_text(fir_text))
 
-        # Get the structured response from the AI service
-        ai_response_json = await get_gemini_response_for_fir(
-            prompt=prompt, 
-            user_id=user_uid, 
-            fir_filename=filename
-        )
+            # Get the structured response from the AI service
+            ai_response_json = await get_gemini_response_for_fir(
+                prompt=prompt, 
+                user_id=user_uid, 
+                fir_filename=filename
+            )
+        else:
+            ai_response_json = await explain_long_fir(fir_text, prepare_text, user_uid, filename)
         
         logger.info(f"Successfully processed FIR for user {user_uid}, fir_id: {ai_response_json.get('fir_id')}")
+        if prefetch_followups:
+            schedule_followups(ai_response_json, user_uid)
 
         # Validate and return the response
-        return FirExplanationResponse(**ai_response_json)
+        return model_response(FirExplanationResponse(**ai_response_json))
+
+    except HTTPException as http_exc:
+        logger.error(f"HTTP exception in FIR explanation for user {user_uid}: {http_exc.detail}")
+        raise http_exc
+    except Exception as e:
+        logger.error(f"An unexpected error occurred in FIR explanation for user {user_uid}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
+@router.post("/explain/stream")
+async def explain_fir_stream(
+    current_user: dict = Depends(authenticate_user),
+    file: Optional[UploadFile] = File(None),
+    fir_text_input: Optional[str] = Form(None),
+    prefetch_followups: bool = Form(False)
+):
+    """
+    Streaming variant of /fir/explain (Server-Sent Events).
+    Emits a `field` event ({"key", "value"}) as soon as each top-level field of the explanation is
+    complete, so `simplified_explanation` arrives first; then a `complete` event with the validated
+    FirExplanationResponse after it has been saved, or an `error` event.
+    """
+    user_uid = current_user.get("uid")
+
+    try:
+        fir_text, prepare_text, filename = await load_fir_input(file, fir_text_input, user_uid)
     except HTTPException as http_exc:
         logger.error(f"HTTP exception in FIR explanation for user {user_uid}: {http_exc.detail}")
         raise http_exc
@@ -74,6 +102,102 @@ async def explain_fir_unified(
         logger.error(f"An unexpected error occurred in FIR explanation for user {user_uid}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
+    async def event_stream():
+        try:
+            if estimate_tokens(fir_text) <= FIR_CHUNK_TOKEN_BUDGET:
+                parser = TopLevelFieldParser()
+                streamed_text = ""
+                async for delta in stream_completion_deltas(create_fir_prompt(prepare_text(fir_text))):
+                    streamed_text += delta
+                    for key, value in parser.feed(delta):
+                        yield sse_event("field", {"key": key, "value": value})
+
+                # Fall back to a full parse if the stream was not a single clean JSON object
+                ai_response_data = parser.fields if parser.done else parse_json_response(streamed_text)
+                ai_response_json = await save_fir_explanation(ai_response_data, user_uid, filename)
+            else:
+                # Map-reduce results only exist once all chunks are merged
+                ai_response_json = await explain_long_fir(fir_text, prepare_text, user_uid, filename)
+                for key in ("simplified_explanation", "structured_summary", "ipc_sections"):
+                    yield sse_event("field", {"key": key, "value": ai_response_json.get(key)})
+
+            if prefetch_followups:
+                schedule_followups(ai_response_json, user_uid)
+            response = FirExplanationResponse(**ai_response_json)
+            logger.info(f"Successfully streamed FIR for user {user_uid}, fir_id: {response.fir_id}")
+            yield sse_event("complete", response.model_dump())
+
+        except Exception as e:
+            logger.error(f"An unexpected error occurred in streamed FIR explanation for user {user_uid}: {e}", exc_info=True)
+            yield sse_event("error", {"detail": f"An internal error occurred: {e}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def schedule_followups(ai_response_json: dict, user_uid: str) -> None:
+    """Adds the derived case summary to the response and starts prefetching the follow-up analyses."""
+    case_summary = build_case_summary(
+        ai_response_json.get("structured_summary") or {}, ai_response_json.get("ipc_sections") or []
+    )
+    ai_response_json["case_summary"] = case_summary
+    prefetcher.schedule(user_uid, case_summary)
+
+async def load_fir_input(
+    file: Optional[UploadFile], fir_text_input: Optional[str], user_uid: str
+) -> Tuple[str, Callable[[str], str], str]:
+    """
+    Reads the FIR from the uploaded file (prioritized) or pasted text, validates its length and strips
+    boilerplate. Returns (fir_text, prepare_text, filename), where `prepare_text` makes a piece of the
+    text safe for prompt embedding.
+    """
+    # Determine the source of the FIR content
+    if file:
+        logger.info(f"Processing FIR file: {file.filename} for user: {user_uid}")
+        fir_text = await parse_document(file)
+        prepare_text = clean_text_for_json
+        filename = file.filename
+    elif fir_text_input:
+        logger.info(f"Processing FIR from direct text input for user: {user_uid}")
+        fir_text = fir_text_input
+        prepare_text = lambda text: text
+        filename = "pasted_text.txt"
+    else:
+        # If neither file nor text is provided, raise an error
+        raise HTTPException(status_code=400, detail="Please provide either a file or text to explain.")
+
+    if len(prepare_text(fir_text)) < 50:
+        raise HTTPException(status_code=400, detail="The provided text is too short to be a valid FIR.")
+
+    # Strip repeated headers/footers and form boilerplate before it costs input tokens
+    fir_text, compression = await asyncio.to_thread(compress_fir_text, fir_text)
+    logger.info(
+        f"FIR input for user {user_uid}: {compression.tokens_before} -> {compression.tokens_after} tokens "
+        f"(-{compression.reduction_percent:.1f}%, {compression.template_lines_removed} template and "
+        f"{compression.repeated_lines_removed} repeated lines removed)"
+    )
+    # An upload that is nothing but form boilerplate would otherwise reach the AI as an empty prompt
+    if len(prepare_text(fir_text)) < 50:
+        raise HTTPException(status_code=400, detail="The provided text contains too little FIR content beyond form boilerplate.")
+    return fir_text, prepare_text, filename
+
+async def explain_long_fir(fir_text: str, prepare_text: Callable[[str], str], user_uid: str, filename: str) -> dict:
+    """Long charge sheets are analysed chunk by chunk and merged."""
+    chunks = split_into_chunks(fir_text, FIR_CHUNK_TOKEN_BUDGET)
+    logger.info(f"FIR for user {user_uid} exceeds prompt budget; processing in {len(chunks)} chunks")
+    chunk_prompts = [
+        create_fir_chunk_prompt(prepare_text(chunk), index + 1, len(chunks))
+        for index, chunk in enumerate(chunks)
+    ]
+    return await get_gemini_response_for_long_fir(
+        chunk_prompts=chunk_prompts,
+        build_reduce_prompt=create_fir_reduce_prompt,
+        user_id=user_uid,
+        fir_filename=filename
+    )
+
 def clean_text_for_json(text: str) -> str:
     """
     Cleans text extracted from files to make it safe for JSON embedding.
@@ -106,3 +230,34 @@ def create_fir_prompt(fir_text: str) -> str:
     {fir_text}
     ---
     """
+
+
+def create_fir_chunk_prompt(chunk_text: str, part_number: int, total_parts: int) -> str:
+    """Creates the per-chunk extraction prompt used when an FIR is too long for a single prompt."""
+    return f"""
+    You are an expert AI legal assistant. The following text is part {part_number} of {total_parts} of a long Indian FIR or charge sheet.
+    Extract only what is present in THIS part and return a valid JSON object with these exact three top-level keys: "structured_summary", "ipc_sections", and "key_points".
+
+    1. "structured_summary": A nested JSON object using these keys: "complainant_name", "accused_name_s", "victim_name_s", "date_of_incident", "time_of_incident", "place_of_incident", "brief_offence_description", "fir_number", "police_station", "date_of_fir". If a detail is not in this part, use an empty string "" or an empty list [].
+    2. "ipc_sections": A list of JSON objects with "section" (e.g., "IPC Section 302") and "reason". Return an empty list [] if none apply to this part.
+    3. "key_points": A single JSON string of at most three sentences describing the important facts in this part.
+
+    Text of part {part_number}:
+    ---
+    {chunk_text}
+    ---
+    """
+
+
+def create_fir_reduce_prompt(merged: dict) -> str:
+    """Creates the final short prompt that writes the explanation from the merged chunk results."""
+    return f"""
+    You are an expert AI legal assistant. A long Indian FIR has already been analysed part by part.
+    Using only the merged details below, write a clear, easy-to-understand summary of the whole FIR for a common citizen.
+    Return a valid JSON object with exactly one key: "simplified_explanation" (a single JSON string).
+
+    Structured summary: {json.dumps(merged["structured_summary"], ensure_ascii=False)}
+    Suggested IPC sections: {json.dumps(merged["ipc_sections"], ensure_ascii=False)}
+    Key points from each part, in order:
+    {json.dumps(merged["key_points"], ensure_ascii=False)}
+    """
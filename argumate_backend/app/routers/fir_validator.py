@@ -1,10 +1,9 @@
 import logging
-import json
-import requests
 from fastapi import APIRouter, Depends, HTTPException
 from app.models.schemas import FirDraftInput, FirValidationResponse
 from app.core.security import authenticate_user
-from app.core.config import GEMINI_API_KEY
+from app.core.responses import model_response
+from app.services.ai_service import request_json_completion
 
 logger = logging.getLogger(__name__)
 
@@ -16,19 +15,9 @@ async def validate_fir_draft(draft_input: FirDraftInput, current_user: dict = De
     prompt = create_validation_prompt(draft_input.fir_draft_text)
     
     try:
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {"Authorization": f"Bearer {GEMINI_API_KEY}", "Content-Type": "application/json"}
-        payload = {
-            "model": "google/gemini-2.0-flash-001",
-            "messages": [{"role": "user", "content": prompt}],
-            "response_format": { "type": "json_object" }
-        }
-        
-        response = requests.post(api_url, headers=headers, json=payload)
-        response.raise_for_status()
-        ai_response_data = json.loads(response.json()["choices"][0]["message"]["content"].replace("```json", "").replace("```", ""))
+        ai_response_data = await request_json_completion(prompt, system_prompt=None, route="fir_validate")
 
-        return FirValidationResponse(message="FIR draft validated successfully.", **ai_response_data)
+        return model_response(FirValidationResponse(message="FIR draft validated successfully.", **ai_response_data))
     except Exception as e:
         logger.error(f"Validation Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
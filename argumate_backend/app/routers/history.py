@@ -0,0 +1,182 @@
+# app/routers/history.py
+
+import asyncio
+import hashlib
+import logging
+import re
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from firebase_admin import firestore
+
+from app.core.config import db
+from app.core.responses import model_response
+from app.core.security import authenticate_user
+from app.models.schemas import HistoryKind, HistoryView, HistoryPageResponse, HistoryItemResponse
+from app.services.history_cache import history_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/history",
+    tags=["History"],
+)
+
+# Firestore subcollection, ordering field and summary projection for each history kind
+HISTORY_SOURCES = {
+    HistoryKind.firs: {
+        "collection": "firs",
+        "order_field": "uploaded_at",
+        "summary_fields": ["filename", "uploaded_at", "structured_summary"],
+    },
+    HistoryKind.chats: {
+        "collection": "chat_history",
+        "order_field": "timestamp",
+        "summary_fields": ["user_message", "timestamp"],
+    },
+    HistoryKind.arguments: {
+        "collection": "arguments_built",
+        "order_field": "timestamp",
+        "summary_fields": ["case_summary", "timestamp"],
+    },
+}
+
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_.]*$")
+
+
+@router.get("/{kind}", response_model=HistoryPageResponse)
+async def list_history(
+    kind: HistoryKind,
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="The next_cursor value from the previous page."),
+    view: HistoryView = HistoryView.summary,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; overrides `view`."),
+    current_user: dict = Depends(authenticate_user)
+):
+    """
+    Returns one page of the user's FIRs, chats or built arguments, newest first.
+    Supports cursor pagination, field projection and ETag / If-None-Match revalidation.
+    """
+    user_uid = current_user.get("uid")
+    selected = resolve_fields(kind, view, fields)
+    cache_key = (kind.value, "list", limit, cursor, tuple(selected or ()))
+
+    page = history_cache.get(user_uid, cache_key)
+    if page is None:
+        generation = history_cache.generation(user_uid, kind.value)
+        try:
+            items, next_cursor = await asyncio.to_thread(fetch_history_page, user_uid, kind, limit, cursor, selected)
+        except LookupError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error reading {kind.value} history for user {user_uid}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
+
+        body = model_response(HistoryPageResponse(
+            message="History retrieved successfully.",
+            items=items,
+            next_cursor=next_cursor
+        )).body
+        page = (body, make_etag(body))
+        history_cache.put(user_uid, cache_key, page, generation)
+
+    return conditional_response(request, page)
+
+
+@router.get("/{kind}/{doc_id}", response_model=HistoryItemResponse)
+async def get_history_item(
+    kind: HistoryKind,
+    doc_id: str,
+    request: Request,
+    current_user: dict = Depends(authenticate_user)
+):
+    """Returns a single history document with all of its fields."""
+    user_uid = current_user.get("uid")
+    cache_key = (kind.value, "item", doc_id)
+
+    page = history_cache.get(user_uid, cache_key)
+    if page is None:
+        generation = history_cache.generation(user_uid, kind.value)
+        try:
+            item = await asyncio.to_thread(fetch_history_item, user_uid, kind, doc_id)
+        except Exception as e:
+            logger.error(f"Error reading {kind.value}/{doc_id} for user {user_uid}: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
+        if item is None:
+            raise HTTPException(status_code=404, detail="History item not found.")
+
+        body = model_response(HistoryItemResponse(message="History item retrieved successfully.", item=item)).body
+        page = (body, make_etag(body))
+        history_cache.put(user_uid, cache_key, page, generation)
+
+    return conditional_response(request, page)
+
+
+def resolve_fields(kind: HistoryKind, view: HistoryView, fields: Optional[str]) -> Optional[List[str]]:
+    """Returns the field projection for a query, or None for all fields."""
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        invalid = [f for f in requested if not _FIELD_NAME.match(f)]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid field names: {', '.join(invalid)}")
+        return requested
+    if view == HistoryView.summary:
+        return HISTORY_SOURCES[kind]["summary_fields"]
+    return None
+
+
+def fetch_history_page(user_uid: str, kind: HistoryKind, limit: int, cursor: Optional[str], selected: Optional[List[str]]):
+    """Blocking Firestore read of one page; fetches limit + 1 documents to know whether another page exists."""
+    source = HISTORY_SOURCES[kind]
+    collection = db.collection('users').document(user_uid).collection(source["collection"])
+    query = collection.order_by(source["order_field"], direction=firestore.Query.DESCENDING)
+
+    if selected:
+        query = query.select(sorted(set(selected) | {source["order_field"]}))
+    if cursor:
+        cursor_snapshot = collection.document(cursor).get()
+        if not cursor_snapshot.exists:
+            raise LookupError("Invalid or expired cursor.")
+        query = query.start_after(cursor_snapshot)
+
+    documents = list(query.limit(limit + 1).stream())
+    # The cursor is the last document returned; the next page starts after it
+    next_cursor = documents[limit - 1].id if len(documents) > limit else None
+    items = [{"id": doc.id, **to_json_safe(doc.to_dict() or {})} for doc in documents[:limit]]
+    return items, next_cursor
+
+
+def fetch_history_item(user_uid: str, kind: HistoryKind, doc_id: str) -> Optional[dict]:
+    """Blocking Firestore read of a single history document."""
+    collection_name = HISTORY_SOURCES[kind]["collection"]
+    snapshot = db.collection('users').document(user_uid).collection(collection_name).document(doc_id).get()
+    if not snapshot.exists:
+        return None
+    return {"id": snapshot.id, **to_json_safe(snapshot.to_dict() or {})}
+
+
+def to_json_safe(value: Any) -> Any:
+    """Converts Firestore timestamps (datetime subclasses) into ISO-8601 strings, recursively."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: to_json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_json_safe(v) for v in value]
+    return value
+
+
+def make_etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()}"'
+
+
+def conditional_response(request: Request, page) -> Response:
+    """Sends 304 Not Modified when the client's If-None-Match matches, otherwise the cached body."""
+    body, etag = page
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
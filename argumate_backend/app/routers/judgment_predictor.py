@@ -1,11 +1,13 @@
+import asyncio
 import logging
-import json
-import requests
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.models.schemas import PredictionInput, PredictionResponse
+from app.models.schemas import PredictionInput, PredictionResponse, PredictionBatchInput, PredictionBatchResponse, OutcomeScore
 from app.core.security import authenticate_user
-from app.core.config import GEMINI_API_KEY
+from app.core.responses import model_response
+from app.services.ai_service import request_json_completion
+from app.services.outcome_model import get_outcome_model, OutcomePrediction
+from app.services.prefetch import prefetcher
 
 logger = logging.getLogger(__name__)
 
@@ -14,77 +16,140 @@ router = APIRouter(
     tags=["Judgment Prediction Engine"],
 )
 
+REASONING_SYSTEM_PROMPT = "You are ArguMate, an expert legal analyst. You must respond ONLY with a valid JSON object."
+
 @router.post("/outcome", response_model=PredictionResponse)
 async def predict_judgment_outcome(
     prediction_input: PredictionInput,
+    fast: bool = Query(False, description="Skip the AI-written reasoning and return the local model's indicators."),
     current_user: dict = Depends(authenticate_user)
 ):
     """
-    Accepts a case summary and uses OpenRouter (Gemini Model) to predict the likely outcome.
+    Predicts the likely outcome of a case.
+    The outcome and confidence come from the local outcome model; the LLM only writes the reasoning
+    (or is skipped entirely in fast mode). Falls back to an LLM-only prediction if no model is loaded;
+    fast mode then returns 503 instead of silently making the slower AI call.
     """
     user_uid = current_user.get("uid")
     logger.info(f"Received judgment prediction request from user: {user_uid}")
 
-    prompt = create_prediction_prompt(prediction_input.case_summary)
-    
     try:
-        api_key = GEMINI_API_KEY
-        if not api_key:
-            raise HTTPException(status_code=500, detail="AI Service is not configured.")
-
-        api_url = "https://openrouter.ai/api/v1/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": "google/gemini-2.0-flash-001", 
-            "messages": [
-                {
-                    "role": "system", 
-                    "content": "You are ArguMate, an expert legal analyst. You must respond ONLY with a valid JSON object."
-                },
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ],
-            "response_format": { "type": "json_object" } 
-        }
-        
-        response = requests.post(api_url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-
-        json_response_str = result["choices"][0]["message"]["content"]
-        
-        if "```json" in json_response_str:
-            json_response_str = json_response_str.split("```json")[1].split("```")[0].strip()
-        elif "```" in json_response_str:
-             json_response_str = json_response_str.split("```")[1].split("```")[0].strip()
-
-        ai_response_data = json.loads(json_response_str)
-
-        return PredictionResponse(
+        # Prefetched results carry AI-written reasoning, so fast mode never uses them
+        prediction_data = None if fast else await prefetcher.take(user_uid, "prediction", prediction_input.case_summary)
+        if prediction_data is None:
+            prediction_data = await generate_prediction(prediction_input.case_summary, fast=fast)
+
+        return model_response(PredictionResponse(
             message="Judgment prediction generated successfully.",
-            predicted_outcome=ai_response_data.get("predicted_outcome", "Unknown"),
-            confidence_score=ai_response_data.get("confidence_score", 0),
-            reasoning=ai_response_data.get("reasoning", "No reasoning provided.")
-        )
+            **prediction_data
+        ))
 
+    except HTTPException as http_exc:
+        raise http_exc
     except Exception as e:
         logger.error(f"An unexpected error occurred during judgment prediction for user {user_uid}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {e}")
 
 
+@router.post("/outcome/batch", response_model=PredictionBatchResponse)
+async def predict_judgment_outcomes_batch(
+    batch_input: PredictionBatchInput,
+    current_user: dict = Depends(authenticate_user)
+):
+    """
+    Scores many case summaries with the local outcome model in one call (no AI reasoning).
+    """
+    model = get_outcome_model()
+    if model is None:
+        raise HTTPException(status_code=503, detail="The local outcome model is not loaded.")
+
+    # Featurizing up to 1000 summaries is pure-Python CPU work; keep it off the event loop
+    predictions = await asyncio.to_thread(model.predict_batch, batch_input.case_summaries)
+    logger.info(f"Scored {len(predictions)} case summaries for user: {current_user.get('uid')}")
+    return model_response(PredictionBatchResponse(
+        message="Judgment predictions generated successfully.",
+        predictions=[
+            OutcomeScore(predicted_outcome=p.predicted_outcome, confidence_score=p.confidence_score)
+            for p in predictions
+        ]
+    ))
+
+
+async def generate_prediction(case_summary: str, fast: bool = False) -> dict:
+    """
+    Predicts the outcome, confidence and reasoning for a case summary; also used (without fast mode)
+    to prefetch the prediction after an FIR is explained.
+    """
+    model = get_outcome_model()
+    if model is None:
+        if fast:
+            raise HTTPException(status_code=503, detail="Fast mode needs the local outcome model, which is not loaded.")
+        return await predict_with_llm(case_summary)
+
+    prediction = model.predict(case_summary)
+    if fast:
+        reasoning = describe_indicators(prediction)
+    else:
+        prompt = create_reasoning_prompt(case_summary, prediction)
+        ai_response_data = await request_json_completion(
+            prompt, system_prompt=REASONING_SYSTEM_PROMPT, route="prediction_reasoning"
+        )
+        reasoning = ai_response_data.get("reasoning") or describe_indicators(prediction)
+
+    return {
+        "predicted_outcome": prediction.predicted_outcome,
+        "confidence_score": prediction.confidence_score,
+        "reasoning": reasoning,
+    }
+
+prefetcher.register("prediction", generate_prediction)
+
+
+async def predict_with_llm(case_summary: str) -> dict:
+    """Original LLM-only prediction, used when no local outcome model has been trained."""
+    prompt = create_prediction_prompt(case_summary)
+    ai_response_data = await request_json_completion(prompt, system_prompt=REASONING_SYSTEM_PROMPT, route="prediction")
+    return {
+        "predicted_outcome": ai_response_data.get("predicted_outcome", "Unknown"),
+        "confidence_score": ai_response_data.get("confidence_score", 0),
+        "reasoning": ai_response_data.get("reasoning", "No reasoning provided."),
+    }
+
+
+def describe_indicators(prediction: OutcomePrediction) -> str:
+    """Builds a short, model-derived reasoning string for fast mode."""
+    if not prediction.top_indicators:
+        return f"Predicted from patterns in similar past cases ({prediction.confidence_score}% confidence)."
+    indicators = ", ".join(f"'{gram}'" for gram in prediction.top_indicators)
+    return (
+        f"The facts most associated with a {prediction.predicted_outcome} outcome in past cases were: {indicators} "
+        f"({prediction.confidence_score}% confidence)."
+    )
+
+
+def create_reasoning_prompt(case_summary: str, prediction: OutcomePrediction) -> str:
+    """Creates the prompt that asks the AI to explain an outcome already predicted by the local model."""
+    return f"""
+    You are ArguMate, an AI legal analyst for Indian law.
+    A statistical model trained on Indian court judgments predicted the outcome "{prediction.predicted_outcome}"
+    with {prediction.confidence_score}% confidence for the case below. Do NOT change the prediction.
+
+    Respond with a single, valid JSON object with one key:
+    "reasoning": String. A brief explanation citing facts from the case that support or weaken this outcome.
+
+    Case summary:
+    ---
+    {case_summary}
+    ---
+    """
+
+
 def create_prediction_prompt(case_summary: str) -> str:
     """Creates a standardized prompt for the judgment prediction task."""
     return f"""
     You are ArguMate, an AI legal analyst that simulates a machine learning model trained on Indian court cases.
     Your task is to predict the likely outcome of a case based on its summary.
-    
+
     The response MUST be a single, valid JSON object with the following keys:
     1. "predicted_outcome": String. Use "Conviction" (Doshi), "Acquittal" (Nirdosh), or "Settlement" (Samjhauta).
     2. "confidence_score": Integer (0-100).
@@ -94,4 +159,4 @@ def create_prediction_prompt(case_summary: str) -> str:
     ---
     {case_summary}
     ---
-    """
\ No newline at end of file
+    """
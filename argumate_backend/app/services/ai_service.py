@@ -1,81 +1,331 @@
 # app/services/ai_service.py
-import logging
+import asyncio
 import json
+import logging
+import time
+import httpx
 import requests
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 from firebase_admin import firestore
-from app.core.config import GEMINI_API_KEY, db
+from app.core.config import GEMINI_API_KEY, FIR_MAP_CONCURRENCY, db
+from app.services.fir_chunking import merge_partial_results
+from app.services.history_cache import history_cache
+from app.services.model_router import RouteChoice, model_router
+from app.services.response_parser import parse_json_response
 
 logger = logging.getLogger(__name__)
 
-async def get_gemini_response_for_fir(prompt: str, user_id: str, fir_filename: str) -> dict:
-    """
-    Orchestrates the AI response for FIR explanation using OpenRouter.
-    Ensures identity as ArguMate and structured JSON output.
-    """
+OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# System Role to enforce ArguMate identity and JSON format
+FIR_SYSTEM_PROMPT = (
+    "You are 'ArguMate', a specialized AI Legal Assistant for the Lawgorythm platform. "
+    "Your job is to analyze Indian FIRs and provide structured insights. "
+    "You must ALWAYS respond in valid JSON format. Never call yourself Lawgorythm."
+)
+
+
+# Background work (e.g. speculative prefetch) runs with this flag set so that only
+# user-facing calls count towards the foreground load that background work yields to.
+background_priority: ContextVar[bool] = ContextVar("background_priority", default=False)
+_foreground_inflight = 0
+
+
+def foreground_inflight() -> int:
+    """Number of user-facing upstream AI calls currently in flight in this worker."""
+    return _foreground_inflight
+
+
+@contextmanager
+def _track_inflight():
+    global _foreground_inflight
+    foreground = not background_priority.get()
+    if foreground:
+        _foreground_inflight += 1
+    try:
+        yield
+    finally:
+        if foreground:
+            _foreground_inflight -= 1
+
+
+def _post_completion(payload: dict) -> dict:
+    """Sends a chat completion request to OpenRouter (blocking) and returns the decoded body."""
     api_key = GEMINI_API_KEY
     if not api_key:
         raise Exception("Missing AI API Key configuration.")
 
-    # --- OpenRouter Integration ---
-    api_url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
+    response = requests.post(OPENROUTER_API_URL, headers=_openrouter_headers(api_key), json=payload)
+    if response.status_code != 200:
+        logger.error(f"OpenRouter Error: {response.status_code} - {response.text}")
+    response.raise_for_status()
+    return response.json()
+
+
+def _openrouter_headers(api_key: str) -> dict:
+    return {
         "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
+        "Content-Type": "application/json",
+        "HTTP-Referer": "http://localhost:8000",
+        "X-Title": "ArguMate"
     }
 
-    # Added System Role to enforce ArguMate identity and JSON format
+
+def _build_messages(prompt: str, system_prompt: Optional[str]) -> List[dict]:
+    messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def _build_payload(choice: RouteChoice, prompt: str, system_prompt: Optional[str], json_mode: bool) -> dict:
     payload = {
-        "model": "google/gemini-2.0-flash-001", # High accuracy for legal parsing
-        "messages": [
-            {
-                "role": "system", 
-                "content": (
-                    "You are 'ArguMate', a specialized AI Legal Assistant for the Lawgorythm platform. "
-                    "Your job is to analyze Indian FIRs and provide structured insights. "
-                    "You must ALWAYS respond in valid JSON format. Never call yourself Lawgorythm."
-                )
-            },
-            {
-                "role": "user", 
-                "content": prompt
-            }
-        ],
-        "response_format": { "type": "json_object" }
+        "model": choice.model,
+        "messages": _build_messages(prompt, system_prompt),
+        "max_tokens": choice.max_tokens,
     }
+    if json_mode:
+        payload["response_format"] = { "type": "json_object" }
+    return payload
+
 
+async def _routed_completion(choice: RouteChoice, payload: dict) -> Tuple[dict, float]:
+    """Runs one completion off the event loop, recording upstream failures against the route."""
+    started = time.perf_counter()
     try:
-        response = requests.post(api_url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-
-        # Extract content
-        json_response_str = result["choices"][0]["message"]["content"]
-        
-        # Robust Cleaning: Remove markdown backticks if AI includes them
-        if "```json" in json_response_str:
-            json_response_str = json_response_str.split("```json")[1].split("```")[0].strip()
-        elif "```" in json_response_str:
-            json_response_str = json_response_str.split("```")[1].split("```")[0].strip()
-        
-        ai_response_data = json.loads(json_response_str)
-
-        # --- Save to Firestore ---
-        fir_doc_ref = db.collection('users').document(user_id).collection('firs').document()
-        firestore_data = {
-            "simplified_explanation": ai_response_data.get("simplified_explanation"),
-            "structured_summary": ai_response_data.get("structured_summary"),
-            "ipc_sections": ai_response_data.get("ipc_sections"),
-            "filename": fir_filename,
-            "uploaded_at": firestore.SERVER_TIMESTAMP,
-        }
-        fir_doc_ref.set(firestore_data)
+        with _track_inflight():
+            result = await asyncio.to_thread(_post_completion, payload)
+    except Exception:
+        model_router.metrics.record(choice.route, choice.model, time.perf_counter() - started, "error")
+        raise
+    return result, time.perf_counter() - started
+
+
+async def request_json_completion(
+    prompt: str, system_prompt: Optional[str] = FIR_SYSTEM_PROMPT, route: str = "fir_explain"
+) -> dict:
+    """
+    Requests a JSON-mode completion without blocking the event loop and returns the parsed object.
+    Pass `system_prompt=None` to send only the user prompt. The model and `max_tokens` come from the
+    route's policy; a reply from the fast model that is truncated, unparseable or missing expected
+    keys is recorded as a quality failure and retried once on the route's heavy model (with the
+    route's larger escalation cap if it was truncated).
+    """
+    choice = model_router.choose(route, prompt)
+    while True:
+        result, latency = await _routed_completion(choice, _build_payload(choice, prompt, system_prompt, True))
+        message = result["choices"][0]
+        truncated = message.get("finish_reason") == "length"
+        try:
+            data = parse_json_response(message["message"]["content"])
+            failure = None
+            if truncated or not model_router.has_expected_keys(route, data):
+                failure = ValueError("truncated or incomplete JSON reply")
+        except ValueError as e:
+            data, failure = None, e
+
+        model_router.metrics.record(route, choice.model, latency, "quality_failure" if failure else "ok")
+        if failure is None:
+            return data
+        if choice.escalation_model:
+            logger.warning(f"Quality failure from {choice.model} on route '{route}' ({failure}); retrying on {choice.escalation_model}")
+            choice = model_router.escalate(choice, truncated)
+            continue
+        if data is None:
+            raise failure
+        return data
+
+
+@dataclass
+class TextCompletion:
+    # None if the AI sent no choices
+    text: Optional[str]
+    # The reply hit max_tokens and was cut off; it must not be cached or reused
+    truncated: bool = False
+
+
+async def request_text_completion(
+    prompt: str, system_prompt: Optional[str] = None, route: str = "chat"
+) -> TextCompletion:
+    """
+    Requests a plain-text completion without blocking the event loop. An empty or truncated reply
+    from the fast model is retried once on the route's heavy model, a truncated one with the route's
+    larger escalation cap; a reply that is still truncated is returned with `truncated=True`.
+    """
+    choice = model_router.choose(route, prompt)
+    while True:
+        result, latency = await _routed_completion(choice, _build_payload(choice, prompt, system_prompt, False))
+        choices = result.get("choices") or []
+        content = choices[0]["message"]["content"] if choices else None
+        truncated = bool(choices) and choices[0].get("finish_reason") == "length"
+        failure = not content or truncated
+        model_router.metrics.record(route, choice.model, latency, "quality_failure" if failure else "ok")
+        if failure and choice.escalation_model:
+            reason = "Truncated" if truncated else "Empty"
+            logger.warning(f"{reason} reply from {choice.model} on route '{route}'; retrying on {choice.escalation_model}")
+            choice = model_router.escalate(choice, truncated)
+            continue
+        return TextCompletion(content, truncated)
+
+
+@dataclass
+class StreamOutcome:
+    """Filled in by `stream_completion_deltas` when the upstream stream ends."""
+    finish_reason: Optional[str] = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason == "length"
+
 
-        # Meta info for Frontend
-        ai_response_data["message"] = "FIR processed successfully by ArguMate!"
-        ai_response_data["fir_id"] = fir_doc_ref.id
-        
-        return ai_response_data
+_stream_client: Optional[httpx.AsyncClient] = None
+_stream_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_stream_client() -> httpx.AsyncClient:
+    """Shared async HTTP client for streamed completions, bound to the running event loop."""
+    global _stream_client, _stream_client_loop
+    loop = asyncio.get_running_loop()
+    if _stream_client is None or _stream_client_loop is not loop:
+        # No connection cap: every open SSE/WebSocket answer holds one upstream connection
+        _stream_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=20),
+        )
+        _stream_client_loop = loop
+    return _stream_client
+
+
+async def close_stream_client() -> None:
+    global _stream_client
+    if _stream_client is not None:
+        await _stream_client.aclose()
+        _stream_client = None
+
+
+async def stream_completion_deltas(
+    prompt: str, system_prompt: Optional[str] = FIR_SYSTEM_PROMPT, json_mode: bool = True, route: str = "fir_explain",
+    outcome: Optional[StreamOutcome] = None
+) -> AsyncIterator[str]:
+    """
+    Streams a completion from OpenRouter and yields content deltas as they arrive.
+    The stream is read with an async HTTP client on the event loop, so an open stream holds no
+    worker thread, and the next line is only read when the consumer asks for the next delta, so a
+    slow consumer applies backpressure upstream. Closing the generator (e.g. when the client
+    disconnects or cancels) closes the upstream connection.
+    The model is chosen by the route's policy; streamed replies cannot be retried on another model,
+    so pass an `outcome` to learn whether the reply was truncated.
+    """
+    api_key = GEMINI_API_KEY
+    if not api_key:
+        raise Exception("Missing AI API Key configuration.")
+
+    outcome = outcome if outcome is not None else StreamOutcome()
+    choice = model_router.choose(route, prompt)
+    payload = _build_payload(choice, prompt, system_prompt, json_mode)
+    payload["stream"] = True
+
+    started = time.perf_counter()
+    with _track_inflight():
+        try:
+            async with _get_stream_client().stream(
+                "POST", OPENROUTER_API_URL, headers=_openrouter_headers(api_key), json=payload
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    logger.error(f"OpenRouter Error: {response.status_code} - {response.text}")
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    # Skip keep-alive comments (": OPENROUTER PROCESSING") and blank separators
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[len("data: "):]
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if choices and choices[0].get("finish_reason"):
+                        outcome.finish_reason = choices[0]["finish_reason"]
+                    if delta:
+                        yield delta
+        except Exception:
+            model_router.metrics.record(route, choice.model, time.perf_counter() - started, "error")
+            raise
+    model_router.metrics.record(
+        route, choice.model, time.perf_counter() - started, "quality_failure" if outcome.truncated else "ok"
+    )
+
+
+def _save_fir_result(ai_response_data: dict, user_id: str, fir_filename: str) -> dict:
+    """Saves an FIR analysis to Firestore and adds the meta info expected by the frontend."""
+    fir_doc_ref = db.collection('users').document(user_id).collection('firs').document()
+    firestore_data = {
+        "simplified_explanation": ai_response_data.get("simplified_explanation"),
+        "structured_summary": ai_response_data.get("structured_summary"),
+        "ipc_sections": ai_response_data.get("ipc_sections"),
+        "filename": fir_filename,
+        "uploaded_at": firestore.SERVER_TIMESTAMP,
+    }
+    fir_doc_ref.set(firestore_data)
+    history_cache.invalidate(user_id, "firs")
+
+    # Meta info for Frontend
+    ai_response_data["message"] = "FIR processed successfully by ArguMate!"
+    ai_response_data["fir_id"] = fir_doc_ref.id
+    return ai_response_data
+
+
+async def save_fir_explanation(ai_response_data: dict, user_id: str, fir_filename: str) -> dict:
+    """Saves a completed FIR analysis (e.g. one assembled from a stream) without blocking the event loop."""
+    return await asyncio.to_thread(_save_fir_result, ai_response_data, user_id, fir_filename)
+
+
+async def get_gemini_response_for_fir(prompt: str, user_id: str, fir_filename: str) -> dict:
+    """
+    Orchestrates the AI response for FIR explanation using OpenRouter.
+    Ensures identity as ArguMate and structured JSON output.
+    """
+    try:
+        ai_response_data = await request_json_completion(prompt)
+        return await asyncio.to_thread(_save_fir_result, ai_response_data, user_id, fir_filename)
 
     except Exception as e:
         logger.error(f"ArguMate Service Error: {e}")
-        raise Exception(f"ArguMate failed to process FIR: {e}")
\ No newline at end of file
+        raise Exception(f"ArguMate failed to process FIR: {e}")
+
+
+async def get_gemini_response_for_long_fir(
+    chunk_prompts: List[str],
+    build_reduce_prompt: Callable[[Dict], str],
+    user_id: str,
+    fir_filename: str,
+) -> dict:
+    """
+    Map-reduce variant of `get_gemini_response_for_fir` for documents that exceed a single prompt budget.
+    Chunk prompts are completed concurrently (bounded by FIR_MAP_CONCURRENCY), merged by a deterministic
+    reducer, and a final short completion writes the plain-language explanation from the merged result.
+    """
+    semaphore = asyncio.Semaphore(max(1, FIR_MAP_CONCURRENCY))
+
+    async def run_chunk(index: int, chunk_prompt: str) -> dict:
+        async with semaphore:
+            logger.info(f"Analysing FIR chunk {index + 1}/{len(chunk_prompts)} for user {user_id}")
+            return await request_json_completion(chunk_prompt, route="fir_chunk")
+
+    try:
+        partials = await asyncio.gather(*(run_chunk(i, p) for i, p in enumerate(chunk_prompts)))
+        merged = merge_partial_results(list(partials))
+
+        reduce_data = await request_json_completion(build_reduce_prompt(merged), route="fir_reduce")
+        ai_response_data = {
+            "simplified_explanation": reduce_data.get("simplified_explanation", ""),
+            "structured_summary": merged["structured_summary"],
+            "ipc_sections": merged["ipc_sections"],
+        }
+        return await asyncio.to_thread(_save_fir_result, ai_response_data, user_id, fir_filename)
+
+    except Exception as e:
+        logger.error(f"ArguMate Service Error (long FIR, {len(chunk_prompts)} chunks): {e}")
+        raise Exception(f"ArguMate failed to process FIR: {e}")
@@ -2,15 +2,22 @@
 
 import logging
 import io
+from typing import Optional
 import docx
 import PyPDF2
 from fastapi import UploadFile, HTTPException
 
+from app.services.fir_chunking import PAGE_BREAK
+from app.services.ocr_service import ProgressCallback, extract_page_pdf, ocr_available, ocr_pages
+
 logger = logging.getLogger(__name__)
 
-async def parse_document(file: UploadFile) -> str:
+async def parse_document(file: UploadFile, progress_callback: Optional[ProgressCallback] = None) -> str:
     """
     Parses the content of an uploaded file (PDF or DOCX) and returns the extracted text.
+    PDF pages are separated by PAGE_BREAK so long documents can be chunked on page boundaries.
+    Scanned PDF pages without a text layer are sent to OCR; `progress_callback(done, total)`
+    reports OCR progress to async callers.
     """
     file_extension = file.filename.split(".")[-1].lower()
     allowed_extensions = ["pdf", "docx"]
@@ -28,8 +35,20 @@ async def parse_document(file: UploadFile) -> str:
         if file_extension == "pdf":
             pdf_file = io.BytesIO(file_content)
             reader = PyPDF2.PdfReader(pdf_file)
-            for page in reader.pages:
-                text_content += page.extract_text() or ""
+            page_texts = [page.extract_text() or "" for page in reader.pages]
+
+            # Scanned pages have no text layer; recognize only those pages
+            scanned_pages = [i for i, text in enumerate(page_texts) if not text.strip()]
+            if scanned_pages and ocr_available():
+                logger.info(f"Running OCR on {len(scanned_pages)}/{len(page_texts)} scanned pages of {file.filename}.")
+                page_pdfs = [extract_page_pdf(reader, i) for i in scanned_pages]
+                ocr_texts = await ocr_pages(page_pdfs, progress_callback=progress_callback)
+                for index, text in zip(scanned_pages, ocr_texts):
+                    page_texts[index] = text
+            elif scanned_pages:
+                logger.warning(f"{len(scanned_pages)} pages of {file.filename} have no text layer and OCR is unavailable.")
+
+            text_content = PAGE_BREAK.join(page_texts)
         
         elif file_extension == "docx":
             doc = docx.Document(io.BytesIO(file_content))
@@ -0,0 +1,135 @@
+# app/services/fir_chunking.py
+import re
+from typing import Any, Dict, List
+
+# Page separator emitted by the document parser between PDF pages.
+PAGE_BREAK = "\f"
+
+# Summary fields where every chunk may hold a different part of the story,
+# so distinct values are joined instead of keeping only the first one.
+_CONCATENATED_FIELDS = {"brief_offence_description"}
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt budgeting."""
+    return (len(text) + 3) // 4
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Splits document text into chunks of at most `max_tokens` (estimated).
+    Page boundaries are preferred, then paragraphs, then sentences; a hard
+    character cut is only used for a single unit that is still too large.
+    """
+    max_chars = max_tokens * 4
+    units: List[str] = []
+    for page in text.split(PAGE_BREAK):
+        units.extend(_split_unit(page.strip(), max_chars))
+
+    chunks: List[str] = []
+    current = ""
+    for unit in units:
+        if not unit:
+            continue
+        candidate = f"{current}\n\n{unit}" if current else unit
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            if current:
+                chunks.append(current)
+            current = unit
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_unit(unit: str, max_chars: int) -> List[str]:
+    """Breaks a single page down until every piece fits within `max_chars`."""
+    if len(unit) <= max_chars:
+        return [unit]
+
+    for pattern in (_PARAGRAPH_SPLIT, re.compile(r"\n"), _SENTENCE_SPLIT):
+        parts = [p.strip() for p in pattern.split(unit) if p.strip()]
+        if len(parts) > 1:
+            pieces: List[str] = []
+            for part in parts:
+                pieces.extend(_split_unit(part, max_chars))
+            return pieces
+
+    return [unit[i:i + max_chars] for i in range(0, len(unit), max_chars)]
+
+
+def _normalize_section(section: str) -> str:
+    """Normalizes an IPC section label so 'IPC Sec. 420' and 'Section 420 IPC' compare equal."""
+    tokens = re.findall(r"[a-z]+|\d+[a-z]?", section.lower())
+    return " ".join(sorted(t for t in tokens if t not in {"section", "sec", "s", "u"}))
+
+
+def merge_partial_results(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Deterministically merges per-chunk FIR extractions (in document order) into one result.
+    - Scalar summary fields keep the first non-empty value.
+    - List summary fields are unioned, preserving first-seen order; a scalar from another chunk
+      joins the list instead of being dropped.
+    - IPC sections are de-duplicated by normalized section label.
+    - Per-chunk key points are collected for the final explanation step.
+    """
+    structured_summary: Dict[str, Any] = {}
+    ipc_sections: List[Dict[str, str]] = []
+    seen_sections = set()
+    key_points: List[str] = []
+
+    for partial in partials:
+        summary = partial.get("structured_summary") or {}
+        if isinstance(summary, dict):
+            for key, value in summary.items():
+                _merge_summary_field(structured_summary, key, value)
+
+        for item in partial.get("ipc_sections") or []:
+            if not isinstance(item, dict) or not item.get("section"):
+                continue
+            normalized = _normalize_section(str(item["section"]))
+            if normalized in seen_sections:
+                continue
+            seen_sections.add(normalized)
+            ipc_sections.append({"section": str(item["section"]), "reason": str(item.get("reason", ""))})
+
+        point = partial.get("key_points")
+        if isinstance(point, list):
+            point = " ".join(str(p) for p in point)
+        if point and str(point).strip():
+            key_points.append(str(point).strip())
+
+    return {
+        "structured_summary": structured_summary,
+        "ipc_sections": ipc_sections,
+        "key_points": key_points,
+    }
+
+
+def _merge_summary_field(merged: Dict[str, Any], key: str, value: Any) -> None:
+    if value in (None, "", [], {}):
+        merged.setdefault(key, value if value is not None else "")
+        return
+
+    existing = merged.get(key)
+    if isinstance(value, list) or isinstance(existing, list):
+        # A chunk may name one person as a scalar and another chunk several as a list; keep them all
+        if isinstance(existing, list):
+            combined = list(existing)
+        else:
+            combined = [] if existing in (None, "", {}) else [existing]
+        seen = {str(v).strip().lower() for v in combined}
+        for item in value if isinstance(value, list) else [value]:
+            marker = str(item).strip().lower()
+            if marker and marker not in seen:
+                seen.add(marker)
+                combined.append(item)
+        merged[key] = combined
+    elif existing in (None, "", [], {}):
+        merged[key] = value
+    elif key in _CONCATENATED_FIELDS and str(value).strip() not in str(existing):
+        merged[key] = f"{existing} {str(value).strip()}"
@@ -0,0 +1,107 @@
+# app/services/history_cache.py
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# (body, etag) of a serialized history response
+CachedPage = Tuple[bytes, str]
+
+
+class HistoryCache:
+    """
+    Per-user read-through cache for history list/detail responses.
+    Write paths call `invalidate(uid, kind)` after saving, so a user's next read is fresh.
+    Readers capture `generation(uid, kind)` before reading Firestore and pass it to `put`, which
+    skips caching a page if an invalidation ran while the read was in flight.
+    Entries also expire after `ttl_seconds`, which bounds staleness across multiple workers
+    (invalidation only reaches the worker that handled the write). Each user keeps at most
+    `max_entries_per_user` pages; expired pages are dropped whenever one of the user's pages is cached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60,
+        max_users: int = 2000,
+        max_entries_per_user: int = 64,
+        max_generations: int = 50000,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.max_entries_per_user = max_entries_per_user
+        self.max_generations = max_generations
+        self._users: "OrderedDict[str, Dict[tuple, Tuple[float, CachedPage]]]" = OrderedDict()
+        # Generation of each (uid, kind), taken from one increasing counter. Evicted pairs report
+        # `_generation_floor` (the highest evicted value), so eviction can never make a stale
+        # generation look current again.
+        self._generations: "OrderedDict[Tuple[str, Optional[str]], int]" = OrderedDict()
+        self._counter = itertools.count(1)
+        self._generation_floor = 0
+        # Write paths may invalidate from worker threads (e.g. Firestore saves run via asyncio.to_thread)
+        self._lock = threading.Lock()
+
+    def get(self, uid: str, key: tuple) -> Optional[CachedPage]:
+        with self._lock:
+            return self._get(uid, key)
+
+    def _get(self, uid: str, key: tuple) -> Optional[CachedPage]:
+        entries = self._users.get(uid)
+        if not entries or key not in entries:
+            return None
+        expires_at, page = entries[key]
+        if expires_at < time.monotonic():
+            del entries[key]
+            return None
+        self._users.move_to_end(uid)
+        return page
+
+    def generation(self, uid: str, kind: str) -> Tuple[int, int]:
+        """Capture before reading the data to be cached; pass the result to `put`."""
+        with self._lock:
+            return self._generation(uid, None), self._generation(uid, kind)
+
+    def _generation(self, uid: str, kind: Optional[str]) -> int:
+        return self._generations.get((uid, kind), self._generation_floor)
+
+    def _bump(self, uid: str, kind: Optional[str]) -> None:
+        self._generations[(uid, kind)] = next(self._counter)
+        self._generations.move_to_end((uid, kind))
+        while len(self._generations) > self.max_generations:
+            _, evicted = self._generations.popitem(last=False)
+            self._generation_floor = max(self._generation_floor, evicted)
+
+    def put(self, uid: str, key: tuple, page: CachedPage, generation: Optional[Tuple[int, int]] = None) -> None:
+        """Caches a page, unless `generation` was captured before an invalidation of its kind."""
+        with self._lock:
+            if generation is not None and generation != (self._generation(uid, None), self._generation(uid, key[0])):
+                return
+            now = time.monotonic()
+            entries = self._users.setdefault(uid, {})
+            # Every list page (limit, cursor, fields) is its own key, so prune here rather than on reads
+            for expired in [k for k, (expires_at, _) in entries.items() if expires_at < now]:
+                del entries[expired]
+            # Re-inserted keys move to the end, so the oldest page is evicted first
+            entries.pop(key, None)
+            entries[key] = (now + self.ttl_seconds, page)
+            while len(entries) > self.max_entries_per_user:
+                del entries[next(iter(entries))]
+            self._users.move_to_end(uid)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def invalidate(self, uid: str, kind: Optional[str] = None) -> None:
+        """Drops a user's cached pages for one history kind (keys start with the kind), or all of them."""
+        with self._lock:
+            self._bump(uid, kind)
+            entries = self._users.get(uid)
+            if not entries:
+                return
+            if kind is None:
+                del self._users[uid]
+                return
+            for key in [k for k in entries if k[0] == kind]:
+                del entries[key]
+
+
+history_cache = HistoryCache()
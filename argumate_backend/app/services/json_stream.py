@@ -0,0 +1,108 @@
+# app/services/json_stream.py
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class TopLevelFieldParser:
+    """
+    Incrementally parses a streamed JSON object and reports each top-level field as soon as its
+    value is complete, e.g. "simplified_explanation" long before "ipc_sections" has been generated.
+    Text before the opening brace (such as a markdown fence) is ignored. Feeding is linear in the
+    total input: every character is scanned once.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "start"  # start -> key -> colon -> value -> in_value -> after_value -> key ... -> done
+        self._key: Optional[str] = None
+        self._token_start: Optional[int] = None
+        self.fields: Dict[str, Any] = {}
+
+    @property
+    def done(self) -> bool:
+        """True once the closing brace of the top-level object has been seen."""
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consumes more text and returns the (key, value) pairs completed by it."""
+        self._buffer += chunk
+        completed: List[Tuple[str, Any]] = []
+
+        while self._pos < len(self._buffer) and self._state != "done":
+            ch = self._buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self._key = json.loads(self._buffer[self._token_start:self._pos + 1])
+                        self._state = "colon"
+                    elif self._depth == 1 and self._state == "in_value":
+                        self._emit(self._pos + 1, completed)
+                self._pos += 1
+                continue
+
+            if self._state == "start":
+                if ch == "{":
+                    self._depth = 1
+                    self._state = "key"
+            elif self._state == "key":
+                if ch == '"':
+                    self._in_string = True
+                    self._token_start = self._pos
+                elif ch == "}":
+                    self._depth = 0
+                    self._state = "done"
+            elif self._state == "colon":
+                if ch == ":":
+                    self._state = "value"
+            elif self._state == "value":
+                if not ch.isspace():
+                    self._state = "in_value"
+                    self._token_start = self._pos
+                    continue  # re-process this character as the start of the value
+            elif self._state == "in_value":
+                if ch == '"':
+                    self._in_string = True
+                elif ch in "{[":
+                    self._depth += 1
+                elif ch in "}]":
+                    if self._depth == 1:
+                        # A scalar value ends at the closing brace of the object
+                        self._emit(self._pos, completed)
+                        self._depth = 0
+                        self._state = "done"
+                    else:
+                        self._depth -= 1
+                        if self._depth == 1:
+                            self._emit(self._pos + 1, completed)
+                elif ch == "," and self._depth == 1:
+                    # A scalar value ends at the separator, which is consumed here
+                    self._emit(self._pos, completed)
+                    self._state = "key"
+            elif self._state == "after_value":
+                if ch == ",":
+                    self._state = "key"
+                elif ch == "}":
+                    self._depth = 0
+                    self._state = "done"
+
+            self._pos += 1
+
+        return completed
+
+    def _emit(self, end: int, completed: List[Tuple[str, Any]]) -> None:
+        raw = self._buffer[self._token_start:end].strip()
+        value = json.loads(raw)
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+        self._state = "after_value"
+        self._key = None
@@ -0,0 +1,157 @@
+# app/services/model_router.py
+import logging
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import AI_DEFAULT_MODEL, AI_FAST_MODEL, MODEL_ROUTING_POLICIES
+from app.services.fir_chunking import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """How the AI calls of one endpoint (a "route") are routed."""
+    light_model: str
+    heavy_model: str
+    # Prompts estimated above this many tokens are sent to `heavy_model`
+    heavy_above_tokens: int
+    # Output cap sized to the route's response schema
+    max_tokens: int
+    # Top-level keys the response schema needs; a JSON reply missing one counts as a quality failure
+    expected_keys: Tuple[str, ...] = ()
+    # Output cap of the heavy-model retry after a light-model reply hit `max_tokens`; 0 means twice `max_tokens`
+    escalation_max_tokens: int = 0
+
+
+@dataclass(frozen=True)
+class RouteChoice:
+    route: str
+    model: str
+    tier: str
+    max_tokens: int
+    # Model to retry on after a quality failure, if different from `model`
+    escalation_model: Optional[str]
+
+
+def default_policies(default_model: str, fast_model: str) -> Dict[str, RoutePolicy]:
+    """
+    Built-in policies. Short, simple tasks (chat, draft validation, timelines, explaining an outcome the
+    local model already predicted) go to the fast model; FIR analysis, legal research and argument
+    building always use the default model.
+    """
+    return {
+        "chat": RoutePolicy(fast_model, default_model, 600, 1024),
+        "fir_validate": RoutePolicy(fast_model, default_model, 1500, 800, ("overall_score", "validation_points")),
+        "timeline": RoutePolicy(fast_model, default_model, 1500, 900, ("timeline_steps",)),
+        "timeline_adapt": RoutePolicy(fast_model, default_model, 1500, 700, ("descriptions",)),
+        "prediction_reasoning": RoutePolicy(fast_model, default_model, 1500, 400, ("reasoning",)),
+        "prediction": RoutePolicy(default_model, default_model, 0, 500,
+                                  ("predicted_outcome", "confidence_score", "reasoning")),
+        "arguments": RoutePolicy(default_model, default_model, 0, 1500,
+                                 ("prosecution_arguments", "defense_arguments")),
+        "case_retrieval": RoutePolicy(default_model, default_model, 0, 1200, ("similar_cases",)),
+        "fir_explain": RoutePolicy(default_model, default_model, 0, 4096,
+                                   ("simplified_explanation", "structured_summary", "ipc_sections")),
+        "fir_chunk": RoutePolicy(default_model, default_model, 0, 2048,
+                                 ("structured_summary", "ipc_sections", "key_points")),
+        "fir_reduce": RoutePolicy(default_model, default_model, 0, 1536, ("simplified_explanation",)),
+    }
+
+
+def build_policies(default_model: str, fast_model: str, overrides: Dict[str, Dict[str, Any]]) -> Dict[str, RoutePolicy]:
+    """Applies per-route overrides (e.g. {"chat": {"heavy_above_tokens": 400}}) to the built-in policies."""
+    policies = default_policies(default_model, fast_model)
+    known_fields = {f.name for f in fields(RoutePolicy)}
+    for route, values in overrides.items():
+        unknown = set(values) - known_fields
+        if unknown:
+            logger.warning(f"Ignoring unknown routing policy fields for '{route}': {sorted(unknown)}")
+        values = {k: tuple(v) if k == "expected_keys" else v for k, v in values.items() if k in known_fields}
+        base = policies.get(route) or RoutePolicy(default_model, default_model, 0, 2048)
+        policies[route] = replace(base, **values)
+    return policies
+
+
+class RouteMetrics:
+    """Per (route, model) call counts, failure rates and a sliding window of latencies."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def record(self, route: str, model: str, latency_seconds: float, outcome: str = "ok") -> None:
+        """Records one call; `outcome` is "ok", "error" (upstream/HTTP failure) or "quality_failure"."""
+        stats = self._stats.setdefault((route, model), {
+            "calls": 0, "errors": 0, "quality_failures": 0, "latencies": deque(maxlen=self.window),
+        })
+        stats["calls"] += 1
+        if outcome == "error":
+            stats["errors"] += 1
+        elif outcome == "quality_failure":
+            stats["quality_failures"] += 1
+        stats["latencies"].append(latency_seconds)
+
+    def snapshot(self) -> List[dict]:
+        rows = []
+        for (route, model), stats in sorted(self._stats.items()):
+            latencies: Deque[float] = stats["latencies"]
+            p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (0.0, 0.0)
+            rows.append({
+                "route": route,
+                "model": model,
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "quality_failures": stats["quality_failures"],
+                "quality_failure_rate": stats["quality_failures"] / stats["calls"],
+                "p50_latency_ms": round(float(p50) * 1000, 1),
+                "p95_latency_ms": round(float(p95) * 1000, 1),
+            })
+        return rows
+
+
+class ModelRouter:
+    """
+    Chooses the model and output cap for each AI call from its route's policy and a local
+    token estimate of the prompt, and checks replies against the route's expected keys.
+    """
+
+    def __init__(self, policies: Dict[str, RoutePolicy], default_model: str):
+        self.policies = policies
+        self.default_model = default_model
+        self.metrics = RouteMetrics()
+
+    def policy(self, route: str) -> RoutePolicy:
+        policy = self.policies.get(route)
+        if policy is None:
+            policy = RoutePolicy(self.default_model, self.default_model, 0, 2048)
+        return policy
+
+    def choose(self, route: str, prompt: str) -> RouteChoice:
+        policy = self.policy(route)
+        if policy.light_model != policy.heavy_model and estimate_tokens(prompt) <= policy.heavy_above_tokens:
+            return RouteChoice(route, policy.light_model, "light", policy.max_tokens, policy.heavy_model)
+        return RouteChoice(route, policy.heavy_model, "heavy", policy.max_tokens, None)
+
+    def escalate(self, choice: RouteChoice, truncated: bool) -> RouteChoice:
+        """
+        The heavy-model retry after a quality failure of `choice`. A truncated reply is retried with the
+        route's larger escalation cap, since the same cap would cut the heavy model's reply off too.
+        """
+        policy = self.policy(choice.route)
+        max_tokens = choice.max_tokens
+        if truncated:
+            max_tokens = max(max_tokens, policy.escalation_max_tokens or 2 * policy.max_tokens)
+        return RouteChoice(choice.route, choice.escalation_model, "heavy", max_tokens, None)
+
+    def has_expected_keys(self, route: str, data: Any) -> bool:
+        return isinstance(data, dict) and all(key in data for key in self.policy(route).expected_keys)
+
+
+model_router = ModelRouter(
+    build_policies(AI_DEFAULT_MODEL, AI_FAST_MODEL, MODEL_ROUTING_POLICIES),
+    default_model=AI_DEFAULT_MODEL,
+)
@@ -0,0 +1,160 @@
+# app/services/ocr_service.py
+import asyncio
+import hashlib
+import inspect
+import io
+import logging
+import os
+import shutil
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Optional, Union
+
+import PyPDF2
+
+# OCR is optional: it needs the Tesseract and Poppler binaries on the host.
+try:
+    import pytesseract
+    from pdf2image import convert_from_bytes
+    _OCR_LIBS_AVAILABLE = True
+except ImportError:
+    _OCR_LIBS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Settings are read here rather than from app.core.config so that OCR worker
+# processes can import this module without initializing Firebase.
+OCR_ENABLED = os.getenv('OCR_ENABLED', 'true').lower() == 'true'
+OCR_LANGUAGES = os.getenv('OCR_LANGUAGES', 'eng')  # e.g. "eng+hin" for bilingual FIRs
+OCR_DPI = int(os.getenv('OCR_DPI', '300'))
+OCR_MAX_WORKERS = int(os.getenv('OCR_MAX_WORKERS', str(os.cpu_count() or 1)))
+OCR_CACHE_SIZE = int(os.getenv('OCR_CACHE_SIZE', '512'))
+
+ProgressCallback = Callable[[int, int], Union[None, Awaitable[None]]]
+
+_executor: Optional[ProcessPoolExecutor] = None
+_page_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+@lru_cache(maxsize=1)
+def _ocr_binaries_installed() -> bool:
+    missing = [
+        program for program in (pytesseract.pytesseract.tesseract_cmd, "pdftoppm")
+        if shutil.which(program) is None
+    ]
+    if missing:
+        logger.warning(f"OCR is disabled: {', '.join(missing)} not found on PATH.")
+    return not missing
+
+
+def ocr_available() -> bool:
+    """Returns True when OCR is enabled and the OCR libraries and the tesseract/pdftoppm programs are installed."""
+    return OCR_ENABLED and _OCR_LIBS_AVAILABLE and _ocr_binaries_installed()
+
+
+def extract_page_pdf(reader: PyPDF2.PdfReader, page_index: int) -> bytes:
+    """Copies a single page into a standalone PDF so it can be hashed and sent to a worker process."""
+    writer = PyPDF2.PdfWriter()
+    writer.add_page(reader.pages[page_index])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _ocr_page(page_pdf: bytes, dpi: int, languages: str) -> str:
+    """Rasterizes and recognizes one single-page PDF. Runs inside a worker process."""
+    images = convert_from_bytes(page_pdf, dpi=dpi, first_page=1, last_page=1)
+    if not images:
+        return ""
+    return pytesseract.image_to_string(images[0], lang=languages)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max(1, OCR_MAX_WORKERS))
+    return _executor
+
+
+def _cache_get(key: str) -> Optional[str]:
+    text = _page_cache.get(key)
+    if text is not None:
+        _page_cache.move_to_end(key)
+    return text
+
+
+def _cache_put(key: str, text: str) -> None:
+    _page_cache[key] = text
+    _page_cache.move_to_end(key)
+    while len(_page_cache) > OCR_CACHE_SIZE:
+        _page_cache.popitem(last=False)
+
+
+async def ocr_pages(
+    page_pdfs: List[bytes],
+    progress_callback: Optional[ProgressCallback] = None,
+    executor: Optional[Executor] = None,
+    use_cache: bool = True,
+) -> List[str]:
+    """
+    Runs OCR on single-page PDFs in parallel across a process pool and returns the text per page.
+    Results are cached by the SHA-256 of the page, so re-uploads of the same scan skip recognition.
+    `progress_callback(done, total)` is called (and awaited if it is a coroutine function) as pages finish.
+    A page whose recognition fails yields "" (and is not cached), so a broken OCR backend never fails an upload.
+    """
+    total = len(page_pdfs)
+    results: List[Optional[str]] = [None] * total
+    keys = [hashlib.sha256(page).hexdigest() for page in page_pdfs]
+    done = 0
+
+    async def report() -> None:
+        if progress_callback is None:
+            return
+        outcome = progress_callback(done, total)
+        if inspect.isawaitable(outcome):
+            await outcome
+
+    pending = {}
+    for index, key in enumerate(keys):
+        cached = _cache_get(key) if use_cache else None
+        if cached is not None:
+            results[index] = cached
+            done += 1
+        else:
+            pending.setdefault(key, []).append(index)
+    if done:
+        logger.info(f"OCR cache hit for {done}/{total} pages.")
+        await report()
+
+    if pending:
+        loop = asyncio.get_running_loop()
+        pool = executor or _get_executor()
+
+        async def recognize(key: str, page_pdf: bytes):
+            try:
+                text = await loop.run_in_executor(pool, _ocr_page, page_pdf, OCR_DPI, OCR_LANGUAGES)
+            except Exception as e:
+                logger.warning(f"OCR failed for a page; continuing without its text: {e}")
+                return key, None
+            return key, text
+
+        tasks = [
+            asyncio.ensure_future(recognize(key, page_pdfs[indexes[0]]))
+            for key, indexes in pending.items()
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key, text = await next_done
+                for index in pending[key]:
+                    results[index] = text
+                    done += 1
+                if use_cache and text is not None:
+                    _cache_put(key, text)
+                await report()
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    return [text or "" for text in results]
@@ -0,0 +1,256 @@
+# app/services/outcome_model.py
+"""
+Local judgment-outcome classifier used by /predict/outcome.
+
+A multinomial logistic regression over hashed word n-grams. The trained weights are plain
+NumPy arrays that are memory-mapped at startup, so scoring is a sparse gather + sum.
+
+Train offline from a labelled JSONL dataset (one {"case_summary": ..., "outcome": ...} per line):
+    python -m app.services.outcome_model --data judgments.jsonl --out models/outcome_model
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.text_features import hash_features, stable_hash, tokenize, word_ngrams
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_N_FEATURES = 2 ** 18
+DEFAULT_MAX_NGRAM = 2
+
+_model: Optional["OutcomeModel"] = None
+
+
+@dataclass
+class OutcomePrediction:
+    """A single scored case summary."""
+    predicted_outcome: str
+    confidence_score: int  # A percentage from 0 to 100
+    probabilities: Dict[str, float]
+    top_indicators: List[str]
+
+
+class OutcomeModel:
+    """Hashed n-gram linear classifier with weights of shape (n_features, n_classes)."""
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, labels: List[str], max_ngram: int):
+        self.weights = weights
+        self.bias = bias
+        self.labels = labels
+        self.max_ngram = max_ngram
+        self.n_features = weights.shape[0]
+
+    @classmethod
+    def load(cls, model_dir: str) -> "OutcomeModel":
+        """Loads a trained model; the weight matrix is memory-mapped rather than read into memory."""
+        with open(os.path.join(model_dir, "meta.json"), "r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        weights = np.load(os.path.join(model_dir, "weights.npy"), mmap_mode="r")
+        bias = np.load(os.path.join(model_dir, "bias.npy"))
+        return cls(weights, bias, meta["labels"], meta["max_ngram"])
+
+    def _featurize(self, text: str) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        grams = word_ngrams(tokenize(text), self.max_ngram)
+        indices, values = hash_features(grams, self.n_features)
+        return grams, indices, values
+
+    def _probabilities(self, logits: np.ndarray) -> np.ndarray:
+        shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return shifted / shifted.sum(axis=-1, keepdims=True)
+
+    def predict(self, text: str, n_indicators: int = 3) -> OutcomePrediction:
+        """Scores one case summary and names the n-grams that pushed hardest toward the prediction."""
+        grams, indices, values = self._featurize(text)
+        logits = values @ self.weights[indices] + self.bias
+        probabilities = self._probabilities(logits)
+        best = int(np.argmax(probabilities))
+
+        # Per-gram contribution to the winning class, for a human-readable explanation
+        column = self.weights[:, best]
+        scale = dict(zip(indices.tolist(), values.tolist()))
+        contributions: Dict[str, float] = {}
+        for gram in grams:
+            index = stable_hash(gram) % self.n_features
+            contributions[gram] = float(column[index]) * scale[index]
+        top = sorted(contributions, key=contributions.get, reverse=True)[:n_indicators]
+
+        return OutcomePrediction(
+            predicted_outcome=self.labels[best],
+            confidence_score=int(round(float(probabilities[best]) * 100)),
+            probabilities={label: float(p) for label, p in zip(self.labels, probabilities)},
+            top_indicators=[gram for gram in top if contributions[gram] > 0],
+        )
+
+    def predict_batch(self, texts: List[str]) -> List[OutcomePrediction]:
+        """Scores many summaries with one gather and one segmented sum over all non-zero features."""
+        if not texts:
+            return []
+        featurized = [self._featurize(text)[1:] for text in texts]
+        lengths = np.array([len(indices) for indices, _ in featurized])
+        all_indices = np.concatenate([indices for indices, _ in featurized])
+        all_values = np.concatenate([values for _, values in featurized])
+
+        logits = np.tile(self.bias.astype(np.float64), (len(texts), 1))
+        if all_indices.size:
+            contributions = self.weights[all_indices] * all_values[:, None]
+            rows = np.repeat(np.arange(len(texts)), lengths)
+            np.add.at(logits, rows, contributions)
+        probabilities = self._probabilities(logits)
+        best = probabilities.argmax(axis=1)
+
+        return [
+            OutcomePrediction(
+                predicted_outcome=self.labels[b],
+                confidence_score=int(round(float(p[b]) * 100)),
+                probabilities={label: float(value) for label, value in zip(self.labels, p)},
+                top_indicators=[],
+            )
+            for b, p in zip(best.tolist(), probabilities)
+        ]
+
+
+def init_outcome_model(model_dir: str) -> Optional[OutcomeModel]:
+    """Loads the model at startup. Returns None (LLM-only prediction) if no trained model exists."""
+    global _model
+    if not os.path.exists(os.path.join(model_dir, "meta.json")):
+        logger.warning(f"No outcome model found at '{model_dir}'. /predict/outcome will use the LLM only.")
+        _model = None
+        return None
+    _model = OutcomeModel.load(model_dir)
+    logger.info(f"Outcome model loaded from '{model_dir}' with labels {_model.labels}.")
+    return _model
+
+
+def get_outcome_model() -> Optional[OutcomeModel]:
+    """Returns the model loaded by `init_outcome_model`, or None if unavailable."""
+    return _model
+
+
+# --- Offline training ---
+
+def _load_dataset(path: str) -> Tuple[List[str], List[str]]:
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record.get("case_summary") or record.get("text")
+            label = record.get("outcome") or record.get("label")
+            if text and label:
+                texts.append(text)
+                labels.append(str(label).strip())
+    return texts, labels
+
+
+def train_outcome_model(
+    texts: List[str],
+    labels: List[str],
+    n_features: int = DEFAULT_N_FEATURES,
+    max_ngram: int = DEFAULT_MAX_NGRAM,
+    epochs: int = 10,
+    learning_rate: float = 0.5,
+    l2: float = 1e-6,
+    batch_size: int = 64,
+    seed: int = 13,
+) -> OutcomeModel:
+    """Fits a softmax regression with mini-batch SGD on hashed sparse features."""
+    classes = sorted(set(labels))
+    class_index = {label: i for i, label in enumerate(classes)}
+    targets = np.array([class_index[label] for label in labels])
+
+    docs = [hash_features(word_ngrams(tokenize(text), max_ngram), n_features) for text in texts]
+    weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+    bias = np.zeros(len(classes), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(docs))
+        step = learning_rate / (1.0 + epoch)
+        loss = 0.0
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            lengths = np.array([len(docs[i][0]) for i in batch])
+            indices = np.concatenate([docs[i][0] for i in batch])
+            values = np.concatenate([docs[i][1] for i in batch])
+            rows = np.repeat(np.arange(len(batch)), lengths)
+
+            logits = np.tile(bias, (len(batch), 1))
+            np.add.at(logits, rows, weights[indices] * values[:, None])
+            logits -= logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            loss -= np.log(probabilities[np.arange(len(batch)), targets[batch]] + 1e-12).sum()
+
+            delta = probabilities
+            delta[np.arange(len(batch)), targets[batch]] -= 1.0
+            delta /= len(batch)
+            gradient = delta[rows] * values[:, None]
+            np.add.at(weights, indices, -step * gradient)
+            weights[np.unique(indices)] *= (1.0 - step * l2)
+            bias -= step * delta.sum(axis=0)
+        logger.info(f"Epoch {epoch + 1}/{epochs}: mean loss {loss / len(docs):.4f}")
+
+    return OutcomeModel(weights, bias, classes, max_ngram)
+
+
+def save_outcome_model(model: OutcomeModel, model_dir: str, extra_meta: Optional[dict] = None) -> None:
+    """Writes weights.npy / bias.npy (mmap-able) and meta.json."""
+    os.makedirs(model_dir, exist_ok=True)
+    np.save(os.path.join(model_dir, "weights.npy"), np.ascontiguousarray(model.weights, dtype=np.float32))
+    np.save(os.path.join(model_dir, "bias.npy"), np.asarray(model.bias, dtype=np.float32))
+    meta = {
+        "labels": model.labels,
+        "max_ngram": model.max_ngram,
+        "n_features": model.n_features,
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    meta.update(extra_meta or {})
+    with open(os.path.join(model_dir, "meta.json"), "w", encoding="utf-8") as handle:
+        json.dump(meta, handle, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the local judgment-outcome model.")
+    parser.add_argument("--data", required=True, help="JSONL file with 'case_summary' and 'outcome' fields.")
+    parser.add_argument("--out", default="models/outcome_model", help="Output model directory.")
+    parser.add_argument("--features", type=int, default=DEFAULT_N_FEATURES)
+    parser.add_argument("--max-ngram", type=int, default=DEFAULT_MAX_NGRAM)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--holdout", type=float, default=0.1, help="Fraction held out for accuracy reporting.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    texts, labels = _load_dataset(args.data)
+    if len(set(labels)) < 2:
+        raise SystemExit("The dataset needs at least two distinct outcome labels.")
+
+    order = np.random.default_rng(0).permutation(len(texts))
+    cut = int(len(texts) * (1 - args.holdout))
+    train_idx, test_idx = order[:cut], order[cut:]
+
+    model = train_outcome_model(
+        [texts[i] for i in train_idx], [labels[i] for i in train_idx],
+        n_features=args.features, max_ngram=args.max_ngram, epochs=args.epochs,
+    )
+
+    extra_meta = {"n_samples": int(len(train_idx))}
+    if len(test_idx):
+        predictions = model.predict_batch([texts[i] for i in test_idx])
+        correct = sum(p.predicted_outcome == labels[i] for p, i in zip(predictions, test_idx))
+        extra_meta["holdout_accuracy"] = round(correct / len(test_idx), 4)
+        logger.info(f"Holdout accuracy: {extra_meta['holdout_accuracy']:.2%} on {len(test_idx)} cases")
+
+    save_outcome_model(model, args.out, extra_meta)
+    logger.info(f"Model saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
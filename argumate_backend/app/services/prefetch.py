@@ -0,0 +1,250 @@
+# app/services/prefetch.py
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.core.config import (
+    PREFETCH_ENABLED, PREFETCH_TTL_SECONDS, PREFETCH_BUDGET_PER_HOUR,
+    PREFETCH_CONCURRENCY, PREFETCH_MAX_FOREGROUND_INFLIGHT,
+)
+from app.services.ai_service import background_priority, foreground_inflight
+
+logger = logging.getLogger(__name__)
+
+# Produces the response payload of a follow-up endpoint (e.g. /arguments/build) for a case summary
+Producer = Callable[[str], Awaitable[Dict[str, Any]]]
+PrefetchKey = Tuple[str, str, str]
+
+# How often a running prefetch re-checks the foreground load
+LOAD_CHECK_INTERVAL_SECONDS = 0.25
+
+_SUMMARY_FIELDS = (
+    ("brief_offence_description", "Offence"),
+    ("accused_name_s", "Accused"),
+    ("complainant_name", "Complainant"),
+    ("victim_name_s", "Victim"),
+    ("date_of_incident", "Date of incident"),
+    ("place_of_incident", "Place of incident"),
+    ("police_station", "Police station"),
+)
+
+
+def build_case_summary(structured_summary: Dict[str, Any], ipc_sections: list) -> str:
+    """
+    Derives a deterministic case summary from an FIR explanation. The same explanation always yields
+    the same text, so a client that sends it back to a follow-up endpoint hits the prefetched result.
+    """
+    parts = []
+    for key, label in _SUMMARY_FIELDS:
+        value = structured_summary.get(key)
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value if v)
+        if value:
+            parts.append(f"{label}: {str(value).strip()}.")
+    sections = [str(s.get("section", "")).strip() for s in ipc_sections or [] if isinstance(s, dict)]
+    sections = [s for s in sections if s]
+    if sections:
+        parts.append(f"Sections invoked: {', '.join(sections)}.")
+    return " ".join(parts)
+
+
+def _summary_digest(case_summary: str) -> str:
+    return hashlib.sha256(" ".join(case_summary.split()).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PrefetchEntry:
+    task: asyncio.Task
+    created_at: float
+
+
+@dataclass
+class PrefetchStats:
+    scheduled: int = 0
+    skipped_budget: int = 0
+    skipped_load: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    hits: int = 0
+    misses: int = 0
+    wasted: int = 0
+    by_endpoint: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of follow-up requests that were served from a prefetch."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def waste_ratio(self) -> float:
+        """Share of finished prefetches that were never used."""
+        finished = self.hits + self.wasted
+        return self.wasted / finished if finished else 0.0
+
+
+class Prefetcher:
+    """
+    Warms follow-up results (arguments, timeline, prediction) for a case summary in the background.
+    Prefetches run at low priority: they are not started while the worker already has
+    `max_foreground_inflight` user-facing AI calls in flight, are cancelled if that load is reached
+    while they run, and each user may only trigger `budget_per_hour` of them. A result is kept for
+    `ttl_seconds` and handed out once; results that expire unused are counted as waste.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        ttl_seconds: float = 900,
+        budget_per_hour: int = 30,
+        max_concurrency: int = 2,
+        max_foreground_inflight: int = 8,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.budget_per_hour = budget_per_hour
+        self.max_concurrency = max_concurrency
+        self.max_foreground_inflight = max_foreground_inflight
+        self._producers: Dict[str, Producer] = {}
+        self._entries: Dict[PrefetchKey, PrefetchEntry] = {}
+        self._spent: Dict[str, Deque[float]] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = PrefetchStats()
+
+    def register(self, endpoint: str, producer: Producer) -> None:
+        """Registers the producer a follow-up endpoint uses, so it can be prefetched."""
+        self._producers[endpoint] = producer
+
+    def _count(self, endpoint: str, counter: str) -> None:
+        counters = self.stats.by_endpoint.setdefault(endpoint, {})
+        counters[counter] = counters.get(counter, 0) + 1
+
+    def _overloaded(self) -> bool:
+        return foreground_inflight() >= self.max_foreground_inflight
+
+    def _take_budget(self, uid: str, now: float) -> bool:
+        spent = self._spent.setdefault(uid, deque())
+        while spent and now - spent[0] > 3600:
+            spent.popleft()
+        if len(spent) >= self.budget_per_hour:
+            return False
+        spent.append(now)
+        return True
+
+    def _sweep(self, now: float) -> None:
+        """
+        Drops expired entries, counting finished-but-unused results as waste, and the budgets of users
+        without a prefetch in the last hour.
+        """
+        for uid in [u for u, spent in self._spent.items() if not spent or now - spent[-1] > 3600]:
+            del self._spent[uid]
+        for key in [k for k, e in self._entries.items() if now - e.created_at > self.ttl_seconds]:
+            entry = self._entries.pop(key)
+            if not entry.task.done():
+                entry.task.cancel()
+            elif not entry.task.cancelled() and entry.task.result() is not None:
+                self.stats.wasted += 1
+                self._count(key[1], "wasted")
+
+    def schedule(self, uid: str, case_summary: str) -> int:
+        """Starts background prefetches of every registered endpoint; returns how many were started."""
+        if not self.enabled or not case_summary:
+            return 0
+        now = time.monotonic()
+        self._sweep(now)
+        if self._overloaded():
+            self.stats.skipped_load += 1
+            return 0
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        digest = _summary_digest(case_summary)
+        started = 0
+        for endpoint, producer in self._producers.items():
+            key = (uid, endpoint, digest)
+            if key in self._entries:
+                continue
+            if not self._take_budget(uid, now):
+                self.stats.skipped_budget += 1
+                break
+            task = asyncio.create_task(self._run(endpoint, producer, case_summary))
+            self._entries[key] = PrefetchEntry(task, now)
+            self.stats.scheduled += 1
+            self._count(endpoint, "scheduled")
+            started += 1
+        if started:
+            logger.info(f"Prefetching {started} follow-up analyses for user {uid}")
+        return started
+
+    async def _run(self, endpoint: str, producer: Producer, case_summary: str) -> Optional[Dict[str, Any]]:
+        # Runs in its own task, so the flag only marks this prefetch's AI calls as background work
+        background_priority.set(True)
+        async with self._semaphore:
+            if self._overloaded():
+                self.stats.cancelled += 1
+                self._count(endpoint, "cancelled")
+                return None
+            work = asyncio.ensure_future(producer(case_summary))
+            try:
+                while True:
+                    done, _ = await asyncio.wait({work}, timeout=LOAD_CHECK_INTERVAL_SECONDS)
+                    if done:
+                        return work.result()
+                    if self._overloaded():
+                        # The upstream HTTP call finishes in its worker thread, but its result is discarded
+                        work.cancel()
+                        self.stats.cancelled += 1
+                        self._count(endpoint, "cancelled")
+                        logger.info(f"Cancelled {endpoint} prefetch under foreground load")
+                        return None
+            except asyncio.CancelledError:
+                work.cancel()
+                raise
+            except Exception as e:
+                self.stats.failed += 1
+                self._count(endpoint, "failed")
+                logger.warning(f"Prefetch of {endpoint} failed: {e}")
+                return None
+
+    async def take(self, uid: str, endpoint: str, case_summary: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the prefetched result for this user, endpoint and summary (waiting for it if it is still
+        running), or None if there is none. A result is only handed out once.
+        """
+        if not self.enabled:
+            return None
+        self._sweep(time.monotonic())
+        entry = self._entries.pop((uid, endpoint, _summary_digest(case_summary)), None)
+        result = None
+        if entry is not None:
+            try:
+                result = await asyncio.shield(entry.task)
+            except asyncio.CancelledError:
+                if not entry.task.cancelled():
+                    raise
+        if result is None:
+            self.stats.misses += 1
+            self._count(endpoint, "misses")
+            return None
+        self.stats.hits += 1
+        self._count(endpoint, "hits")
+        logger.info(f"Serving prefetched {endpoint} result for user {uid}")
+        return result
+
+    def snapshot_stats(self) -> PrefetchStats:
+        """Returns the counters after accounting for expired prefetches."""
+        self._sweep(time.monotonic())
+        return self.stats
+
+
+prefetcher = Prefetcher(
+    enabled=PREFETCH_ENABLED,
+    ttl_seconds=PREFETCH_TTL_SECONDS,
+    budget_per_hour=PREFETCH_BUDGET_PER_HOUR,
+    max_concurrency=PREFETCH_CONCURRENCY,
+    max_foreground_inflight=PREFETCH_MAX_FOREGROUND_INFLIGHT,
+)
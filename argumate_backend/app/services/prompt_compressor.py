@@ -0,0 +1,127 @@
+# app/services/prompt_compressor.py
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+from app.services.fir_chunking import PAGE_BREAK, estimate_tokens
+
+# Lines that are pure FIR form furniture (titles, page numbers, signature/stamp captions).
+# A line is only removed when it matches one of these completely, so labels carrying a value survive.
+_TEMPLATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"page\s*(no\.?)?\s*:?\s*\d+\s*((of|/)\s*\d+)?",
+    r"[-–]\s*\d{1,3}\s*[-–]",
+    r"first\s+information\s+report",
+    r"\(?\s*under\s+section\s+154\s+cr\.?\s*p\.?\s*c\.?\s*\)?",
+    r"\(?\s*under\s+section\s+173\s+(of\s+)?(the\s+)?b\.?\s*n\.?\s*s\.?\s*s\.?\s*\)?",
+    r"n\.?\s*c\.?\s*r\.?\s*b\.?",
+    r"i\.?\s*i\.?\s*f\.?\s*-?\s*i+\s*(\(\s*integrated\s+investigation\s+form\s*-?\s*i+\s*\))?",
+    r"integrated\s+investigation\s+form\s*-?\s*i*",
+    r"(this\s+is\s+a\s+)?computer\s+generated\s+(document|report|copy)"
+    r"(\s*(,|and|so|which|hence)?\s*(it\s+)?(does\s+not\s+require|requires\s+no|needs\s+no)\s+(any\s+)?signature)?\s*\.?",
+    r"\(?\s*(official\s+)?(seal|stamp)\s*\)?",
+    r"signature\s*(/|or)?\s*(thumb\s*(impression|print))?\s*(of\s+(the\s+)?complainant\s*(/\s*informant)?)?",
+    r"signature\s+of\s+(the\s+)?officer\s+in\s+charge\s*,?\s*(police\s+station)?",
+    r"प्रथम\s+सूचना\s+रिपोर्ट",  # "First Information Report" (Hindi)
+)]
+
+# Tokens that must never disappear from the prompt: dates, numbers (FIR no., sections) and capitalized names.
+_PROTECTED_TOKEN = re.compile(
+    r"\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}"   # dates
+    r"|\d+[A-Za-z]?"                     # FIR numbers, section numbers, years
+    r"|[A-Z][a-zA-Z]+"                   # names, places
+)
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+MAX_BOILERPLATE_LINE_LENGTH = 160
+
+
+@dataclass
+class CompressionReport:
+    """Input-token savings for one document."""
+    tokens_before: int
+    tokens_after: int
+    template_lines_removed: int
+    repeated_lines_removed: int
+
+    @property
+    def reduction_percent(self) -> float:
+        if not self.tokens_before:
+            return 0.0
+        return 100.0 * (self.tokens_before - self.tokens_after) / self.tokens_before
+
+
+def _normalize(line: str) -> str:
+    return _SPACES.sub(" ", line.strip().lower())
+
+
+def _line_key(line: str) -> str:
+    """Normalizes a line so headers that differ only in spacing, case or page number compare equal."""
+    return _DIGITS.sub("#", _normalize(line))
+
+
+def _is_template_line(line: str) -> bool:
+    stripped = line.strip()
+    return any(pattern.fullmatch(stripped) for pattern in _TEMPLATE_PATTERNS)
+
+
+def compress_fir_text(text: str) -> Tuple[str, CompressionReport]:
+    """
+    Removes FIR boilerplate in linear time before the text is sent to the AI:
+    - known form-template lines (titles, page numbers, signature and seal captions);
+    - page headers/footers/letterheads repeated on two or more pages (the first copy is kept).
+    A repeated line is only dropped if its exact text (digits included) was already kept, or if every
+    protected token in it (dates, numbers, names) appears in the first kept copy of the same line, so
+    key fields are never lost. Page breaks are preserved.
+    """
+    pages = [page.splitlines() for page in text.split(PAGE_BREAK)]
+
+    # Pass 1: on how many pages does each (short) line occur?
+    page_counts = {}
+    for lines in pages:
+        for key in {_line_key(line) for line in lines if 0 < len(line.strip()) <= MAX_BOILERPLATE_LINE_LENGTH}:
+            page_counts[key] = page_counts.get(key, 0) + 1
+
+    # Pass 2: keep content, drop template lines and redundant repeats
+    kept_texts: Set[str] = set()
+    # Protected tokens of the first kept occurrence of each repeated line key
+    first_kept_tokens: Dict[str, Set[str]] = {}
+    template_removed = repeated_removed = 0
+    output_pages: List[str] = []
+
+    for lines in pages:
+        kept_lines: List[str] = []
+        for line in lines:
+            stripped = line.strip()
+            if not stripped:
+                if kept_lines and kept_lines[-1]:
+                    kept_lines.append("")
+                continue
+            if _is_template_line(stripped):
+                template_removed += 1
+                continue
+
+            key = _line_key(stripped)
+            if page_counts.get(key, 0) >= 2:
+                normalized = _normalize(stripped)
+                first_tokens = first_kept_tokens.get(key)
+                if normalized in kept_texts or (
+                    first_tokens is not None and first_tokens.issuperset(_PROTECTED_TOKEN.findall(stripped))
+                ):
+                    repeated_removed += 1
+                    continue
+                kept_texts.add(normalized)
+                if first_tokens is None:
+                    first_kept_tokens[key] = set(_PROTECTED_TOKEN.findall(stripped))
+
+            kept_lines.append(stripped)
+        output_pages.append("\n".join(kept_lines).strip())
+
+    compressed = PAGE_BREAK.join(output_pages)
+    report = CompressionReport(
+        tokens_before=estimate_tokens(text),
+        tokens_after=estimate_tokens(compressed),
+        template_lines_removed=template_removed,
+        repeated_lines_removed=repeated_removed,
+    )
+    return compressed, report
@@ -0,0 +1,18 @@
+# app/services/response_parser.py
+import json
+
+
+def strip_json_fences(content: str) -> str:
+    """
+    Removes markdown code fences (```json ... ```) that the AI sometimes wraps around JSON output.
+    """
+    if "```json" in content:
+        return content.split("```json")[1].split("```")[0].strip()
+    if "```" in content:
+        return content.split("```")[1].split("```")[0].strip()
+    return content
+
+
+def parse_json_response(content: str) -> dict:
+    """Strips markdown fences from an AI message and parses it as JSON."""
+    return json.loads(strip_json_fences(content))
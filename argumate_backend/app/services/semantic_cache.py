@@ -0,0 +1,186 @@
+# app/services/semantic_cache.py
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.text_features import char_ngrams, stable_hash, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Words that carry no meaning for matching legal FAQs ("what is IPC 420" == "explain section 420 of IPC").
+_STOPWORDS = {
+    "a", "about", "an", "and", "are", "can", "do", "does", "explain", "for", "how", "in", "is", "me",
+    "of", "on", "or", "please", "s", "sec", "section", "tell", "the", "to", "u", "under", "what",
+}
+
+# Questions that mention the user's own situation or personal data are never served from / stored in the cache.
+_PERSONAL_PATTERN = re.compile(
+    r"\b(my|mine|myself|our|ours|us)\b"
+    r"|\bi(?:'m|'ve| am| was| have| had| got)\b"
+    r"|[\w.+-]+@[\w-]+\.[\w.]+"   # e-mail address
+    r"|\b\d{10}\b",               # phone number
+    re.IGNORECASE,
+)
+_NUMBER_PATTERN = re.compile(r"\d+[a-z]?", re.IGNORECASE)
+# Negations flip a legal answer ("bailable" vs "non-bailable") while barely moving the embedding
+_NEGATION_PATTERN = re.compile(r"\b(?:not|non|no|refus(?:e|es|ed|al)|without|cannot|never)\b|n't\b", re.IGNORECASE)
+
+MAX_CACHEABLE_LENGTH = 300
+
+
+def is_cacheable_question(message: str) -> bool:
+    """True for short, general questions whose answer does not depend on who is asking."""
+    return len(message) <= MAX_CACHEABLE_LENGTH and not _PERSONAL_PATTERN.search(message)
+
+
+class HashingEmbedder:
+    """Dependency-free embedding: hashed content words plus character trigrams, L2-normalized."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        content = [t for t in tokens if t not in _STOPWORDS] or tokens
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in content:
+            vector[stable_hash("w:" + token) % self.dim] += 1.0
+        for gram in char_ngrams(content):
+            vector[stable_hash("c:" + gram) % self.dim] += 0.5
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SpacyEmbedder:
+    """Sentence vectors from a local spaCy model with word vectors (e.g. en_core_web_md)."""
+
+    def __init__(self, model_name: str):
+        import spacy
+        self.nlp = spacy.load(model_name, disable=["parser", "ner", "tagger", "lemmatizer", "attribute_ruler"])
+        self.dim = self.nlp.vocab.vectors_length
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.nlp(text).vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def build_embedder(spacy_model: str = ""):
+    """Uses the named spaCy model when it is installed, otherwise the hashing embedder."""
+    if spacy_model:
+        try:
+            return SpacyEmbedder(spacy_model)
+        except Exception as e:
+            logger.warning(f"spaCy model '{spacy_model}' unavailable ({e}); using hashing embeddings.")
+    return HashingEmbedder()
+
+
+@dataclass
+class CacheEntry:
+    question: str
+    answer: str
+    numbers: frozenset
+    negations: frozenset
+    created_at: float
+    last_hit_at: float
+    hits: int = 0
+
+
+@dataclass
+class CacheStats:
+    lookups: int = 0
+    hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    top_entries: List[dict] = field(default_factory=list)
+
+
+class SemanticCache:
+    """
+    In-memory nearest-neighbour answer cache.
+    Vectors live in one preallocated matrix, so a lookup is a single matrix-vector product.
+    Entries expire after `ttl_seconds`; when full, expired entries are reused first, then the
+    least recently used one. Numbers in the question (IPC sections, years) and negation words must
+    match exactly, because "IPC 420" and "IPC 302", or "bailable" and "non-bailable", embed almost
+    identically.
+    """
+
+    def __init__(self, embedder, threshold: float = 0.85, ttl_seconds: float = 86400, max_entries: int = 5000):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._vectors = np.zeros((max_entries, embedder.dim), dtype=np.float32)
+        self._entries: List[Optional[CacheEntry]] = [None] * max_entries
+        self._size = 0
+        self.stats = CacheStats()
+
+    @staticmethod
+    def _numbers(text: str) -> frozenset:
+        return frozenset(n.lower() for n in _NUMBER_PATTERN.findall(text))
+
+    @staticmethod
+    def _negations(text: str) -> frozenset:
+        words = (w.lower() for w in _NEGATION_PATTERN.findall(text))
+        return frozenset("not" if w in ("n't", "cannot") else "refuse" if w.startswith("refus") else w for w in words)
+
+    def _is_live(self, entry: Optional[CacheEntry], now: float) -> bool:
+        return entry is not None and now - entry.created_at < self.ttl_seconds
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Returns the cached answer of the most similar live question above the threshold, if any."""
+        self.stats.lookups += 1
+        if self._size == 0:
+            return None
+
+        now = time.time()
+        similarities = self._vectors[:self._size] @ self.embedder.embed(question)
+        numbers = self._numbers(question)
+        negations = self._negations(question)
+        candidates = min(5, self._size)
+        nearest = np.argpartition(-similarities, candidates - 1)[:candidates]
+        for index in nearest[np.argsort(-similarities[nearest])]:
+            if similarities[index] < self.threshold:
+                break
+            entry = self._entries[index]
+            if self._is_live(entry, now) and entry.numbers == numbers and entry.negations == negations:
+                entry.hits += 1
+                entry.last_hit_at = now
+                self.stats.hits += 1
+                logger.info(f"Semantic cache hit ({similarities[index]:.2f}) for: {question[:60]!r}")
+                return entry.answer
+        return None
+
+    def store(self, question: str, answer: str) -> None:
+        """Adds a question/answer pair, evicting an expired or least recently used entry when full."""
+        now = time.time()
+        if self._size < self.max_entries:
+            index = self._size
+            self._size += 1
+        else:
+            index = self._eviction_index(now)
+            self.stats.evictions += 1
+
+        self._vectors[index] = self.embedder.embed(question)
+        self._entries[index] = CacheEntry(question, answer, self._numbers(question), self._negations(question), now, now)
+        self.stats.stores += 1
+
+    def _eviction_index(self, now: float) -> int:
+        oldest_index, oldest_access = 0, float("inf")
+        for index, entry in enumerate(self._entries):
+            if not self._is_live(entry, now):
+                return index
+            if entry.last_hit_at < oldest_access:
+                oldest_index, oldest_access = index, entry.last_hit_at
+        return oldest_index
+
+    def snapshot_stats(self, top: int = 10) -> CacheStats:
+        """Returns counters plus the most-hit entries, for tuning the threshold and TTL."""
+        live = [e for e in self._entries[:self._size] if e is not None]
+        live.sort(key=lambda e: e.hits, reverse=True)
+        self.stats.top_entries = [{"question": e.question, "hits": e.hits} for e in live[:top]]
+        return self.stats
@@ -0,0 +1,50 @@
+# app/services/text_features.py
+import re
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cases text and splits it into alphanumeric tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def word_ngrams(tokens: List[str], max_n: int = 2) -> List[str]:
+    """Returns unigrams plus word n-grams up to `max_n` (joined with a space)."""
+    grams = list(tokens)
+    for n in range(2, max_n + 1):
+        grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+
+def stable_hash(feature: str) -> int:
+    """CRC32 of the feature; unlike hash() it is identical across processes and restarts."""
+    return zlib.crc32(feature.encode("utf-8"))
+
+
+def hash_features(grams: List[str], n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashes features into a sparse vector of size `n_features` and returns (indices, values).
+    Values are sublinear term frequencies (1 + log tf), L2-normalized; indices are unique and sorted.
+    """
+    if not grams:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    hashed = np.fromiter((stable_hash(g) for g in grams), dtype=np.int64, count=len(grams)) % n_features
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = (1.0 + np.log(counts)).astype(np.float32)
+    values /= np.linalg.norm(values)
+    return indices, values
+
+
+def char_ngrams(tokens: List[str], n: int = 3) -> List[str]:
+    """Character n-grams of each token (with boundary markers), robust to typos and inflections."""
+    grams = []
+    for token in tokens:
+        padded = f"#{token}#"
+        grams.extend(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+    return grams
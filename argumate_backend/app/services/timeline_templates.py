@@ -0,0 +1,319 @@
+# app/services/timeline_templates.py
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Offence classes, from least to most procedurally involved. A case with several sections takes the
+# class of its most serious one.
+CATEGORY_ORDER = (
+    "non_cognizable",
+    "bailable_magistrate",
+    "non_bailable_magistrate",
+    "sessions",
+    "special_court",
+)
+
+
+@dataclass(frozen=True)
+class TemplateStep:
+    step_title: str
+    description: str
+    estimated_date_or_duration: str
+
+
+@dataclass(frozen=True)
+class TimelineTemplate:
+    category: str
+    label: str
+    steps: Tuple[TemplateStep, ...]
+
+
+# Typical CrPC / BNSS stages and duration ranges for each offence class. Durations are indicative
+# ranges for Indian trial courts, not statutory guarantees (except where a provision is cited).
+TIMELINE_TEMPLATES: Dict[str, TimelineTemplate] = {t.category: t for t in (
+    TimelineTemplate("non_cognizable", "Non-cognizable, bailable, triable by a Magistrate", (
+        TemplateStep("Complaint Entered as NCR",
+                     "The police record the complaint in the non-cognizable register (S.155 CrPC / S.174 BNSS) and refer the complainant to the Magistrate; they cannot investigate or arrest without a Magistrate's order.",
+                     "Same day"),
+        TemplateStep("Complaint Before the Magistrate",
+                     "The complainant files a complaint (S.200 CrPC / S.223 BNSS) or seeks an order permitting police investigation; the Magistrate examines the complainant on oath.",
+                     "1-4 weeks"),
+        TemplateStep("Summons to the Accused",
+                     "If there is sufficient ground, the Magistrate takes cognizance and issues summons. The offence is bailable, so the accused is released on bail as of right on appearance.",
+                     "1-3 months"),
+        TemplateStep("Settlement or Compounding",
+                     "Many of these offences are compoundable (S.320 CrPC / S.359 BNSS); the parties may settle and the case is closed with the court's record of compromise.",
+                     "Possible at any stage"),
+        TemplateStep("Summons Trial",
+                     "The particulars of the offence are explained to the accused, and both sides lead evidence in a summary or summons trial.",
+                     "6-18 months"),
+        TemplateStep("Judgment",
+                     "The Magistrate acquits or convicts and sentences the accused; an appeal lies to the Sessions Court within 30 days.",
+                     "1-2 years from the complaint"),
+    )),
+    TimelineTemplate("bailable_magistrate", "Cognizable, bailable, triable by a Magistrate", (
+        TemplateStep("FIR Registration",
+                     "The police register the FIR (S.154 CrPC / S.173 BNSS) and a free copy is given to the informant.",
+                     "Same day"),
+        TemplateStep("Notice of Appearance or Bail at the Police Station",
+                     "The police may issue a notice of appearance instead of arresting (S.41A CrPC / S.35 BNSS). If arrested, the accused is entitled to bail at the police station since the offence is bailable (S.436 CrPC / S.478 BNSS).",
+                     "Same day"),
+        TemplateStep("Investigation and Charge Sheet",
+                     "The police collect evidence and record witness statements, then file the final report or charge sheet before the Magistrate (S.173 CrPC / S.193 BNSS).",
+                     "1-3 months"),
+        TemplateStep("Cognizance and Appearance",
+                     "The Magistrate takes cognizance, the accused appears, and copies of the police documents are supplied (S.207 CrPC / S.230 BNSS).",
+                     "1-2 months after the charge sheet"),
+        TemplateStep("Trial",
+                     "The charge or substance of accusation is put to the accused, prosecution and defence witnesses are examined, and the accused's statement is recorded (S.313 CrPC / S.351 BNSS).",
+                     "6-18 months"),
+        TemplateStep("Judgment and Appeal",
+                     "The Magistrate delivers the judgment; an appeal lies to the Sessions Court.",
+                     "1-2 years from the FIR"),
+    )),
+    TimelineTemplate("non_bailable_magistrate", "Cognizable, non-bailable, triable by a Magistrate", (
+        TemplateStep("FIR Registration",
+                     "The police register the FIR (S.154 CrPC / S.173 BNSS) and begin investigation.",
+                     "Same day"),
+        TemplateStep("Arrest and Production Before the Magistrate",
+                     "If arrested, the accused must be produced before the Magistrate within 24 hours (S.57 CrPC / S.58 BNSS), who decides on police or judicial custody (S.167 CrPC / S.187 BNSS).",
+                     "Within 24 hours of arrest"),
+        TemplateStep("Bail Proceedings",
+                     "Bail is at the court's discretion: regular bail before the Magistrate (S.437 CrPC / S.480 BNSS), or anticipatory bail before the Sessions Court or High Court (S.438 CrPC / S.482 BNSS).",
+                     "1-4 weeks"),
+        TemplateStep("Investigation and Charge Sheet",
+                     "The police complete the investigation and file the charge sheet. If the accused is in custody and it is not filed within 60 days, the accused is entitled to default bail (S.167(2) CrPC / S.187(3) BNSS).",
+                     "Within 60 days if in custody, otherwise 2-6 months"),
+        TemplateStep("Cognizance and Framing of Charge",
+                     "The Magistrate takes cognizance, supplies police documents to the accused and frames the charge (S.240 CrPC / S.263 BNSS).",
+                     "1-3 months after the charge sheet"),
+        TemplateStep("Trial",
+                     "Prosecution witnesses are examined and cross-examined, the accused's statement is recorded, and any defence evidence is led.",
+                     "1-3 years"),
+        TemplateStep("Judgment and Appeal",
+                     "The Magistrate acquits or convicts and sentences the accused; an appeal lies to the Sessions Court.",
+                     "2-4 years from the FIR"),
+    )),
+    TimelineTemplate("sessions", "Cognizable, non-bailable, triable by a Court of Session", (
+        TemplateStep("FIR Registration",
+                     "The police register the FIR (S.154 CrPC / S.173 BNSS) and begin investigation, including inspection of the scene and seizures.",
+                     "Same day"),
+        TemplateStep("Arrest, Remand and Custody",
+                     "The accused is produced before the Magistrate within 24 hours and may be remanded to police custody for up to 15 days, then judicial custody (S.167 CrPC / S.187 BNSS).",
+                     "Within 24 hours; police custody up to 15 days"),
+        TemplateStep("Investigation and Charge Sheet",
+                     "For offences punishable with death, life imprisonment or at least 10 years, the charge sheet must be filed within 90 days if the accused is in custody, failing which default bail arises (S.167(2) CrPC / S.187(3) BNSS).",
+                     "Up to 90 days if in custody, otherwise 3-9 months"),
+        TemplateStep("Bail Before the Sessions Court or High Court",
+                     "Bail in serious offences is usually sought before the Sessions Court or High Court (S.439 CrPC / S.483 BNSS).",
+                     "1-6 months after arrest"),
+        TemplateStep("Committal to the Court of Session",
+                     "The Magistrate commits the case to the Court of Session, as it is exclusively triable there (S.209 CrPC / S.232 BNSS).",
+                     "1-3 months after the charge sheet"),
+        TemplateStep("Framing of Charge and Trial",
+                     "The Sessions Judge frames the charge (S.228 CrPC / S.251 BNSS); prosecution and defence evidence follow, with the accused's statement recorded in between.",
+                     "2-5 years"),
+        TemplateStep("Judgment and Appeal",
+                     "The Sessions Court acquits or convicts and sentences the accused; an appeal lies to the High Court.",
+                     "3-6 years from the FIR"),
+    )),
+    TimelineTemplate("special_court", "Offence under a special Act, triable by a Special Court (POCSO, NDPS, SC/ST)", (
+        TemplateStep("FIR Registration",
+                     "The police register the FIR under the special Act along with any IPC/BNS sections; special reporting and seizure safeguards of the Act apply.",
+                     "Same day"),
+        TemplateStep("Arrest and Production",
+                     "The accused is produced within 24 hours before the Special Court or the nearest Magistrate and remanded to custody.",
+                     "Within 24 hours of arrest"),
+        TemplateStep("Statements and Medical or Forensic Examination",
+                     "The victim's or witnesses' statements are recorded before a Magistrate (S.164 CrPC / S.183 BNSS), and medical examination or forensic testing of seized material is done.",
+                     "1-4 weeks"),
+        TemplateStep("Investigation and Charge Sheet",
+                     "The charge sheet is filed before the Special Court. POCSO investigations are to be completed within 2 months; NDPS cases involving commercial quantity allow up to 180 days (extendable to 1 year).",
+                     "2-6 months"),
+        TemplateStep("Bail Proceedings",
+                     "Bail is restricted under several special Acts (e.g. the twin conditions of S.37 NDPS Act) and is heard by the Special Court or the High Court.",
+                     "1-6 months"),
+        TemplateStep("Trial Before the Special Court",
+                     "The Special Court frames charges and conducts the trial, with protections for child victims and witnesses where applicable. POCSO trials are meant to be completed within 1 year.",
+                     "1-3 years"),
+        TemplateStep("Judgment and Appeal",
+                     "The Special Court delivers the judgment; an appeal lies to the High Court.",
+                     "2-4 years from the FIR"),
+    )),
+    TimelineTemplate("general", "Criminal case (offence class not identified)", (
+        TemplateStep("FIR Registration",
+                     "The police register the FIR (S.154 CrPC / S.173 BNSS) and begin investigation.",
+                     "Same day"),
+        TemplateStep("Arrest or Notice and Bail",
+                     "The accused may be arrested or served a notice of appearance; bail depends on whether the offence is bailable.",
+                     "1 day to 4 weeks"),
+        TemplateStep("Investigation and Charge Sheet",
+                     "The police collect evidence and file the charge sheet or final report before the court (S.173 CrPC / S.193 BNSS).",
+                     "2-6 months"),
+        TemplateStep("Cognizance and Framing of Charge",
+                     "The court takes cognizance, supplies police documents to the accused and frames the charge.",
+                     "1-3 months after the charge sheet"),
+        TemplateStep("Trial",
+                     "Prosecution and defence evidence are recorded and final arguments are heard.",
+                     "1-3 years"),
+        TemplateStep("Judgment and Appeal",
+                     "The court delivers the judgment; an appeal lies to the higher court.",
+                     "2-4 years from the FIR"),
+    )),
+)}
+
+# Offence class of common IPC and BNS sections, from the First Schedule of the CrPC / BNSS
+_IPC_SECTIONS = {
+    "non_cognizable": ("323", "334", "352", "417", "426", "465", "500", "504", "506"),
+    "bailable_magistrate": ("147", "188", "279", "294", "304A", "325", "336", "337", "338", "341", "342", "354D", "363", "427", "447", "448", "509"),
+    "non_bailable_magistrate": ("324", "326", "354", "354A", "354B", "380", "379", "384", "392", "406", "409", "411", "420", "454", "457", "468", "471", "498A"),
+    "sessions": ("302", "304", "304B", "306", "307", "364", "364A", "366", "376", "376D", "395", "396", "397", "436", "489A"),
+}
+_BNS_SECTIONS = {
+    "non_cognizable": ("115", "131", "318(2)", "324(2)", "351(2)", "352", "356(2)"),
+    "bailable_magistrate": ("106(1)", "117(2)", "125", "126(2)", "127(2)", "137(2)", "189(2)", "191(2)", "223", "281", "296", "324(4)", "329(3)", "78", "79"),
+    "non_bailable_magistrate": ("74", "75", "76", "85", "118(1)", "118(2)", "303(2)", "305", "308(2)", "309(4)", "316(2)", "316(5)", "317(2)", "318(4)", "331(3)", "331(4)", "336(3)", "340(2)"),
+    "sessions": ("64", "70", "80", "103", "103(1)", "105", "108", "109", "140", "310(2)", "311", "326(g)", "178"),
+}
+SECTION_CATEGORIES: Dict[str, Dict[str, str]] = {
+    act: {section: category for category, sections in table.items() for section in sections}
+    for act, table in (("IPC", _IPC_SECTIONS), ("BNS", _BNS_SECTIONS))
+}
+# Acts whose offences are tried by a Special Court regardless of section
+SPECIAL_ACTS = ("POCSO", "NDPS", "SC/ST")
+
+_ACT = (
+    r"I\.?\s?P\.?\s?C\b\.?|Indian\s+Penal\s+Code|B\.?\s?N\.?\s?S\b\.?|Bharatiya\s+Nyaya\s+Sanhita"
+    r"|POCSO|Protection\s+of\s+Children\s+from\s+Sexual\s+Offences|N\.?\s?D\.?\s?P\.?\s?S\b\.?|Narcotic"
+    r"|SC\s*/\s*ST|Scheduled\s+Castes?\s+and\s+(?:the\s+)?Scheduled\s+Tribes"
+)
+_NUMBER = r"\d{1,3}[A-Z]?(?:\s?\(\s?[0-9a-z]{1,3}\s?\))?(?!\d)"
+# "Section 302", "u/s 302/34", "S. 379 and 411" (the introducing word is optional)
+_SECTION_LIST = re.compile(
+    rf"(?P<intro>\b(?:sections?|secs?\.?|u/s\.?|s\.)\s*)?\b(?P<numbers>{_NUMBER}(?:\s*(?:,|/|&|and)\s*{_NUMBER})*)",
+    re.IGNORECASE,
+)
+# An Act named right after the numbers ("302 IPC", "4 of the POCSO Act") or right before them ("IPC Section 302")
+_ACT_AFTER = re.compile(rf"\s*,?\s*(?:of\s+(?:the\s+)?)?(?P<act>{_ACT})", re.IGNORECASE)
+_ACT_BEFORE = re.compile(rf"(?P<act>{_ACT})\s*[,:-]?\s*$", re.IGNORECASE)
+_NUMBER_PATTERN = re.compile(_NUMBER, re.IGNORECASE)
+
+_KEYWORD_CATEGORIES = (
+    ("special_court", re.compile(r"\b(narcotic|ganja|heroin|charas|smack|opium|contraband|pocso|child\s+sexual|sexual\s+assault\s+on\s+a\s+(minor|child)|caste\s+abuse|atrocit)", re.IGNORECASE)),
+    ("sessions", re.compile(r"\b(murder|killed|homicide|culpable|attempt\s+to\s+murder|rape|gang\s*rape|dacoity|dowry\s+death|abetment\s+of\s+suicide|acid\s+attack)", re.IGNORECASE)),
+    ("non_bailable_magistrate", re.compile(r"\b(theft|stole|stolen|snatch|robbery|burglar|house[\s-]*breaking|cheat|fraud|forg|extortion|criminal\s+breach\s+of\s+trust|cruelty|dowry|molest|outrag)", re.IGNORECASE)),
+    ("bailable_magistrate", re.compile(r"\b(rash|negligen|accident|wrongful\s+restraint|stalk|obscene|trespass|grievous\s+hurt|kidnap)", re.IGNORECASE)),
+    ("non_cognizable", re.compile(r"\b(abuse|insult|slap|simple\s+hurt|intimidat|threat|defam)", re.IGNORECASE)),
+)
+
+
+@dataclass
+class OffenceClassification:
+    category: str
+    # (act, section) pairs recognised in the text, e.g. ("IPC", "379")
+    sections: List[Tuple[str, str]]
+    # How the category was decided: "sections", "keywords" or "default"
+    basis: str
+
+
+def _normalize_act(raw: str) -> str:
+    compact = re.sub(r"[\s.]", "", raw).upper()
+    if compact.startswith(("IPC", "INDIANPENAL")):
+        return "IPC"
+    if compact.startswith(("BNS", "BHARATIYA")):
+        return "BNS"
+    if compact.startswith(("POCSO", "PROTECTION")):
+        return "POCSO"
+    if compact.startswith(("NDPS", "NARCOTIC")):
+        return "NDPS"
+    return "SC/ST"
+
+
+def _normalize_section(raw: str) -> str:
+    return re.sub(r"\s", "", raw).upper().replace("(G)", "(g)")
+
+
+def extract_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Finds cited sections as (act, section) pairs. A number only counts as a section when it is
+    introduced by "Section"/"u/s"/"S." or sits right next to an Act name; sections with no Act
+    named are taken to be IPC.
+    """
+    found: List[Tuple[str, str]] = []
+    for match in _SECTION_LIST.finditer(text):
+        act_match = _ACT_AFTER.match(text, match.end()) or _ACT_BEFORE.search(text, max(0, match.start() - 40), match.start())
+        if not (match.group("intro") or act_match):
+            continue
+        act = _normalize_act(act_match.group("act")) if act_match else "IPC"
+        for number in _NUMBER_PATTERN.findall(match.group("numbers")):
+            pair = (act, _normalize_section(number))
+            if pair not in found:
+                found.append(pair)
+    return found
+
+
+def _section_category(act: str, section: str) -> Optional[str]:
+    if act in SPECIAL_ACTS:
+        return "special_court"
+    table = SECTION_CATEGORIES.get(act, {})
+    # "103(1)" falls back to "103", "304A" stays as is
+    return table.get(section) or table.get(section.split("(")[0])
+
+
+def classify_offence(case_summary: str) -> OffenceClassification:
+    """
+    Picks the offence class of a case from its cited sections (most serious wins), falling back to
+    offence keywords, then to "general". Pure regex and dictionary lookups, so it takes microseconds.
+    """
+    sections = extract_sections(case_summary)
+    categories = [c for c in (_section_category(act, sec) for act, sec in sections) if c]
+    if categories:
+        return OffenceClassification(max(categories, key=CATEGORY_ORDER.index), sections, "sections")
+    for category, pattern in _KEYWORD_CATEGORIES:
+        if pattern.search(case_summary):
+            return OffenceClassification(category, sections, "keywords")
+    return OffenceClassification("general", sections, "default")
+
+
+def render_template(template: TimelineTemplate, sections: List[Tuple[str, str]]) -> List[dict]:
+    """Returns the template's steps as timeline_steps, naming the cited sections in the first step."""
+    steps = [
+        {"step_title": s.step_title, "description": s.description, "estimated_date_or_duration": s.estimated_date_or_duration}
+        for s in template.steps
+    ]
+    if sections:
+        cited = ", ".join(f"{act} {section}" for act, section in sections)
+        steps[0]["description"] = f"{steps[0]['description']} Sections cited: {cited}."
+    return steps
+
+
+# Prompts live here rather than in the router so that benchmarks can build them without the app config
+TIMELINE_SYSTEM_PROMPT = "You are ArguMate, an expert legal assistant. Respond ONLY with a valid JSON object."
+
+
+def create_timeline_prompt(case_summary: str) -> str:
+    return f"""
+    You are ArguMate, an expert AI legal assistant for Indian law. Analyze the case and generate a procedural timeline.
+    Respond with a JSON object containing a 'timeline_steps' list of 5-7 objects.
+    Each object needs: 'step_title', 'description', 'estimated_date_or_duration'.
+
+    Case Summary: {case_summary}
+    """
+
+
+def create_timeline_adaptation_prompt(case_summary: str, template: TimelineTemplate, steps: List[dict]) -> str:
+    """Creates the prompt that adapts a procedural template's wording to the case, without changing its stages."""
+    stages = "\n".join(
+        f"    {index}. {step['step_title']} ({step['estimated_date_or_duration']}): {step['description']}"
+        for index, step in enumerate(steps, start=1)
+    )
+    return f"""
+    You are ArguMate, an expert AI legal assistant for Indian law. These are the standard procedural stages for a case of this class ({template.label}):
+{stages}
+
+    Rewrite the description of each stage in one or two plain sentences that refer to the specifics of the case below (parties, sections, custody, seized items).
+    Do NOT add, remove or reorder stages and do NOT change the durations.
+    Respond with a JSON object with one key, "descriptions": a list of exactly {len(steps)} strings, one per stage in order.
+
+    Case Summary: {case_summary}
+    """
@@ -0,0 +1,177 @@
+# app/services/user_import.py
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from firebase_admin import auth, firestore
+from pydantic import ValidationError
+
+from app.core.config import db, BULK_IMPORT_PBKDF2_ROUNDS
+from app.models.schemas import BulkUserResult, UserCreate
+
+logger = logging.getLogger(__name__)
+
+# Firestore commits at most 500 writes per batch; auth.get_users() takes at most 100 identifiers
+FIRESTORE_BATCH_SIZE = 500
+EMAIL_LOOKUP_BATCH_SIZE = 100
+# Firebase Auth rejects shorter passwords in create_user(); import_users() does not check
+MIN_PASSWORD_LENGTH = 6
+
+ValidUser = Tuple[int, UserCreate]
+
+
+def parse_user_upload(content: bytes, filename: str) -> List[dict]:
+    """
+    Reads the rows of a bulk registration upload: a CSV file with a header row containing
+    display_name, email and password, or a JSON array of such objects (optionally under "users").
+    """
+    text = content.decode("utf-8-sig")
+    if filename.lower().endswith(".csv"):
+        reader = csv.DictReader(io.StringIO(text))
+        rows = []
+        for row in reader:
+            values = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            if any(values.values()):
+                rows.append(values)
+        return rows
+    if filename.lower().endswith(".json"):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get("users")
+        if not isinstance(data, list):
+            raise ValueError("JSON uploads must be an array of users or an object with a \"users\" array.")
+        return data
+    raise ValueError("Unsupported file type. Allowed types: csv, json")
+
+
+def validate_users(rows: List[dict]) -> Tuple[List[ValidUser], List[BulkUserResult]]:
+    """
+    Validates every row with UserCreate and rejects duplicate emails within the upload.
+    Returns the valid users with their 1-based row numbers and a failed result for every other row.
+    """
+    valid: List[ValidUser] = []
+    failed: List[BulkUserResult] = []
+    seen_emails = set()
+    for row_number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            failed.append(BulkUserResult(row=row_number, status="failed", error="Row must be an object."))
+            continue
+        try:
+            user = UserCreate(**row)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors())
+            # The raw value is echoed back only when it is text; BulkUserResult.email is a string
+            email = row.get("email") if isinstance(row.get("email"), str) else None
+            failed.append(BulkUserResult(row=row_number, email=email, status="failed", error=error))
+            continue
+
+        email = user.email.lower()
+        if len(user.password) < MIN_PASSWORD_LENGTH:
+            error = f"password: must be at least {MIN_PASSWORD_LENGTH} characters"
+        elif email in seen_emails:
+            error = "Email appears more than once in the upload."
+        else:
+            error = None
+        if error:
+            failed.append(BulkUserResult(row=row_number, email=user.email, status="failed", error=error))
+            continue
+        seen_emails.add(email)
+        valid.append((row_number, user))
+    return valid, failed
+
+
+def hash_password(password: str) -> Tuple[bytes, bytes]:
+    """Returns (hash, salt) in the PBKDF2-SHA256 form expected by UserImportHash.pbkdf2_sha256()."""
+    salt = os.urandom(16)
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, BULK_IMPORT_PBKDF2_ROUNDS), salt
+
+
+def find_registered_emails(emails: List[str]) -> set:
+    """Returns the (lower-cased) emails that already belong to a Firebase Auth user."""
+    registered = set()
+    for start in range(0, len(emails), EMAIL_LOOKUP_BATCH_SIZE):
+        batch = emails[start:start + EMAIL_LOOKUP_BATCH_SIZE]
+        result = auth.get_users([auth.EmailIdentifier(email) for email in batch])
+        registered.update(user.email.lower() for user in result.users if user.email)
+    return registered
+
+
+def register_user_chunk(users: List[ValidUser]) -> List[BulkUserResult]:
+    """
+    Registers up to 1000 validated users with one auth.import_users() call and writes their profile
+    documents in Firestore batches. Blocking; run it off the event loop.
+
+    import_users() does not check email uniqueness, so emails that are already registered are
+    looked up first and rejected.
+    """
+    try:
+        registered = find_registered_emails([user.email for _, user in users])
+    except Exception as e:
+        logger.error(f"Email lookup failed for a bulk import chunk of {len(users)} users: {e}")
+        return [BulkUserResult(row=row, email=user.email, status="failed", error=f"Email lookup failed: {e}") for row, user in users]
+
+    results: List[BulkUserResult] = []
+    pending: List[ValidUser] = []
+    for row, user in users:
+        if user.email.lower() in registered:
+            results.append(BulkUserResult(row=row, email=user.email, status="failed", error="Email is already registered."))
+        else:
+            pending.append((row, user))
+    if not pending:
+        return results
+
+    # PBKDF2 releases the GIL, so the hashes of a chunk are computed on all cores
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        hashes = list(pool.map(hash_password, [user.password for _, user in pending]))
+    uids = [db.collection('users').document().id for _ in pending]
+    records = [
+        auth.ImportUserRecord(
+            uid=uid, email=user.email, display_name=user.display_name,
+            password_hash=password_hash, password_salt=salt,
+        )
+        for (_, user), uid, (password_hash, salt) in zip(pending, uids, hashes)
+    ]
+
+    try:
+        import_result = auth.import_users(records, hash_alg=auth.UserImportHash.pbkdf2_sha256(BULK_IMPORT_PBKDF2_ROUNDS))
+    except Exception as e:
+        logger.error(f"auth.import_users failed for a chunk of {len(records)} users: {e}")
+        results.extend(BulkUserResult(row=row, email=user.email, status="failed", error=f"Import failed: {e}") for row, user in pending)
+        return results
+
+    import_errors = {error.index: error.reason for error in import_result.errors}
+    imported: List[Tuple[int, UserCreate, str]] = []
+    for index, ((row, user), uid) in enumerate(zip(pending, uids)):
+        if index in import_errors:
+            results.append(BulkUserResult(row=row, email=user.email, status="failed", error=import_errors[index]))
+        else:
+            imported.append((row, user, uid))
+
+    for start in range(0, len(imported), FIRESTORE_BATCH_SIZE):
+        batch_users = imported[start:start + FIRESTORE_BATCH_SIZE]
+        batch = db.batch()
+        for _, user, uid in batch_users:
+            batch.set(db.collection('users').document(uid), {
+                'email': user.email,
+                'display_name': user.display_name,
+                'created_at': firestore.SERVER_TIMESTAMP
+            })
+        try:
+            batch.commit()
+            status, error = "created", None
+        except Exception as e:
+            # The accounts exist; only their profile documents are missing
+            logger.error(f"Profile batch write failed for {len(batch_users)} imported users: {e}")
+            status, error = "profile_failed", f"Account created but the profile could not be saved: {e}"
+        results.extend(
+            BulkUserResult(row=row, email=user.email, status=status, uid=uid, error=error)
+            for row, user, uid in batch_users
+        )
+
+    logger.info(f"Bulk import chunk: {len(imported)}/{len(users)} users imported")
+    return results
@@ -0,0 +1,394 @@
+# benchmarks/bench_hot_paths.py
+"""
+Micro-benchmarks for the CPU-bound hot paths of a request, with stored baselines.
+
+Cases:
+- parse_document:   generated PDFs (1/10/50 pages) and DOCX files (20/500 paragraphs)
+- text:             clean_text_for_json, compress_fir_text and split_into_chunks on generated FIR text
+- parse:            fence stripping + json.loads (parse_json_response) and the streaming field parser,
+                    on the LLM replies in benchmarks/fixtures/llm_responses.json
+- models:           Pydantic construction of each endpoint's response model from those replies
+- prompt:           prompt building for every endpoint
+
+Each case is timed with timeit (auto-ranged to >= 0.2 s per round) and reported as the median and
+minimum time per call over --rounds rounds.
+
+Commands (from argumate_backend/, needs the backend's .env because app.core.config is imported):
+    python -m benchmarks.bench_hot_paths run [--filter parse_document] [--save NAME] [--output results.json]
+    python -m benchmarks.bench_hot_paths compare benchmarks/baselines/NAME.json [results.json] [--threshold 0.10]
+    python -m benchmarks.bench_hot_paths record    # replaces the fixture replies with live OpenRouter replies
+
+`run --save NAME` writes benchmarks/baselines/NAME.json. `compare` runs the suite (or reads a results
+file) and exits with status 1 if any case's fastest round is slower than the baseline by more than
+the threshold. Timings are only comparable on the same machine and Python version, which are stored in
+each baseline; compare warns when they differ.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import timeit
+import zlib
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import docx
+from fastapi import UploadFile
+
+from app.models import schemas
+from app.routers.argument_builder import create_argument_prompt
+from app.routers.case_retriever import create_retrieval_prompt
+from app.routers.fir_explainer import clean_text_for_json, create_fir_chunk_prompt, create_fir_prompt
+from app.routers.fir_validator import create_validation_prompt
+from app.routers.judgment_predictor import create_prediction_prompt
+from app.services.document_parser import parse_document
+from app.services.fir_chunking import PAGE_BREAK, split_into_chunks
+from app.services.json_stream import TopLevelFieldParser
+from app.services.prefetch import build_case_summary
+from app.services.prompt_compressor import compress_fir_text
+from app.services.response_parser import parse_json_response, strip_json_fences
+from app.services.timeline_templates import (
+    TIMELINE_TEMPLATES, classify_offence, create_timeline_adaptation_prompt, create_timeline_prompt, render_template,
+)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+LLM_FIXTURES = os.path.join(BENCH_DIR, "fixtures", "llm_responses.json")
+# Bump when case names or timing methodology change; baselines of another format are not compared
+BASELINE_FORMAT = 2
+
+# Response model and router message for each recorded route reply
+RESPONSE_MODELS = {
+    "fir_explain": (schemas.FirExplanationResponse, "FIR processed successfully by ArguMate!"),
+    "fir_validate": (schemas.FirValidationResponse, "FIR draft validated successfully."),
+    "arguments": (schemas.ArgumentBuilderResponse, "Arguments generated successfully."),
+    "case_retrieval": (schemas.CaseRetrieverResponse, "Similar cases retrieved successfully."),
+    "timeline": (schemas.CaseTimelineResponse, "Case timeline generated successfully."),
+    "prediction": (schemas.PredictionResponse, "Judgment prediction generated successfully."),
+}
+
+_NAMES = ["Ramesh Kumar", "Suresh", "Mahesh Yadav", "Sunita Devi", "Anil Sharma", "Pooja Verma", "Rakesh Singh"]
+_PLACES = ["Sector 21, Noida", "Village Rampur", "Ring Road crossing", "Lajpat Nagar market", "Civil Lines"]
+_EVENTS = [
+    "entered the house at night through the rear window and removed gold ornaments from the almirah",
+    "stopped the complainant on the road, abused him and threatened to kill him if he complained",
+    "assaulted the victim with a lathi causing injuries on the head and left arm",
+    "took Rs. 45,000 from the complainant on the promise of a government job and stopped answering calls",
+    "drove the truck rashly and hit the motorcycle, injuring the rider",
+]
+_HEADER = "FIRST INFORMATION REPORT (Under Section 154 Cr.P.C.)"
+_FOOTER = "Signature/Thumb impression of the complainant"
+
+
+def generate_fir_pages(pages: int, lines_per_page: int = 45, seed: int = 7) -> List[List[str]]:
+    """Deterministic FIR-like text: per page a repeated header/footer around narrative and form lines."""
+    rng = random.Random(seed)
+    result = []
+    for page in range(pages):
+        lines = [_HEADER, f"District: Gautam Buddh Nagar   P.S.: Sector 20   Year: 2024   FIR No.: 0123   Page {page + 1}"]
+        while len(lines) < lines_per_page - 1:
+            if rng.random() < 0.15:
+                lines.append(f"{rng.randint(1, 12)}. Date and time of occurrence: {rng.randint(1, 28):02d}/03/2024 {rng.randint(0, 23):02d}:00")
+            else:
+                lines.append(
+                    f"On {rng.randint(1, 28)} March 2024 the accused {rng.choice(_NAMES)} {rng.choice(_EVENTS)} "
+                    f"at {rng.choice(_PLACES)}; witness {rng.choice(_NAMES)} saw the incident."
+                )
+        lines.append(_FOOTER)
+        result.append(lines)
+    return result
+
+
+def generate_fir_text(pages: int) -> str:
+    """The generated pages as parse_document returns them: pages separated by PAGE_BREAK."""
+    return PAGE_BREAK.join("\n".join(lines) for lines in generate_fir_pages(pages))
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Builds a text-layer PDF (Helvetica, one line per text row) that PyPDF2 can extract."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for lines in pages:
+        text_ops = "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in lines)
+        stream = zlib.compress(f"BT /F1 9 Tf 11 TL 36 806 Td\n{text_ops}ET".encode("latin-1"))
+        objects.append(f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("latin-1") + stream + b"\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode("latin-1"))
+        out.write(body if isinstance(body, bytes) else body.encode("latin-1"))
+        out.write(b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    out.write("".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+
+def make_docx(paragraphs: int) -> bytes:
+    lines = [line for page in generate_fir_pages(paragraphs // 40 + 1) for line in page][:paragraphs]
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def load_llm_samples() -> Dict[str, str]:
+    with open(LLM_FIXTURES, encoding="utf-8") as handle:
+        return {route: sample["content"] for route, sample in json.load(handle)["samples"].items()}
+
+
+def _parse_document_case(filename: str, data: bytes) -> Callable[[], str]:
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(parse_document(UploadFile(io.BytesIO(data), filename=filename)))
+
+
+def _stream_fields(content: str, delta_size: int = 24) -> Callable[[], None]:
+    deltas = [content[i:i + delta_size] for i in range(0, len(content), delta_size)]
+
+    def feed_all():
+        parser = TopLevelFieldParser()
+        for delta in deltas:
+            parser.feed(delta)
+    return feed_all
+
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    cases: Dict[str, Callable[[], object]] = {}
+
+    for pages in (1, 10, 50):
+        cases[f"parse_document/pdf_{pages}_pages"] = _parse_document_case("fir.pdf", make_pdf(generate_fir_pages(pages)))
+    for paragraphs in (20, 500):
+        cases[f"parse_document/docx_{paragraphs}_paragraphs"] = _parse_document_case("fir.docx", make_docx(paragraphs))
+
+    texts = {pages: generate_fir_text(pages) for pages in (1, 10, 50)}
+    for pages, text in texts.items():
+        cases[f"text/clean_text_for_json_{pages}_pages"] = lambda text=text: clean_text_for_json(text)
+    cases["text/compress_fir_text_10_pages"] = lambda: compress_fir_text(texts[10])
+    cases["text/split_into_chunks_50_pages"] = lambda: split_into_chunks(texts[50], 6000)
+
+    samples = load_llm_samples()
+    parsed = {route: parse_json_response(content) for route, content in samples.items()}
+    for route, content in samples.items():
+        cases[f"parse/json_response_{route}"] = lambda content=content: parse_json_response(content)
+    cases["parse/stream_fields_fir_explain"] = _stream_fields(strip_json_fences(samples["fir_explain"]))
+
+    for route, (model_cls, message) in RESPONSE_MODELS.items():
+        if route in parsed:
+            data = dict(parsed[route], message=message)
+            if route == "fir_explain":
+                data["fir_id"] = "a1b2c3d4e5f6g7h8i9j0"
+            cases[f"models/{model_cls.__name__}"] = lambda model_cls=model_cls, data=data: model_cls(**data)
+
+    summary = parsed["fir_explain"]
+    case_summary = build_case_summary(summary["structured_summary"], summary["ipc_sections"])
+    fir_text = texts[1]
+    cases["prompt/fir_explain_1_page"] = lambda: create_fir_prompt(clean_text_for_json(compress_fir_text(fir_text)[0]))
+    cases["prompt/fir_chunk"] = lambda: create_fir_chunk_prompt(clean_text_for_json(fir_text), 2, 5)
+    cases["prompt/case_summary"] = lambda: build_case_summary(summary["structured_summary"], summary["ipc_sections"])
+    cases["prompt/arguments"] = lambda: create_argument_prompt(case_summary)
+    cases["prompt/case_retrieval"] = lambda: create_retrieval_prompt(case_summary)
+    cases["prompt/prediction"] = lambda: create_prediction_prompt(case_summary)
+    cases["prompt/fir_validate"] = lambda: create_validation_prompt(fir_text)
+    cases["prompt/timeline"] = lambda: create_timeline_prompt(case_summary)
+
+    def timeline_adaptation():
+        classification = classify_offence(case_summary)
+        template = TIMELINE_TEMPLATES[classification.category]
+        return create_timeline_adaptation_prompt(case_summary, template, render_template(template, classification.sections))
+    cases["prompt/timeline_adaptation"] = timeline_adaptation
+    return cases
+
+
+def time_case(func: Callable[[], object], rounds: int) -> dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    per_call_us = [total / number * 1e6 for total in timer.repeat(repeat=rounds, number=number)]
+    return {
+        "median_us": round(statistics.median(per_call_us), 3),
+        "min_us": round(min(per_call_us), 3),
+        "iterations": number,
+        "rounds": rounds,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+
+
+def run_suite(name_filter: Optional[str], rounds: int) -> dict:
+    results = {}
+    print(f"{'case':<48} {'median us':>12} {'min us':>12} {'iterations':>10}")
+    for name, func in build_cases().items():
+        if name_filter and name_filter not in name:
+            continue
+        func()  # warm-up (imports, caches, lazy initialisation)
+        results[name] = time_case(func, rounds)
+        print(f"{name:<48} {results[name]['median_us']:>12.1f} {results[name]['min_us']:>12.1f} {results[name]['iterations']:>10}")
+    return {
+        "format": BASELINE_FORMAT,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "environment": _environment(),
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float, name_filter: Optional[str] = None) -> List[str]:
+    """
+    Prints a per-case comparison and returns the names of the cases whose fastest round regressed beyond
+    `threshold`. The minimum is compared rather than the median because it is the least affected by
+    other load on the machine.
+    """
+    if baseline.get("format") != current.get("format"):
+        raise SystemExit(f"Baseline format {baseline.get('format')} does not match current format {current.get('format')}; re-record the baseline.")
+    if baseline.get("environment") != current.get("environment"):
+        print("warning: baseline was recorded on a different machine or Python version; differences may not be meaningful")
+
+    regressions = []
+    print(f"{'case (min us)':<48} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<48} {'-':>12} {result['min_us']:>12.1f} {'new':>8}")
+            continue
+        change = result["min_us"] / base["min_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<48} {base['min_us']:>12.1f} {result['min_us']:>12.1f} {change:>+8.1%}{flag}")
+    for name in sorted(baseline["results"].keys() - current["results"].keys()):
+        if not name_filter or name_filter in name:
+            print(f"{name:<48} {'(not run)':>12}")
+    return regressions
+
+
+def record_samples() -> None:
+    """Calls each route once with the fixture prompts and stores the raw replies as the new LLM samples."""
+    from app.services.ai_service import _build_payload, _post_completion, FIR_SYSTEM_PROMPT
+    from app.routers.case_retriever import RETRIEVAL_SYSTEM_PROMPT
+    from app.services.timeline_templates import TIMELINE_SYSTEM_PROMPT
+    from app.routers.judgment_predictor import REASONING_SYSTEM_PROMPT
+    from app.services.model_router import model_router
+
+    fir_text = generate_fir_text(2)
+    explained = parse_json_response(load_llm_samples()["fir_explain"])
+    case_summary = build_case_summary(explained["structured_summary"], explained["ipc_sections"])
+    prompts: Dict[str, Tuple[str, Optional[str]]] = {
+        "fir_explain": (create_fir_prompt(clean_text_for_json(fir_text)), FIR_SYSTEM_PROMPT),
+        "fir_validate": (create_validation_prompt(fir_text), None),
+        "arguments": (create_argument_prompt(case_summary), None),
+        "case_retrieval": (create_retrieval_prompt(case_summary), RETRIEVAL_SYSTEM_PROMPT),
+        "timeline": (create_timeline_prompt(case_summary), TIMELINE_SYSTEM_PROMPT),
+        "prediction": (create_prediction_prompt(case_summary), REASONING_SYSTEM_PROMPT),
+    }
+
+    samples = {}
+    for route, (prompt, system_prompt) in prompts.items():
+        choice = model_router.choose(route, prompt)
+        result = _post_completion(_build_payload(choice, prompt, system_prompt, True))
+        samples[route] = {"model": choice.model, "content": result["choices"][0]["message"]["content"]}
+        parse_json_response(samples[route]["content"])  # a reply that does not parse is not a useful sample
+        print(f"recorded {route} ({choice.model}, {len(samples[route]['content'])} chars)")
+
+    with open(LLM_FIXTURES, "w", encoding="utf-8") as handle:
+        json.dump({"recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "samples": samples},
+                  handle, indent=2, ensure_ascii=False)
+        handle.write("\n")
+
+
+def _write_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2)
+        handle.write("\n")
+    print(f"wrote {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and print the timings.")
+    run_parser.add_argument("--filter", help="Only run cases whose name contains this string.")
+    run_parser.add_argument("--rounds", type=int, default=5)
+    run_parser.add_argument("--save", metavar="NAME", help="Store the results as benchmarks/baselines/NAME.json.")
+    run_parser.add_argument("--output", help="Write the results to this JSON file.")
+
+    compare_parser = commands.add_parser("compare", help="Compare results against a baseline.")
+    compare_parser.add_argument("baseline", help="Baseline JSON file (e.g. benchmarks/baselines/NAME.json).")
+    compare_parser.add_argument("current", nargs="?", help="Results JSON file; the suite is run if omitted.")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown per case (0.10 = 10%%).")
+    compare_parser.add_argument("--filter", help="Only run cases whose name contains this string.")
+    compare_parser.add_argument("--rounds", type=int, default=5)
+
+    commands.add_parser("record", help="Record live OpenRouter replies as the LLM response fixtures.")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record_samples()
+        return
+
+    if args.command == "run":
+        results = run_suite(args.filter, args.rounds)
+        if args.save:
+            _write_json(os.path.join(BASELINE_DIR, f"{args.save}.json"), results)
+        if args.output:
+            _write_json(args.output, results)
+        return
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    if args.current:
+        with open(args.current, encoding="utf-8") as handle:
+            current = json.load(handle)
+    else:
+        current = run_suite(args.filter, args.rounds)
+        print()
+    regressions = compare_results(baseline, current, args.threshold, args.filter)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
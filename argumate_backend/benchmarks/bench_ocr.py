@@ -0,0 +1,67 @@
+# benchmarks/bench_ocr.py
+"""
+Measures OCR throughput (pages/s) of the scanned-PDF fallback against the number of worker processes.
+
+Usage (from argumate_backend/):
+    python -m benchmarks.bench_ocr path/to/scanned_fir.pdf [--workers 1 2 4 8] [--repeat 2]
+"""
+import argparse
+import asyncio
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+
+from app.services.ocr_service import extract_page_pdf, ocr_available, ocr_pages
+
+
+def _default_worker_counts():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+async def _run(page_pdfs, workers, repeat):
+    best = None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Warm the pool so process start-up is not counted
+        await ocr_pages(page_pdfs[:1], executor=pool, use_cache=False)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await ocr_pages(page_pdfs, executor=pool, use_cache=False)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", help="Scanned PDF to recognize (every page is OCR'd).")
+    parser.add_argument("--workers", type=int, nargs="+", default=_default_worker_counts())
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    if not ocr_available():
+        raise SystemExit("OCR is unavailable: install pytesseract/pdf2image plus the tesseract and poppler binaries.")
+
+    with open(args.pdf, "rb") as handle:
+        reader = PyPDF2.PdfReader(io.BytesIO(handle.read()))
+    page_pdfs = [extract_page_pdf(reader, i) for i in range(len(reader.pages))]
+
+    print(f"{len(page_pdfs)} pages, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        elapsed = asyncio.run(_run(page_pdfs, workers, args.repeat))
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {len(page_pdfs) / elapsed:>9.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
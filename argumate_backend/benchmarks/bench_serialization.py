@@ -0,0 +1,107 @@
+# benchmarks/bench_serialization.py
+"""
+Compares response serialization cost and bytes on the wire per endpoint.
+
+- "default": FastAPI's previous path (response_model re-validation + jsonable_encoder + json.dumps)
+- "orjson":  model_response() (model_dump + orjson, no re-validation)
+- bytes for identity / gzip / brotli as produced by CompressionMiddleware
+
+Usage (from argumate_backend/):
+    python -m benchmarks.bench_serialization [--iterations 2000]
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.compression import brotli, compress_body
+from app.core.responses import model_response
+from app.models import schemas
+
+_SENTENCE = "The accused allegedly entered the complainant's house at night and removed gold ornaments. "
+
+
+def _text(sentences: int) -> str:
+    return (_SENTENCE * sentences).strip()
+
+
+def sample_payloads():
+    """Representative response models for each endpoint, sized like typical AI output."""
+    return {
+        "/fir/explain": schemas.FirExplanationResponse(
+            message="FIR processed successfully by ArguMate!",
+            simplified_explanation=_text(12),
+            structured_summary={
+                "complainant_name": "Ramesh Kumar", "accused_name_s": ["Suresh", "Mahesh"],
+                "victim_name_s": ["Ramesh Kumar"], "date_of_incident": "12/03/2024",
+                "time_of_incident": "23:30", "place_of_incident": "Sector 21, Noida",
+                "brief_offence_description": _text(3), "fir_number": "0123/2024",
+                "police_station": "Sector 20", "date_of_fir": "13/03/2024",
+            },
+            ipc_sections=[{"section": f"IPC Section {s}", "reason": _text(2)} for s in (380, 457, 34)],
+            fir_id="a1b2c3d4e5f6g7h8i9j0",
+        ),
+        "/fir-validator/validate": schemas.FirValidationResponse(
+            message="FIR draft validated successfully.", overall_score=72,
+            validation_points=[{"issue": _text(1), "suggestion": _text(2), "severity": "Medium"}] * 6,
+        ),
+        "/arguments/build": schemas.ArgumentBuilderResponse(
+            message="Arguments generated successfully.",
+            prosecution_arguments=[{"point": _text(1), "reasoning": _text(4)}] * 6,
+            defense_arguments=[{"point": _text(1), "reasoning": _text(4)}] * 6,
+        ),
+        "/cases/find-similar": schemas.CaseRetrieverResponse(
+            message="Similar cases retrieved successfully.",
+            similar_cases=[
+                {"citation": "(2014) 8 SCC 273", "case_name": "Arnesh Kumar v. State of Bihar",
+                 "summary": _text(4), "relevance": _text(2)}
+            ] * 5,
+        ),
+        "/timeline/generate": schemas.CaseTimelineResponse(
+            message="Case timeline generated successfully.",
+            timeline_steps=[
+                {"step_title": "Investigation", "description": _text(3), "estimated_date_or_duration": "1-3 months"}
+            ] * 7,
+        ),
+        "/predict/outcome": schemas.PredictionResponse(
+            message="Judgment prediction generated successfully.", predicted_outcome="Conviction",
+            confidence_score=74, reasoning=_text(5),
+        ),
+    }
+
+
+def _time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<26} {'default us':>10} {'orjson us':>10} {'bytes':>7} {'gzip':>7} {'br':>7}")
+    for endpoint, model in sample_payloads().items():
+        model_cls = type(model)
+        raw = model.model_dump()
+
+        def default_path():
+            validated = model_cls.model_validate(raw)
+            json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        def orjson_path():
+            model_response(model).body
+
+        default_us = _time_per_call(default_path, args.iterations)
+        orjson_us = _time_per_call(orjson_path, args.iterations)
+        body = model_response(model).body
+        gzip_size = len(compress_body(body, "gzip"))
+        br_size = len(compress_body(body, "br")) if brotli is not None else 0
+        print(f"{endpoint:<26} {default_us:>10.1f} {orjson_us:>10.1f} {len(body):>7} {gzip_size:>7} {br_size or '-':>7}")
+
+
+if __name__ == "__main__":
+    main()
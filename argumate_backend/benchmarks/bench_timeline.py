@@ -0,0 +1,90 @@
+# benchmarks/bench_timeline.py
+"""
+Compares /timeline/generate strategies per offence class:
+
+- "free-form": the original prompt, where the AI writes the whole 5-7 step timeline
+- "template":  the offence-class template, with the AI only rewriting step descriptions
+- "fast":      the template alone (no AI call)
+
+Offline (default), it reports the local classification time, prompt tokens and the estimated output tokens
+of each strategy. With --live it also calls OpenRouter and reports measured latency and completion tokens
+(needs the backend's .env: GEMINI_API_KEY and the Firebase credentials loaded by app.core.config).
+
+Usage (from argumate_backend/):
+    python -m benchmarks.bench_timeline [--live] [--repeat 3]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from app.services.fir_chunking import estimate_tokens
+from app.services.timeline_templates import (
+    TIMELINE_SYSTEM_PROMPT, TIMELINE_TEMPLATES, classify_offence, create_timeline_adaptation_prompt,
+    create_timeline_prompt, render_template,
+)
+
+SAMPLE_CASES = {
+    "theft": "FIR No. 0123/2024, PS Sector 20, Noida. The accused Suresh entered the complainant Ramesh Kumar's house at night and stole gold ornaments and a mobile phone. Sections invoked: IPC Section 380, IPC Section 457.",
+    "murder": "The accused Mahesh attacked the deceased with a knife over a land dispute on 12/03/2024 in Village Rampur; the victim died on the way to hospital. The accused was arrested the next day. FIR registered u/s 302, 34 IPC.",
+    "pocso": "The accused, a neighbour, sexually assaulted a 12-year-old girl at his house. The mother reported the matter and the child was medically examined. Case under Section 6 of the POCSO Act and Section 65(1) BNS.",
+    "rash_driving": "A truck driven rashly hit a motorcycle at the Ring Road crossing, injuring the rider, who suffered a fractured leg. The driver was detained at the spot. Case under s. 279, 338 IPC.",
+    "intimidation": "The complainant alleges that her neighbour abused her in public, slapped her and threatened to harm her family if she complained about the drainage dispute. Offences under Sections 323, 504, 506 IPC.",
+}
+
+
+def _time_us(func, iterations: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _live_call(route: str, prompt: str):
+    """Returns (seconds, completion_tokens) for one routed JSON completion."""
+    from app.services.ai_service import _build_payload, _post_completion
+    from app.services.model_router import model_router
+
+    payload = _build_payload(model_router.choose(route, prompt), prompt, TIMELINE_SYSTEM_PROMPT, True)
+    start = time.perf_counter()
+    result = _post_completion(payload)
+    elapsed = time.perf_counter() - start
+    usage = result.get("usage") or {}
+    return elapsed, usage.get("completion_tokens") or estimate_tokens(result["choices"][0]["message"]["content"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="Also call OpenRouter and measure latency.")
+    parser.add_argument("--repeat", type=int, default=3, help="Live calls per case and strategy.")
+    args = parser.parse_args()
+
+    print(f"{'case':<14} {'class':<24} {'classify us':>11} {'prompt tok free/tmpl':>21} {'output tok free/tmpl/fast':>26}")
+    for name, summary in SAMPLE_CASES.items():
+        classification = classify_offence(summary)
+        template = TIMELINE_TEMPLATES[classification.category]
+        steps = render_template(template, classification.sections)
+        free_prompt = create_timeline_prompt(summary)
+        adapt_prompt = create_timeline_adaptation_prompt(summary, template, steps)
+        # A free-form reply has the size of a full timeline; an adaptation reply only carries the descriptions
+        free_output = estimate_tokens(json.dumps({"timeline_steps": steps}))
+        adapt_output = estimate_tokens(json.dumps({"descriptions": [s["description"] for s in steps]}))
+        classify_us = _time_us(lambda: render_template(template, classify_offence(summary).sections))
+        print(
+            f"{name:<14} {classification.category:<24} {classify_us:>11.1f} "
+            f"{estimate_tokens(free_prompt):>10}/{estimate_tokens(adapt_prompt):<10} "
+            f"{free_output:>12}/{adapt_output}/0"
+        )
+
+        if args.live:
+            free = [_live_call("timeline", free_prompt) for _ in range(args.repeat)]
+            adapt = [_live_call("timeline_adapt", adapt_prompt) for _ in range(args.repeat)]
+            print(
+                f"{'':<14} live median: free-form {statistics.median(s for s, _ in free):.2f}s "
+                f"({statistics.median(t for _, t in free):.0f} tok), template {statistics.median(s for s, _ in adapt):.2f}s "
+                f"({statistics.median(t for _, t in adapt):.0f} tok), fast {classify_us / 1000:.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/bench_ws_connections.py
+"""
+Measures how many idle /chat/ws connections one worker holds and the server memory each one costs.
+
+A uvicorn worker serving the chat router is started in a subprocess (token verification is replaced
+by a stub, so no Firebase users are needed). Authenticated idle connections are then opened in steps;
+after each step the worker's resident memory and the ping round-trip over one connection are reported.
+
+Most of the per-connection memory belongs to uvicorn's WebSocket implementation rather than the chat
+handler: "websockets-sansio" (the default here) measured ~73 KB per idle connection against ~135 KB for
+the legacy "websockets" implementation, so run the server with `uvicorn main:app --ws websockets-sansio`.
+
+Usage (from argumate_backend/, needs the backend's .env because app.core.config is imported):
+    python -m benchmarks.bench_ws_connections [--connections 500 1000 2000 4000] [--ws websockets-sansio]
+"""
+import argparse
+import asyncio
+import json
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import websockets
+
+
+def _raise_file_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 1 << 20, hard))
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def serve(port: int, ws_impl: str) -> None:
+    """Runs a single worker with the chat router and stubbed token verification."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    from app.routers import chatbot
+
+    async def verify_bench_token(token: str):
+        return {"uid": token, "exp": time.time() + 3600}
+
+    chatbot.verify_websocket_token = verify_bench_token
+    chatbot.CHAT_WS_MAX_CONNECTIONS = 1 << 20
+    app = FastAPI()
+    app.include_router(chatbot.router)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", ws_ping_interval=None, backlog=4096, ws=ws_impl)
+
+
+def _wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as probe:
+            if probe.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise SystemExit(f"Benchmark server did not start on port {port}")
+
+
+async def _open(uri: str, index: int):
+    ws = await websockets.connect(uri, ping_interval=None, max_queue=4)
+    await ws.send(json.dumps({"type": "auth", "token": f"bench-user-{index}"}))
+    reply = json.loads(await ws.recv())
+    if reply.get("type") != "ready":
+        raise RuntimeError(f"Unexpected reply: {reply}")
+    return ws
+
+
+async def _ping_ms(ws, rounds: int = 50) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await ws.send('{"type": "ping"}')
+        await ws.recv()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run(port: int, server_pid: int, steps) -> None:
+    uri = f"ws://127.0.0.1:{port}/chat/ws"
+    connections = []
+    baseline_kb = None
+    print(f"{'connections':>11} {'rss MB':>8} {'KB/conn':>8} {'open/s':>8} {'ping ms':>8}")
+    for target in steps:
+        if baseline_kb is None:
+            baseline_kb = _rss_kb(server_pid)
+        already_open, start = len(connections), time.perf_counter()
+        while len(connections) < target:
+            batch = min(200, target - len(connections))
+            connections += await asyncio.gather(*(_open(uri, len(connections) + i) for i in range(batch)))
+        opened_per_second = (target - already_open) / max(time.perf_counter() - start, 1e-9)
+        await asyncio.sleep(1)  # let the server settle before sampling memory
+        rss_kb = _rss_kb(server_pid)
+        per_connection = (rss_kb - baseline_kb) / len(connections)
+        ping = await _ping_ms(connections[0])
+        print(f"{len(connections):>11} {rss_kb / 1024:>8.1f} {per_connection:>8.1f} {opened_per_second:>8.0f} {ping:>8.2f}")
+    await asyncio.gather(*(ws.close() for ws in connections))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ws", default="websockets-sansio", help="uvicorn WebSocket implementation (uvicorn --ws).")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    _raise_file_limit()
+    if args.serve:
+        serve(args.port, args.ws)
+        return
+
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_ws_connections", "--serve", "--port", str(args.port), "--ws", args.ws])
+    try:
+        _wait_for_port(args.port)
+        asyncio.run(run(args.port, server.pid, sorted(args.connections)))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,17 @@ import os
 import logging
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from firebase_admin import firestore
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import your project's modules
-from app.core.config import db
-from app.routers import auth, fir_explainer, chatbot, fir_validator, argument_builder, case_retriever, case_timeline, judgment_predictor
+from app.core.config import db, OUTCOME_MODEL_DIR, COMPRESSION_MIN_SIZE, LOOP_LAG_MONITOR_ENABLED
+from app.core.compression import CompressionMiddleware
+from app.core.diagnostics import loop_lag_monitor
+from app.services.ai_service import close_stream_client
+from app.services.outcome_model import init_outcome_model
+from app.routers import auth, fir_explainer, chatbot, fir_validator, argument_builder, case_retriever, case_timeline, judgment_predictor, history, admin
 
 # Load environment variables from .env file for local development
 load_dotenv()
@@ -21,6 +26,7 @@ app = FastAPI(
     title="ArguMate Backend API",
     description="AI-Powered FIR Explainer & Legal Assistant Backend",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # --- CORS Configuration for Deployment ---
@@ -36,6 +42,9 @@ app.add_middleware(
 )
 # --- End CORS Configuration ---
 
+# Negotiated brotli/gzip compression for large JSON responses (timelines, arguments, bulk results)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
 # Include all the routers for different features
 app.include_router(auth.router)
 app.include_router(fir_explainer.router)
@@ -45,6 +54,27 @@ app.include_router(argument_builder.router)
 app.include_router(case_retriever.router)
 app.include_router(case_timeline.router)
 app.include_router(judgment_predictor.router)
+app.include_router(history.router)
+app.include_router(admin.router)
+
+# Load local models once per worker (weights are memory-mapped, so this is cheap)
+@app.on_event("startup")
+async def load_local_models():
+    init_outcome_model(OUTCOME_MODEL_DIR)
+
+# Opt-in: logs the stack of whatever blocks the event loop for longer than LOOP_LAG_THRESHOLD_MS
+@app.on_event("startup")
+async def start_diagnostics():
+    if LOOP_LAG_MONITOR_ENABLED:
+        loop_lag_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_diagnostics():
+    loop_lag_monitor.stop()
+
+@app.on_event("shutdown")
+async def close_ai_clients():
+    await close_stream_client()
 
 # Root endpoint for a basic health check
 @app.get("/")
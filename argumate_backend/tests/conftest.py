@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os
+
+# app.core.config initializes Firebase on import and exits without credentials. Pointing Firestore at
+# the emulator lets it use the emulator credential, and keeps tests away from a real project.
+# Tests that need a running emulator are skipped unless FIREBASE_AUTH_EMULATOR_HOST is set.
+os.environ.setdefault("FIRESTORE_EMULATOR_HOST", "localhost:8080")
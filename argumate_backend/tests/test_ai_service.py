@@ -0,0 +1,73 @@
+# tests/test_ai_service.py
+import asyncio
+
+import pytest
+
+from app.services import ai_service
+from app.services.model_router import ModelRouter, build_policies
+
+DEFAULT, FAST = "default-model", "fast-model"
+
+
+@pytest.fixture
+def replies(monkeypatch):
+    """Stubs the OpenRouter call: each call pops the next (content, finish_reason) and records its payload."""
+    queued, payloads = [], []
+
+    def post_completion(payload):
+        payloads.append(payload)
+        content, finish_reason = queued.pop(0)
+        return {"choices": [{"message": {"content": content}, "finish_reason": finish_reason}]}
+
+    monkeypatch.setattr(ai_service, "_post_completion", post_completion)
+    monkeypatch.setattr(ai_service, "model_router", ModelRouter(build_policies(DEFAULT, FAST, {}), DEFAULT))
+    return queued, payloads
+
+
+def test_fast_text_reply_is_returned(replies):
+    queued, payloads = replies
+    queued.append(("Bail is a right for bailable offences.", "stop"))
+    completion = asyncio.run(ai_service.request_text_completion("Is theft bailable?"))
+    assert completion == ai_service.TextCompletion("Bail is a right for bailable offences.", False)
+    assert [(p["model"], p["max_tokens"]) for p in payloads] == [(FAST, 1024)]
+
+
+def test_truncated_text_reply_is_retried_on_the_heavy_model_with_a_larger_cap(replies):
+    queued, payloads = replies
+    queued.extend([("A long answer that was cut", "length"), ("The complete answer.", "stop")])
+    completion = asyncio.run(ai_service.request_text_completion("Explain bail"))
+    assert completion == ai_service.TextCompletion("The complete answer.", False)
+    assert [(p["model"], p["max_tokens"]) for p in payloads] == [(FAST, 1024), (DEFAULT, 2048)]
+
+
+def test_empty_text_reply_is_retried_with_the_same_cap(replies):
+    queued, payloads = replies
+    queued.extend([("", "stop"), ("Answer.", "stop")])
+    assert asyncio.run(ai_service.request_text_completion("Explain bail")).text == "Answer."
+    assert [(p["model"], p["max_tokens"]) for p in payloads] == [(FAST, 1024), (DEFAULT, 1024)]
+
+
+def test_text_reply_still_truncated_on_the_heavy_model_is_flagged(replies):
+    queued, payloads = replies
+    queued.extend([("cut", "length"), ("still cut", "length")])
+    completion = asyncio.run(ai_service.request_text_completion("Explain bail"))
+    assert completion == ai_service.TextCompletion("still cut", True)
+    assert len(payloads) == 2
+
+
+def test_json_reply_missing_keys_is_retried_on_the_heavy_model(replies):
+    queued, payloads = replies
+    queued.extend([('{"timeline_steps": []', "length"), ('{"timeline_steps": [{"step": 1}]}', "stop")])
+    data = asyncio.run(ai_service.request_json_completion("Theft case", system_prompt=None, route="timeline"))
+    assert data == {"timeline_steps": [{"step": 1}]}
+    assert [(p["model"], p["max_tokens"]) for p in payloads] == [(FAST, 900), (DEFAULT, 1800)]
+    assert payloads[0]["messages"] == [{"role": "user", "content": "Theft case"}]
+    assert payloads[0]["response_format"] == {"type": "json_object"}
+
+
+def test_unparseable_json_from_the_heavy_model_raises(replies):
+    queued, payloads = replies
+    queued.append(("not json", "stop"))
+    with pytest.raises(ValueError):
+        asyncio.run(ai_service.request_json_completion("FIR text", route="fir_explain"))
+    assert [p["model"] for p in payloads] == [DEFAULT]
@@ -0,0 +1,35 @@
+# tests/test_compression.py
+import pytest
+
+from app.core import compression
+from app.core.compression import choose_encoding
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("*", "gzip"),
+    ("gzip;q=0, *", None),
+    ("GZIP;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_gzip_negotiation(without_brotli, header, expected):
+    assert choose_encoding(header) == expected
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli is not installed")
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0, *", "gzip"),
+    ("br;q=0, gzip;q=0, *", None),
+    ("gzip;q=0, *", "br"),
+])
+def test_brotli_negotiation(header, expected):
+    assert choose_encoding(header) == expected
@@ -0,0 +1,83 @@
+# tests/test_fir_chunking.py
+from app.services.fir_chunking import PAGE_BREAK, estimate_tokens, merge_partial_results, split_into_chunks
+
+
+def _summaries(*summaries):
+    return [{"structured_summary": summary} for summary in summaries]
+
+
+def test_scalar_then_list_keeps_both_names():
+    merged = merge_partial_results(_summaries({"accused_name_s": "Suresh"}, {"accused_name_s": ["Mahesh"]}))
+    assert merged["structured_summary"]["accused_name_s"] == ["Suresh", "Mahesh"]
+
+
+def test_list_then_scalar_keeps_both_names():
+    merged = merge_partial_results(_summaries({"accused_name_s": ["Suresh"]}, {"accused_name_s": "Mahesh"}))
+    assert merged["structured_summary"]["accused_name_s"] == ["Suresh", "Mahesh"]
+
+
+def test_list_fields_are_unioned_case_insensitively():
+    merged = merge_partial_results(_summaries(
+        {"accused_name_s": ["Suresh", "Mahesh"]},
+        {"accused_name_s": ["mahesh ", "Ramesh"]},
+        {"accused_name_s": "SURESH"},
+    ))
+    assert merged["structured_summary"]["accused_name_s"] == ["Suresh", "Mahesh", "Ramesh"]
+
+
+def test_scalar_fields_keep_first_non_empty_value():
+    merged = merge_partial_results(_summaries(
+        {"police_station": "", "complainant_name": None},
+        {"police_station": "Sector 20", "complainant_name": "Sunita Devi"},
+        {"police_station": "Sector 21"},
+    ))
+    assert merged["structured_summary"] == {"police_station": "Sector 20", "complainant_name": "Sunita Devi"}
+
+
+def test_offence_description_is_concatenated():
+    merged = merge_partial_results(_summaries(
+        {"brief_offence_description": "House break-in at night."},
+        {"brief_offence_description": "Gold ornaments were stolen."},
+        {"brief_offence_description": "Gold ornaments were stolen."},
+    ))
+    assert merged["structured_summary"]["brief_offence_description"] == (
+        "House break-in at night. Gold ornaments were stolen."
+    )
+
+
+def test_ipc_sections_are_deduplicated_by_label_and_key_points_collected():
+    merged = merge_partial_results([
+        {"ipc_sections": [{"section": "IPC Sec. 420", "reason": "cheating"}], "key_points": ["Money taken.", "No job given."]},
+        {"ipc_sections": [{"section": "Section 420 IPC"}, {"section": "406 IPC"}, "bad", {"reason": "no label"}]},
+        {"key_points": "  "},
+    ])
+    assert merged["ipc_sections"] == [
+        {"section": "IPC Sec. 420", "reason": "cheating"},
+        {"section": "406 IPC", "reason": ""},
+    ]
+    assert merged["key_points"] == ["Money taken. No job given."]
+
+
+def test_short_text_is_one_chunk():
+    assert split_into_chunks("On 12 March the accused entered the house.", max_tokens=100) == [
+        "On 12 March the accused entered the house."
+    ]
+
+
+def test_pages_are_packed_up_to_the_budget():
+    pages = ["a" * 150, "b" * 150, "c" * 150]
+    chunks = split_into_chunks(PAGE_BREAK.join(pages), max_tokens=80)
+    assert chunks == [f"{pages[0]}\n\n{pages[1]}", pages[2]]
+
+
+def test_oversized_page_is_split_on_sentences_then_cut():
+    sentences = " ".join(f"Sentence number {i} describes the incident." for i in range(40))
+    unbroken = "x" * 1000
+    chunks = split_into_chunks(f"{sentences}{PAGE_BREAK}{unbroken}", max_tokens=50)
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert "".join(chunks).replace("\n\n", " ").replace(" ", "") == f"{sentences}{unbroken}".replace(" ", "")
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+
+
+def test_blank_pages_are_skipped():
+    assert split_into_chunks(f"first{PAGE_BREAK}  \n {PAGE_BREAK}second", max_tokens=2) == ["first", "second"]
@@ -0,0 +1,67 @@
+# tests/test_history_cache.py
+from app.services import history_cache as history_cache_module
+from app.services.history_cache import HistoryCache
+
+PAGE = (b"[]", '"etag"')
+
+
+def test_put_after_concurrent_invalidation_is_skipped():
+    cache = HistoryCache()
+    generation = cache.generation("u1", "fir")
+    cache.invalidate("u1", "fir")  # a save finishes while the read is in flight
+    cache.put("u1", ("fir", "list"), PAGE, generation)
+    assert cache.get("u1", ("fir", "list")) is None
+
+    cache.put("u1", ("fir", "list"), PAGE, cache.generation("u1", "fir"))
+    assert cache.get("u1", ("fir", "list")) == PAGE
+
+
+def test_invalidating_all_kinds_or_another_kind():
+    cache = HistoryCache()
+    generation = cache.generation("u1", "fir")
+    cache.invalidate("u1", "chat")
+    cache.invalidate("u2")
+    cache.put("u1", ("fir", "list"), PAGE, generation)
+    assert cache.get("u1", ("fir", "list")) == PAGE
+
+    generation = cache.generation("u1", "fir")
+    cache.invalidate("u1")
+    cache.put("u1", ("fir", "list"), PAGE, generation)
+    assert cache.get("u1", ("fir", "list")) is None
+
+
+def test_evicted_generation_never_looks_current_again():
+    cache = HistoryCache(max_generations=2)
+    generation = cache.generation("u1", "fir")
+    cache.invalidate("u1", "fir")
+    # Push ("u1", "fir") out of the generation table; it must not fall back to the captured value
+    cache.invalidate("u2", "fir")
+    cache.invalidate("u3", "fir")
+    assert ("u1", "fir") not in cache._generations
+    cache.put("u1", ("fir", "list"), PAGE, generation)
+    assert cache.get("u1", ("fir", "list")) is None
+
+    cache.put("u1", ("fir", "list"), PAGE, cache.generation("u1", "fir"))
+    assert cache.get("u1", ("fir", "list")) == PAGE
+
+
+def test_entries_per_user_are_capped_oldest_first():
+    cache = HistoryCache(max_entries_per_user=3)
+    for cursor in range(5):
+        cache.put("u1", ("fir", "list", 20, cursor), PAGE)
+    assert [key[3] for key in cache._users["u1"]] == [2, 3, 4]
+
+    cache.put("u1", ("fir", "list", 20, 2), PAGE)
+    cache.put("u1", ("fir", "list", 20, 5), PAGE)
+    assert [key[3] for key in cache._users["u1"]] == [4, 2, 5]
+
+
+def test_put_drops_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(history_cache_module.time, "monotonic", lambda: now[0])
+    cache = HistoryCache(ttl_seconds=60)
+    cache.put("u1", ("fir", "list", 20, None), PAGE)
+    cache.put("u1", ("fir", "list", 20, "c1"), PAGE)
+    now[0] += 61
+    cache.put("u1", ("fir", "detail", "d1"), PAGE)
+    assert list(cache._users["u1"]) == [("fir", "detail", "d1")]
@@ -0,0 +1,53 @@
+# tests/test_model_router.py
+from app.services.model_router import ModelRouter, RouteChoice, build_policies
+
+DEFAULT, FAST = "default-model", "fast-model"
+
+
+def make_router(overrides=None):
+    return ModelRouter(build_policies(DEFAULT, FAST, overrides or {}), default_model=DEFAULT)
+
+
+def test_short_chat_goes_to_the_fast_model():
+    choice = make_router().choose("chat", "What is anticipatory bail?")
+    assert choice == RouteChoice("chat", FAST, "light", 1024, DEFAULT)
+
+
+def test_long_chat_goes_to_the_default_model():
+    choice = make_router().choose("chat", "word " * 1000)
+    assert choice == RouteChoice("chat", DEFAULT, "heavy", 1024, None)
+
+
+def test_heavy_routes_and_unknown_routes_never_escalate():
+    router = make_router()
+    assert router.choose("fir_explain", "short") == RouteChoice("fir_explain", DEFAULT, "heavy", 4096, None)
+    assert router.choose("not_a_route", "short") == RouteChoice("not_a_route", DEFAULT, "heavy", 2048, None)
+
+
+def test_overrides_replace_fields_and_ignore_unknown_ones():
+    router = make_router({
+        "chat": {"heavy_above_tokens": 2, "max_tokens": 800, "temperature": 0.2},
+        "fir_validate": {"expected_keys": ["overall_score"]},
+        "custom": {"max_tokens": 300},
+    })
+    chat = router.policy("chat")
+    assert (chat.heavy_above_tokens, chat.max_tokens, chat.light_model) == (2, 800, FAST)
+    assert router.choose("chat", "What is anticipatory bail?").model == DEFAULT
+    assert router.policy("fir_validate").expected_keys == ("overall_score",)
+    assert router.policy("custom").max_tokens == 300
+
+
+def test_has_expected_keys():
+    router = make_router()
+    assert router.has_expected_keys("timeline", {"timeline_steps": []})
+    assert not router.has_expected_keys("timeline", {"steps": []})
+    assert not router.has_expected_keys("timeline", ["timeline_steps"])
+
+
+def test_truncated_reply_escalates_with_a_larger_cap():
+    router = make_router({"fir_validate": {"escalation_max_tokens": 1600}})
+    chat = router.choose("chat", "short question")
+    assert router.escalate(chat, truncated=True) == RouteChoice("chat", DEFAULT, "heavy", 2048, None)
+    assert router.escalate(chat, truncated=False) == RouteChoice("chat", DEFAULT, "heavy", 1024, None)
+    validate = router.choose("fir_validate", "short draft")
+    assert router.escalate(validate, truncated=True).max_tokens == 1600
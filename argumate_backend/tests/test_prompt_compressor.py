@@ -0,0 +1,65 @@
+# tests/test_prompt_compressor.py
+from app.services.fir_chunking import PAGE_BREAK
+from app.services.prompt_compressor import compress_fir_text
+
+
+def _pages(*pages):
+    return PAGE_BREAK.join("\n".join(lines) for lines in pages)
+
+
+def test_repeated_header_keeps_first_copy_and_page_breaks():
+    header = "District: Gautam Buddh Nagar   P.S.: Sector 20   FIR No.: 0123"
+    text = _pages(
+        [header, "Page 1", "The accused Suresh entered the house at night."],
+        [header, "Page 2", "He removed gold ornaments from the almirah."],
+    )
+    compressed, report = compress_fir_text(text)
+    assert compressed == _pages(
+        [header, "The accused Suresh entered the house at night."],
+        ["He removed gold ornaments from the almirah."],
+    )
+    assert report.repeated_lines_removed == 1
+    assert report.template_lines_removed == 2
+    assert report.tokens_after < report.tokens_before
+
+
+def test_repeated_incident_with_other_numbers_is_kept():
+    # "12" and "March" already appear in kept text, but not in an earlier copy of this line
+    text = _pages(
+        ["FIR No. 12 registered in March", "On 3 March the accused Mahesh threatened the complainant."],
+        ["FIR No. 12 registered in March", "On 12 March the accused Mahesh threatened the complainant."],
+    )
+    compressed, report = compress_fir_text(text)
+    assert "On 3 March the accused Mahesh threatened the complainant." in compressed
+    assert "On 12 March the accused Mahesh threatened the complainant." in compressed
+    assert report.repeated_lines_removed == 1
+
+
+def test_identical_repeated_incident_is_dropped_once():
+    line = "On 12 March the accused Mahesh threatened the complainant."
+    compressed, report = compress_fir_text(_pages([line], [line], [line]))
+    assert compressed.split(PAGE_BREAK) == [line, "", ""]
+    assert report.repeated_lines_removed == 2
+
+
+def test_dated_template_lines_are_kept():
+    dated = "This is a computer generated report dated 12/03/2024 by SI Rakesh Singh, P.S. Sector 20"
+    text = "\n".join([
+        "FIRST INFORMATION REPORT",
+        "This is a computer generated report and does not require signature.",
+        dated,
+        "Signature of the complainant",
+        "The accused took Rs. 45,000 for a government job.",
+    ])
+    compressed, report = compress_fir_text(text)
+    assert compressed == f"{dated}\nThe accused took Rs. 45,000 for a government job."
+    assert report.template_lines_removed == 3
+
+
+def test_boilerplate_only_upload_compresses_to_nothing():
+    text = _pages(
+        ["FIRST INFORMATION REPORT", "(Under Section 154 Cr.P.C.)", "Page 1 of 2", "(Official Seal)"],
+        ["Page 2 of 2", "Signature/Thumb impression of the complainant"],
+    )
+    compressed, _ = compress_fir_text(text)
+    assert compressed.replace(PAGE_BREAK, "").strip() == ""
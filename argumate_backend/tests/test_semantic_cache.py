@@ -0,0 +1,39 @@
+# tests/test_semantic_cache.py
+import pytest
+
+from app.services.semantic_cache import HashingEmbedder, SemanticCache, is_cacheable_question
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(HashingEmbedder(), threshold=0.85)
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("is theft a bailable offence", "is theft a non-bailable offence"),
+    ("is murder bailable", "is murder not bailable"),
+    ("can police register an FIR", "can police refuse to register an FIR"),
+    ("can police arrest at night", "police cannot arrest at night"),
+])
+def test_flipped_polarity_is_a_miss(cache, stored, asked):
+    cache.store(stored, "answer")
+    assert cache.lookup(asked) is None
+    cache.store(asked, "opposite answer")
+    assert cache.lookup(stored) == "answer"
+
+
+def test_rephrased_question_is_a_hit(cache):
+    cache.store("what is IPC section 420", "Cheating and dishonestly inducing delivery of property.")
+    assert cache.lookup("explain section 420 of IPC") == "Cheating and dishonestly inducing delivery of property."
+    assert cache.lookup("explain section 302 of IPC") is None
+
+
+def test_contracted_negation_matches_cannot(cache):
+    cache.store("police cannot refuse to register an FIR", "answer")
+    assert cache.lookup("police can't refuse to register an FIR") == "answer"
+
+
+def test_personal_questions_are_not_cacheable():
+    assert is_cacheable_question("tell me about IPC 420")
+    assert not is_cacheable_question("my landlord took my deposit, what can I do")
+    assert not is_cacheable_question("I was arrested yesterday")
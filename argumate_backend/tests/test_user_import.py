@@ -0,0 +1,106 @@
+# tests/test_user_import.py
+import json
+import os
+import uuid
+
+import pytest
+
+from app.models.schemas import UserCreate
+from app.services.user_import import parse_user_upload, register_user_chunk, validate_users
+
+
+def test_csv_with_bom_and_blank_rows():
+    content = (
+        "display_name, email ,password\r\n"
+        "Asha Rao, asha@firm.in ,secret123\r\n"
+        ",,\r\n"
+        "\r\n"
+        "Vikram Sen,vikram@firm.in,hunter22\r\n"
+    ).encode("utf-8-sig")
+    assert parse_user_upload(content, "Associates.CSV") == [
+        {"display_name": "Asha Rao", "email": "asha@firm.in", "password": "secret123"},
+        {"display_name": "Vikram Sen", "email": "vikram@firm.in", "password": "hunter22"},
+    ]
+
+
+def test_json_array_or_users_object():
+    users = [{"display_name": "Asha Rao", "email": "asha@firm.in", "password": "secret123"}]
+    assert parse_user_upload(json.dumps(users).encode(), "users.json") == users
+    assert parse_user_upload(json.dumps({"users": users}).encode("utf-8-sig"), "users.json") == users
+
+
+@pytest.mark.parametrize("content, filename", [
+    (b'{"members": []}', "users.json"),
+    (b'"asha@firm.in"', "users.json"),
+    (b"not json", "users.json"),
+    (b"display_name,email,password", "users.xlsx"),
+])
+def test_unreadable_uploads_raise_value_error(content, filename):
+    with pytest.raises(ValueError):
+        parse_user_upload(content, filename)
+
+
+def test_validate_users_reports_every_bad_row():
+    rows = [
+        {"display_name": "Asha Rao", "email": "Asha@Firm.in", "password": "secret123"},
+        {"display_name": "Asha Again", "email": "asha@firm.IN", "password": "secret456"},
+        {"display_name": "Vikram Sen", "email": "vikram@firm.in", "password": "12345"},
+        "vikram@firm.in",
+        {"display_name": "Meera Iyer", "email": ["meera@firm.in"], "password": "secret123"},
+        {"display_name": "Meera Iyer", "email": "not-an-email", "password": "secret123"},
+        {"display_name": "Jo", "email": "jo@firm.in", "password": "secret123"},
+        {"display_name": "Ravi Das", "email": "ravi@firm.in", "password": "secret789"},
+    ]
+    valid, failed = validate_users(rows)
+
+    assert [(row, user.email) for row, user in valid] == [(1, "Asha@firm.in"), (8, "ravi@firm.in")]
+    errors = {result.row: result for result in failed}
+    assert sorted(errors) == [2, 3, 4, 5, 6, 7]
+    assert errors[2].error == "Email appears more than once in the upload."
+    assert errors[3].error == "password: must be at least 6 characters"
+    assert (errors[4].email, errors[4].error) == (None, "Row must be an object.")
+    assert errors[5].email is None and errors[5].error.startswith("email:")
+    assert errors[6].email == "not-an-email" and errors[6].error.startswith("email:")
+    assert errors[7].error.startswith("display_name:")
+    assert all(result.status == "failed" for result in failed)
+
+
+def test_rejected_duplicate_does_not_block_a_later_valid_row():
+    rows = [
+        {"display_name": "Asha Rao", "email": "asha@firm.in", "password": "short"},
+        {"display_name": "Asha Rao", "email": "asha@firm.in", "password": "secret123"},
+    ]
+    valid, failed = validate_users(rows)
+    assert [row for row, _ in valid] == [2]
+    assert [result.row for result in failed] == [1]
+
+
+@pytest.mark.skipif(
+    not os.getenv("FIREBASE_AUTH_EMULATOR_HOST"),
+    reason="needs the Auth and Firestore emulators (firebase emulators:start --only auth,firestore)",
+)
+def test_register_user_chunk_against_the_emulators():
+    from firebase_admin import auth
+
+    from app.core.config import db
+
+    run = uuid.uuid4().hex[:8]
+    users = [
+        (1, UserCreate(display_name="Asha Rao", email=f"asha.{run}@firm.in", password="secret123")),
+        (2, UserCreate(display_name="Vikram Sen", email=f"vikram.{run}@firm.in", password="hunter22")),
+    ]
+    results = register_user_chunk(users)
+    try:
+        assert [(r.row, r.status, r.error) for r in results] == [(1, "created", None), (2, "created", None)]
+        for result, (_, user) in zip(results, users):
+            assert auth.get_user_by_email(user.email).uid == result.uid
+            profile = db.collection("users").document(result.uid).get().to_dict()
+            assert (profile["email"], profile["display_name"]) == (user.email, user.display_name)
+
+        again = register_user_chunk([(3, users[0][1])])
+        assert [(r.row, r.status, r.error) for r in again] == [(3, "failed", "Email is already registered.")]
+    finally:
+        uids = [result.uid for result in results if result.uid]
+        auth.delete_users(uids)
+        for uid in uids:
+            db.collection("users").document(uid).delete()